@@ -1,6 +1,121 @@
 from django.contrib import admin
+from django.contrib.admin.views.main import ORDER_VAR, PAGE_VAR
+from django.core.paginator import Paginator
+from django.db.models import Max, Q
+from django.utils.functional import cached_property
 
-
+from .directory import InvalidCursor, decode_cursor, encode_cursor
 from .models import UserProfile
+from .sanitizer import sanitize_bio
+
+
+# query parameter holding the keyset cursor of the changelist's next page
+AFTER_VAR = 'after'
+
+
+class EstimatedCountPaginator(Paginator):
+    """A paginator that doesn't count every row of a large, unfiltered table.
+
+    Rows are counted exactly up to `exact_limit`; beyond that, an unfiltered
+    table is assumed to hold about as many rows as its highest primary key,
+    which the database reads straight from the index.
+    """
+    exact_limit = 10000
+
+    def __init__(self, object_list, per_page, orphans=0,
+                 allow_empty_first_page=True, count_queryset=None):
+        super().__init__(object_list, per_page, orphans,
+                         allow_empty_first_page)
+        # what to count, if not object_list (e.g. the rows before a keyset
+        # cursor was applied)
+        self.count_queryset = (object_list if count_queryset is None
+                               else count_queryset)
+
+    @cached_property
+    def count(self):
+        queryset = self.count_queryset
+        # counting a slice stops after exact_limit + 1 rows
+        count = queryset[:self.exact_limit + 1].count()
+        if count <= self.exact_limit:
+            return count
+        if queryset.query.where:
+            return queryset.count()
+        highest = queryset.order_by().aggregate(highest=Max('pk'))['highest']
+        return max(count, highest or 0)
+
+
+class UserProfileAdmin(admin.ModelAdmin):
+    list_display = ('display_name', 'city', 'country', 'user_is_active')
+    list_select_related = ('user',)
+    # prefix matches, which on SQLite use the NOCASE indexes on these
+    # columns (see migration 0010)
+    search_fields = ('^display_name', '^family_name')
+    # matches the (family_name, id) index, and the keyset cursor
+    ordering = ('family_name', 'id')
+    list_per_page = 100
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    raw_id_fields = ('user',)
+
+    def user_is_active(self, profile):
+        return profile.user.is_active
+    user_is_active.boolean = True
+    user_is_active.short_description = 'Active'
+    user_is_active.admin_order_field = 'user__is_active'
+
+    def save_model(self, request, obj, form, change):
+        # the same cleaning as the profile form (see accounts.views)
+        obj.bio = sanitize_bio(obj.bio)
+        super().save_model(request, obj, form, change)
+
+    def changelist_view(self, request, extra_context=None):
+        # The ChangeList rejects query parameters it doesn't know, so the
+        # cursor is taken out of request.GET before it gets there
+        after = None
+        if AFTER_VAR in request.GET:
+            request.GET = request.GET.copy()
+            after = request.GET.pop(AFTER_VAR)[-1]
+            # the cursor replaces the page number, rather than being applied
+            # on top of its OFFSET
+            request.GET.pop(PAGE_VAR, None)
+        keyset = ORDER_VAR not in request.GET
+        request.profile_after = after if keyset else None
+
+        response = super().changelist_view(request, extra_context)
+
+        changelist = getattr(response, 'context_data', {}).get('cl')
+        if changelist is not None and keyset:
+            rows = changelist.result_list
+            if len(rows) == changelist.list_per_page:
+                query = request.GET.copy()
+                query.pop(PAGE_VAR, None)
+                query[AFTER_VAR] = encode_cursor(rows[len(rows) - 1])
+                response.context_data['next_page_query'] = query.urlencode()
+            response.context_data['keyset_page'] = after is not None
+            # (the template shows First/Next links instead of page numbers)
+            response.context_data['keyset_mode'] = True
+        return response
+
+    def get_paginator(self, request, queryset, per_page, orphans=0,
+                      allow_empty_first_page=True):
+        # The cursor only narrows the rows shown on the page: the count is
+        # of the whole (filtered) changelist, so it can still be estimated
+        return self.paginator(self.after_cursor(request, queryset), per_page,
+                              orphans, allow_empty_first_page,
+                              count_queryset=queryset)
+
+    def after_cursor(self, request, queryset):
+        after = getattr(request, 'profile_after', None)
+        if after:
+            try:
+                family_name, pk = decode_cursor(after)
+            except InvalidCursor:
+                return queryset
+            queryset = queryset.filter(
+                Q(family_name__gt=family_name)
+                | Q(family_name=family_name, id__gt=pk)
+            )
+        return queryset
+
 
-admin.site.register(UserProfile)
+admin.site.register(UserProfile, UserProfileAdmin)
@@ -0,0 +1,259 @@
+"""Avatar renditions
+
+Avatars are stored at whatever resolution the browser uploaded, but pages
+only ever display them in a handful of small boxes. Rather than shipping the
+full-resolution file and shrinking it with `width=`, we pre-generate a fixed
+set of downsized, recompressed renditions when an avatar is uploaded.
+
+Renditions live in the same storage as the original, under a directory named
+after the original file:
+
+    avatars/1.png  ->  renditions/avatars/1.png/48.jpg
+                       renditions/avatars/1.png/96.jpg
+                       ...
+
+Keeping the original name in the path means a rendition can always be traced
+back to the avatar it was generated from.
+
+Where the Pillow build can write them, each rendition also gets WebP and AVIF
+variants next to it (48.webp, 48.avif), kept only if they are smaller. Pages
+keep linking to the JPEG/PNG rendition, and whatever serves the media picks
+the smallest variant the browser's Accept header lists (see `best_variant`),
+responding with `Vary: Accept`.
+"""
+import mimetypes
+import os
+import re
+from io import BytesIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+from PIL import Image, ImageOps
+
+
+RENDITIONS_DIR = 'renditions'
+
+# (px) each rendition fits inside a square bounding box of this size
+DEFAULT_SIZES = (48, 96, 200, 400)
+
+# (seconds) how long the list of an avatar's renditions is cached
+RENDITIONS_CACHE_TIMEOUT = 60 * 60
+
+# Pillow format name -> (file extension, save options)
+FORMATS = {
+    'JPEG': ('.jpg', {'quality': 85, 'optimize': True, 'progressive': True}),
+    'PNG': ('.png', {'optimize': True}),
+}
+
+# Pillow format name -> (file extension, content type, save options) of the
+# variants, in the order they are preferred when the same size
+VARIANT_FORMATS = {
+    'AVIF': ('.avif', 'image/avif', {'quality': 60}),
+    'WEBP': ('.webp', 'image/webp', {'quality': 80, 'method': 6}),
+}
+
+# (older Pythons' mimetypes don't know these)
+mimetypes.add_type('image/avif', '.avif')
+mimetypes.add_type('image/webp', '.webp')
+
+
+def rendition_sizes():
+    return tuple(sorted(getattr(settings, 'AVATAR_RENDITION_SIZES',
+                                DEFAULT_SIZES)))
+
+
+def rendition_dir(name):
+    """The storage directory holding the renditions of avatar `name`"""
+    return '{}/{}'.format(RENDITIONS_DIR, name)
+
+
+def rendition_name(name, size, ext):
+    return '{}/{}{}'.format(rendition_dir(name), size, ext)
+
+
+def variant_formats():
+    """The VARIANT_FORMATS that this Pillow build can write"""
+    Image.init()
+    return [image_format for image_format in VARIANT_FORMATS
+            if image_format in Image.SAVE]
+
+
+def has_alpha(image):
+    return (image.mode in ('RGBA', 'LA')
+            or (image.mode == 'P' and 'transparency' in image.info))
+
+
+def generate_renditions(avatar, storage=None):
+    """Create a downsized copy of `avatar` (a FieldFile, or a storage name)
+    for each of the configured sizes.
+
+    Images with transparency are kept as PNG, everything else is re-encoded
+    as JPEG. Smaller WebP/AVIF variants are written alongside where
+    possible. Returns the list of rendition names that were written.
+    """
+    name = getattr(avatar, 'name', avatar)
+    if storage is None:
+        storage = getattr(avatar, 'storage', default_storage)
+    sizes = rendition_sizes()
+
+    with storage.open(name, 'rb') as source:
+        image = Image.open(source)
+        # For JPEGs, ask the decoder to scale down while decoding, which is
+        # much cheaper than decoding at full size then resizing.
+        image.draft('RGB', (sizes[-1], sizes[-1]))
+        image = ImageOps.exif_transpose(image)
+        image.load()
+
+    if has_alpha(image):
+        image_format = 'PNG'
+        image = image.convert('RGBA')
+    else:
+        image_format = 'JPEG'
+        image = image.convert('RGB')
+    ext, save_options = FORMATS[image_format]
+
+    # renditions are named after their original, even when the original is
+    # named after its contents (see accounts.storage)
+    plain_storage = getattr(storage, 'unhashed', storage)
+    variants = variant_formats()
+    written = []
+    # work from the largest size down so that each resize starts from the
+    # previous (already small) rendition rather than the original
+    for size in reversed(sizes):
+        image.thumbnail((size, size), Image.LANCZOS)
+        data = encode(image, image_format, save_options)
+        renditions = [(rendition_name(name, size, ext), data)]
+
+        for variant_format in variants:
+            variant_ext, _, variant_options = VARIANT_FORMATS[variant_format]
+            target = rendition_name(name, size, variant_ext)
+            variant_data = encode(image, variant_format, variant_options)
+            if len(variant_data) < len(data):
+                renditions.append((target, variant_data))
+            elif storage.exists(target):
+                # left over from an earlier run
+                storage.delete(target)
+
+        for target, rendition_data in renditions:
+            if storage.exists(target):
+                storage.delete(target)
+            written.append(
+                plain_storage.save(target, ContentFile(rendition_data))
+            )
+
+    return written
+
+
+def encode(image, image_format, save_options):
+    buffer = BytesIO()
+    image.save(buffer, format=image_format, **save_options)
+    return buffer.getvalue()
+
+
+def delete_avatar(name, storage=None):
+    """Delete the avatar file `name` and all of its renditions"""
+    if storage is None:
+        storage = default_storage
+    try:
+        _, filenames = storage.listdir(rendition_dir(name))
+    except (FileNotFoundError, NotADirectoryError):
+        filenames = []
+    for filename in filenames:
+        storage.delete('{}/{}'.format(rendition_dir(name), filename))
+    storage.delete(name)
+
+
+def rendition_url(avatar, size):
+    """Return the url of the smallest rendition of `avatar` that is at least
+    `size` pixels, falling back to the largest rendition, and then to the
+    original file if no renditions have been generated.
+    """
+    if not avatar:
+        return ''
+    available = available_renditions(avatar)
+    if not available:
+        return avatar.url
+
+    candidates = [s for s in sorted(available) if s >= size]
+    chosen = candidates[0] if candidates else max(available)
+    return avatar.storage.url('{}/{}'.format(rendition_dir(avatar.name),
+                                             available[chosen]))
+
+
+def available_renditions(avatar):
+    """{size: filename} of the renditions of `avatar` that exist.
+
+    A page shows many avatars, each at a couple of sizes, so the listing is
+    cached. The key includes the version of the profile the avatar belongs
+    to, which is bumped once the renditions have been generated (see
+    image_edit.tasks).
+    """
+    key = None
+    version = getattr(avatar.instance, 'version', None)
+    if version is not None:
+        key = 'avatar-renditions:{}:{}:{}'.format(avatar.instance.pk,
+                                                   version, avatar.name)
+        available = cache.get(key)
+        if available is not None:
+            return available
+
+    try:
+        _, filenames = avatar.storage.listdir(rendition_dir(avatar.name))
+    except (FileNotFoundError, NotADirectoryError):
+        filenames = []
+
+    available = {}
+    for filename in filenames:
+        stem, ext = os.path.splitext(filename)
+        if stem.isdigit() and ext in {e for e, _ in FORMATS.values()}:
+            available[int(stem)] = filename
+
+    if key is not None:
+        cache.set(key, available, RENDITIONS_CACHE_TIMEOUT)
+    return available
+
+
+def accepted_image_types(header):
+    """The content types that an Accept header lists explicitly (and doesn't
+    give a q of 0).
+
+    Wildcards are ignored: browsers that send only `image/*` or `*/*` can't
+    be assumed to decode the newer formats.
+    """
+    accepted = set()
+    for item in header.split(','):
+        content_type, _, params = item.partition(';')
+        match = re.search(r'q\s*=\s*([\d.]+)', params)
+        try:
+            q = float(match.group(1)) if match else 1.0
+        except ValueError:
+            q = 1.0
+        if q > 0:
+            accepted.add(content_type.strip().lower())
+    return accepted
+
+
+def is_rendition(name):
+    return name.startswith(RENDITIONS_DIR + '/')
+
+
+def best_variant(path, accept):
+    """The path of the smallest file, out of the rendition at `path` and its
+    variants, that a client sending the Accept header `accept` can use
+    """
+    accepted = accepted_image_types(accept)
+    stem, _ = os.path.splitext(path)
+    best, best_size = path, None
+    for variant_ext, content_type, _ in VARIANT_FORMATS.values():
+        if content_type not in accepted:
+            continue
+        try:
+            size = os.stat(stem + variant_ext).st_size
+        except OSError:
+            continue
+        if best_size is None or size < best_size:
+            best, best_size = stem + variant_ext, size
+    return best
@@ -0,0 +1,119 @@
+"""The public profile directory
+
+Profiles are listed in (family_name, id) order, a page at a time, using
+keyset pagination: rather than an OFFSET (which makes the database walk
+past every earlier row), each page asks for the rows that come after the
+last row of the previous page. With the indexes on UserProfile, each page
+costs the same however deep into the directory it is.
+
+The directory can be filtered on one of FILTER_FIELDS (exact matches) and
+searched by name, bio and hobby. Searches use the SQLite FTS5 index created
+by migration 0007 when it exists, and a LIKE scan otherwise.
+"""
+import base64
+import json
+import re
+
+from django.db import connections, router
+from django.db.models import Q
+
+from .models import UserProfile
+
+
+PAGE_SIZE = 25
+
+FILTER_FIELDS = ('country', 'state', 'city', 'hobby', 'favourite_animal')
+
+SEARCH_TABLE = 'accounts_userprofile_fts'
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(profile):
+    """An opaque token for the position just after `profile`"""
+    data = json.dumps([profile.family_name, profile.pk]).encode()
+    return base64.urlsafe_b64encode(data).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        family_name, pk = json.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError):
+        raise InvalidCursor(token)
+    if not isinstance(family_name, str) or not isinstance(pk, int):
+        raise InvalidCursor(token)
+    return family_name, pk
+
+
+def search_index_available(using=None):
+    """True if the FTS index exists in database `using` (by default, the one
+    profiles are read from). Looked up once per database connection (see
+    accounts.signals.forget_search_index)
+    """
+    if using is None:
+        using = router.db_for_read(UserProfile)
+    connection = connections[using]
+    available = getattr(connection, 'profile_search_index', None)
+    if available is None:
+        available = SEARCH_TABLE in connection.introspection.table_names()
+        connection.profile_search_index = available
+    return available
+
+
+def search(profiles, text):
+    """Narrow `profiles` to those matching every word of `text`"""
+    words = re.findall(r'\w+', text)
+    if not words:
+        return profiles
+
+    # (the replica may be a copy of an older database, without the index)
+    if search_index_available(profiles.db):
+        # quote each word, so that nothing the user types is taken as FTS
+        # syntax, and match it as a prefix
+        query = ' '.join('"{}"*'.format(word) for word in words)
+        # (pk__in=RawSQL(...) would wrap the subquery in a second pair of
+        # parentheses, which SQLite reads as a scalar: the first match only)
+        return profiles.extra(
+            where=['{0}.id IN (SELECT rowid FROM {1} WHERE {1} MATCH %s)'
+                   .format(UserProfile._meta.db_table, SEARCH_TABLE)],
+            params=[query],
+        )
+
+    for word in words:
+        profiles = profiles.filter(
+            Q(given_name__icontains=word) | Q(family_name__icontains=word)
+            | Q(bio__icontains=word) | Q(hobby__icontains=word)
+        )
+    return profiles
+
+
+def directory_page(filters=None, text='', after=None, page_size=PAGE_SIZE):
+    """Return (profiles on the page, cursor for the next page or None).
+
+    `filters` maps FILTER_FIELDS to the values to match, `after` is a
+    cursor from a previous page.
+    """
+    profiles = (UserProfile.objects
+                .filter(user__is_active=True)
+                .order_by('family_name', 'id'))
+    for field, value in (filters or {}).items():
+        if field in FILTER_FIELDS and value:
+            profiles = profiles.filter(**{field: value})
+    if text:
+        profiles = search(profiles, text)
+    if after:
+        family_name, pk = decode_cursor(after)
+        profiles = profiles.filter(
+            Q(family_name__gt=family_name)
+            | Q(family_name=family_name, id__gt=pk)
+        )
+
+    # one extra row says whether there is a next page
+    page = list(profiles[:page_size + 1])
+    if len(page) > page_size:
+        page = page[:page_size]
+        return page, encode_cursor(page[-1])
+    return page, None
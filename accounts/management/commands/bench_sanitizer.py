@@ -0,0 +1,56 @@
+import timeit
+
+from django.core.management.base import BaseCommand
+
+from html_sanitizer import Sanitizer
+
+from accounts.sanitizer import bio_sanitizer
+
+
+SAMPLE_BIO = (
+    '<h2>About me</h2>'
+    '<p>I <strong>restore</strong> <em>fountain pens</em> and '
+    '<u>occasionally</u> <s>sell</s> them. '
+    '<a href="https://example.com/pens" target="_blank">Gallery</a></p>'
+    '<table><tr><th>Pen</th><th>Nib</th></tr>'
+    '<tr><td>Pilot Metropolitan</td><td>F</td></tr></table>'
+    '<p><span style="font-weight: bold">Contact:</span> '
+    '<script>alert(1)</script>see above</p>'
+)
+
+
+class Command(BaseCommand):
+    help = ("Compare the cost of sanitizing a bio with a new Sanitizer per "
+            "call against the shared bio sanitizer, which also builds its "
+            "lxml Cleaners only once")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations', type=int, default=2000,
+            help="Number of bios to sanitize in each run",
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=3,
+            help="Number of runs (the fastest is reported)",
+        )
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+
+        def fresh():
+            Sanitizer().sanitize(SAMPLE_BIO)
+
+        def construct_only():
+            Sanitizer()
+
+        def shared():
+            bio_sanitizer.sanitize(SAMPLE_BIO)
+
+        for label, func in (("new Sanitizer per call", fresh),
+                            ("construction alone", construct_only),
+                            ("shared sanitizer", shared)):
+            best = min(timeit.repeat(func, number=iterations,
+                                     repeat=options['repeat']))
+            self.stdout.write("{:<24} {:8.1f} us/call".format(
+                label, best / iterations * 1e6
+            ))
@@ -0,0 +1,81 @@
+from importlib import import_module
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.core.management.base import BaseCommand
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+
+
+class Command(BaseCommand):
+    help = ("Compare the time the session middleware adds to a signed in "
+            "request with each of the SESSION_ENGINES")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests', type=int, default=2000,
+            help="Number of requests to time for each engine",
+        )
+        parser.add_argument(
+            '--write-every', type=int, default=20,
+            help=("Modify the session on every Nth request (as signing in "
+                  "or changing password does); 0 to never modify it"),
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write("{:<16} {:>10} {:>10} {:>10} {:>10}".format(
+            "engine", "mean (us)", "p50", "p95", "p99"
+        ))
+        for name, engine in settings.SESSION_ENGINES.items():
+            with override_settings(SESSION_ENGINE=engine):
+                timings = self.run(engine, options['requests'],
+                                   options['write_every'])
+            timings.sort()
+            self.stdout.write(
+                "{:<16} {:>10.1f} {:>10.1f} {:>10.1f} {:>10.1f}".format(
+                    name,
+                    statistics.mean(timings) * 1e6,
+                    timings[len(timings) // 2] * 1e6,
+                    timings[int(len(timings) * 0.95)] * 1e6,
+                    timings[int(len(timings) * 0.99)] * 1e6,
+                )
+            )
+
+    def run(self, engine, count, write_every):
+        """Time `count` requests through SessionMiddleware with `engine`,
+        all carrying the same signed in session
+        """
+        def view(request):
+            # what AuthenticationMiddleware reads on each request
+            request.session.get('_auth_user_id')
+            if write_every and request.counter % write_every == 0:
+                request.session['counter'] = request.counter
+            return HttpResponse()
+
+        middleware = SessionMiddleware(view)
+        store = import_module(engine).SessionStore()
+        store['_auth_user_id'] = '1'
+        store.save()
+        session_key = store.session_key
+
+        factory = RequestFactory()
+        cookie_name = settings.SESSION_COOKIE_NAME
+        timings = []
+        try:
+            for counter in range(count):
+                request = factory.get('/')
+                request.COOKIES[cookie_name] = session_key
+                request.counter = counter
+
+                started = time.perf_counter()
+                response = middleware(request)
+                timings.append(time.perf_counter() - started)
+
+                if cookie_name in response.cookies:
+                    # signed cookie sessions change key on every write
+                    session_key = response.cookies[cookie_name].value
+        finally:
+            import_module(engine).SessionStore(session_key).delete()
+        return timings
@@ -0,0 +1,54 @@
+import time
+from importlib import import_module
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = ("Delete expired sessions in small batches, so the database is "
+            "never locked for long (unlike `clearsessions`)")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help="Number of sessions to delete per transaction",
+        )
+        parser.add_argument(
+            '--pause', type=float, default=0.1,
+            help="Seconds to wait between batches, to let other writers in",
+        )
+
+    def handle(self, *args, **options):
+        store = import_module(settings.SESSION_ENGINE).SessionStore
+        if not hasattr(store, 'get_model_class'):
+            # not kept in the database: expired cookies are simply ignored
+            # and cached sessions expire along with their cache entries
+            store.clear_expired()
+            self.stdout.write("{} keeps no session rows; nothing to "
+                              "delete".format(settings.SESSION_ENGINE))
+            return
+
+        sessions = store.get_model_class().objects
+        deleted = 0
+        started = time.monotonic()
+        while True:
+            now = timezone.now()
+            with transaction.atomic():
+                keys = list(
+                    sessions.filter(expire_date__lt=now)
+                    .values_list('session_key', flat=True)
+                    [:options['batch_size']]
+                )
+                if keys:
+                    sessions.filter(session_key__in=keys).delete()
+            deleted += len(keys)
+            if len(keys) < options['batch_size']:
+                break
+            time.sleep(options['pause'])
+
+        self.stdout.write("Deleted {} expired sessions in {:.2f}s".format(
+            deleted, time.monotonic() - started
+        ))
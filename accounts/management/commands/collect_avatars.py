@@ -0,0 +1,125 @@
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from accounts.avatars import RENDITIONS_DIR
+from accounts.models import UserProfile
+
+
+AVATARS_DIR = 'avatars'
+
+
+class Command(BaseCommand):
+    help = ("Delete avatar files (and renditions) that no user profile "
+            "refers to any more")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help="Report what would be deleted without deleting anything",
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help="Number of files to look up in the database at once",
+        )
+        parser.add_argument(
+            '--min-age', type=int, default=3600,
+            help=("Only delete files that haven't been modified for this "
+                  "many seconds (so uploads still in progress are safe)"),
+        )
+
+    def handle(self, *args, **options):
+        self.dry_run = options['dry_run']
+        self.cutoff = time.time() - options['min_age']
+        self.stats = {'scanned': 0, 'scanned_bytes': 0,
+                      'deleted': 0, 'deleted_bytes': 0}
+        started = time.monotonic()
+
+        batch = []
+        for top in (AVATARS_DIR, RENDITIONS_DIR):
+            for entry in self.scan(os.path.join(settings.MEDIA_ROOT, top)):
+                batch.append(entry)
+                if len(batch) >= options['batch_size']:
+                    self.collect(batch)
+                    batch = []
+        if batch:
+            self.collect(batch)
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            "Scanned {scanned} files ({scanned_bytes} bytes), {action} "
+            "{deleted} files ({deleted_bytes} bytes)".format(
+                action="would delete" if self.dry_run else "deleted",
+                **self.stats
+            )
+        )
+        self.stdout.write("{:.2f}s, {:.0f} files/s".format(
+            elapsed, self.stats['scanned'] / elapsed if elapsed else 0
+        ))
+
+    def scan(self, directory):
+        """Yield a DirEntry for every file below `directory`"""
+        stack = [directory]
+        while stack:
+            try:
+                entries = os.scandir(stack.pop())
+            except FileNotFoundError:
+                continue
+            with entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        yield entry
+
+    def collect(self, entries):
+        """Delete the entries in this batch whose avatar isn't referenced"""
+        sources = {}
+        for entry in entries:
+            sources[entry.path] = self.source_name(entry.path)
+
+        referenced = set(
+            UserProfile.objects
+            .filter(avatar__in=set(sources.values()))
+            .values_list('avatar', flat=True)
+        )
+
+        for entry in entries:
+            stat = entry.stat(follow_symlinks=False)
+            self.stats['scanned'] += 1
+            self.stats['scanned_bytes'] += stat.st_size
+            if sources[entry.path] in referenced:
+                continue
+            if stat.st_mtime > self.cutoff:
+                continue
+
+            self.stats['deleted'] += 1
+            self.stats['deleted_bytes'] += stat.st_size
+            if self.dry_run:
+                self.stdout.write("Would delete {}".format(entry.path))
+            else:
+                os.remove(entry.path)
+                self.remove_empty_parents(entry.path)
+
+    def source_name(self, path):
+        """The avatar name (as stored on UserProfile) that the file at
+        `path` belongs to
+        """
+        name = os.path.relpath(path, settings.MEDIA_ROOT)
+        name = name.replace(os.sep, '/')
+        if name.startswith(RENDITIONS_DIR + '/'):
+            # renditions/<avatar name>/<size>.<ext>
+            name = name[len(RENDITIONS_DIR) + 1:].rsplit('/', 1)[0]
+        return name
+
+    def remove_empty_parents(self, path):
+        media_root = os.path.normpath(settings.MEDIA_ROOT)
+        directory = os.path.dirname(os.path.normpath(path))
+        while os.path.dirname(directory) != media_root:
+            try:
+                os.rmdir(directory)
+            except OSError:  # not empty
+                break
+            directory = os.path.dirname(directory)
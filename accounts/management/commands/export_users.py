@@ -0,0 +1,58 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts.export import (DEFAULT_CHUNK_SIZE, FORMATS, export_lines,
+                             export_rows)
+
+
+class Command(BaseCommand):
+    help = "Export every user and their profile as CSV or JSON lines"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--format', choices=FORMATS, default='csv',
+        )
+        parser.add_argument(
+            '--output',
+            help="File to write to (by default, standard output)",
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+            help="Number of users to fetch from the database at once",
+        )
+        parser.add_argument(
+            '--base-url', default='',
+            help="Prefix for avatar URLs, e.g. https://example.com",
+        )
+
+    def handle(self, *args, **options):
+        base_url = options['base_url'].rstrip('/')
+        rows = export_rows(
+            options['chunk_size'],
+            absolute_url=(lambda url: base_url + url) if base_url else None,
+        )
+
+        started = time.monotonic()
+        count = 0
+        output = None
+        if options['output']:
+            output = open(options['output'], 'w', newline='',
+                          encoding='utf-8')
+            write = output.write
+        else:
+            def write(line):
+                self.stdout.write(line, ending='')
+        try:
+            for line in export_lines(options['format'], rows):
+                write(line)
+                count += 1
+        finally:
+            if output is not None:
+                output.close()
+
+        if options['format'] == 'csv':
+            count -= 1  # the header
+        self.stderr.write("Exported {} users in {:.2f}s".format(
+            count, time.monotonic() - started
+        ))
@@ -0,0 +1,19 @@
+# Generated by Django 2.2.3 on 2026-10-18 13:50
+
+import accounts.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_auto_20180910_1939'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='userprofile',
+            name='avatar',
+            field=models.ImageField(blank=True, null=True, storage=accounts.storage.ContentAddressedStorage(), upload_to='avatars/'),
+        ),
+    ]
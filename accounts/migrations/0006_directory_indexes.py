@@ -0,0 +1,37 @@
+# Generated by Django 2.2.3 on 2026-10-18 14:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_userprofile_version'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=models.Index(fields=['family_name', 'id'], name='profile_family_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=models.Index(fields=['country', 'family_name', 'id'], name='profile_country_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=models.Index(fields=['state', 'family_name', 'id'], name='profile_state_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=models.Index(fields=['city', 'family_name', 'id'], name='profile_city_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=models.Index(fields=['hobby', 'family_name', 'id'], name='profile_hobby_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=models.Index(fields=['favourite_animal', 'family_name', 'id'], name='profile_favourite_animal_idx'),
+        ),
+    ]
@@ -0,0 +1,113 @@
+from django.db import migrations
+
+
+# An external content FTS5 table: the text lives in accounts_userprofile and
+# the index is kept in step with it by triggers, so every way of changing a
+# profile (save(), update(), bulk_create(), raw SQL) updates the index.
+#
+# On SQLite most schema changes to accounts_userprofile rebuild the table,
+# which drops its triggers: migrations that do so must finish with
+# `restore_search_triggers`.
+TABLE_SQL = """
+    CREATE VIRTUAL TABLE accounts_userprofile_fts USING fts5(
+        given_name, family_name, bio, hobby,
+        content='accounts_userprofile', content_rowid='id'
+    )
+"""
+
+TRIGGER_SQL = [
+    """
+    CREATE TRIGGER IF NOT EXISTS accounts_userprofile_fts_insert
+    AFTER INSERT ON accounts_userprofile BEGIN
+        INSERT INTO accounts_userprofile_fts
+            (rowid, given_name, family_name, bio, hobby)
+        VALUES (new.id, new.given_name, new.family_name, new.bio, new.hobby);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS accounts_userprofile_fts_delete
+    AFTER DELETE ON accounts_userprofile BEGIN
+        INSERT INTO accounts_userprofile_fts
+            (accounts_userprofile_fts, rowid, given_name, family_name, bio,
+             hobby)
+        VALUES ('delete', old.id, old.given_name, old.family_name, old.bio,
+                old.hobby);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS accounts_userprofile_fts_update
+    AFTER UPDATE OF given_name, family_name, bio, hobby
+    ON accounts_userprofile BEGIN
+        INSERT INTO accounts_userprofile_fts
+            (accounts_userprofile_fts, rowid, given_name, family_name, bio,
+             hobby)
+        VALUES ('delete', old.id, old.given_name, old.family_name, old.bio,
+                old.hobby);
+        INSERT INTO accounts_userprofile_fts
+            (rowid, given_name, family_name, bio, hobby)
+        VALUES (new.id, new.given_name, new.family_name, new.bio, new.hobby);
+    END
+    """,
+]
+
+# (re)index the profiles that already exist
+REBUILD_SQL = """
+    INSERT INTO accounts_userprofile_fts (accounts_userprofile_fts)
+    VALUES ('rebuild')
+"""
+
+DROP_SQL = [
+    "DROP TRIGGER IF EXISTS accounts_userprofile_fts_update",
+    "DROP TRIGGER IF EXISTS accounts_userprofile_fts_delete",
+    "DROP TRIGGER IF EXISTS accounts_userprofile_fts_insert",
+    "DROP TABLE IF EXISTS accounts_userprofile_fts",
+]
+
+
+def fts5_available(connection):
+    if connection.vendor != 'sqlite':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("PRAGMA compile_options")
+        return ('ENABLE_FTS5',) in cursor.fetchall()
+
+
+def create_search_index(apps, schema_editor):
+    # Without FTS5 the directory falls back to a (slower) LIKE search
+    if not fts5_available(schema_editor.connection):
+        return
+    schema_editor.execute(TABLE_SQL)
+    for sql in TRIGGER_SQL:
+        schema_editor.execute(sql)
+    schema_editor.execute(REBUILD_SQL)
+
+
+def restore_search_triggers(apps, schema_editor):
+    """Recreate the triggers after accounts_userprofile has been rebuilt,
+    and reindex in case profiles changed while they were missing
+    """
+    connection = schema_editor.connection
+    if ('accounts_userprofile_fts'
+            not in connection.introspection.table_names()):
+        return
+    for sql in TRIGGER_SQL:
+        schema_editor.execute(sql)
+    schema_editor.execute(REBUILD_SQL)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in DROP_SQL:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_directory_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 2.2.3 on 2026-10-18 14:11
+
+from importlib import import_module
+
+from django.db import migrations, models
+
+
+BATCH_SIZE = 1000
+
+search = import_module('accounts.migrations.0007_userprofile_search')
+
+
+def format_display_name(given_name, family_name, email):
+    # as UserProfile.format_display_name
+    prefix = ""
+    suffix = ""
+    if given_name:
+        prefix += given_name + " "
+    if family_name:
+        prefix += str(family_name).upper() + " "
+    if prefix:
+        prefix += "("
+        suffix = ")"
+    return prefix + email + suffix
+
+
+def fill_display_names(apps, schema_editor):
+    UserProfile = apps.get_model('accounts', 'UserProfile')
+    profiles = (UserProfile.objects
+                .using(schema_editor.connection.alias)
+                .select_related('user')
+                .only('given_name', 'family_name', 'user__email')
+                .order_by('pk'))
+
+    # walk the table in primary key order, a batch at a time, rather than
+    # holding every profile in memory
+    last_pk = 0
+    while True:
+        batch = list(profiles.filter(pk__gt=last_pk)[:BATCH_SIZE])
+        if not batch:
+            break
+        for profile in batch:
+            profile.display_name = format_display_name(
+                profile.given_name, profile.family_name, profile.user.email
+            )
+        UserProfile.objects.using(schema_editor.connection.alias).bulk_update(
+            batch, ['display_name']
+        )
+        last_pk = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0007_userprofile_search'),
+    ]
+
+    operations = [
+        # (when migrating backwards, removing the column rebuilds the table
+        # again, after which this restores the triggers)
+        migrations.RunPython(migrations.RunPython.noop,
+                             search.restore_search_triggers),
+        migrations.AddField(
+            model_name='userprofile',
+            name='display_name',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=800),
+        ),
+        migrations.RunPython(fill_display_names, migrations.RunPython.noop),
+        # adding the column rebuilt accounts_userprofile on SQLite
+        migrations.RunPython(search.restore_search_triggers,
+                             migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 2.2.3 on 2026-10-18 14:42
+
+from importlib import import_module
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+search = import_module('accounts.migrations.0007_userprofile_search')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0008_userprofile_display_name'),
+    ]
+
+    operations = [
+        # (see 0008: adding or removing the column rebuilds the table on
+        # SQLite, dropping the search triggers)
+        migrations.RunPython(migrations.RunPython.noop,
+                             search.restore_search_triggers),
+        migrations.AddField(
+            model_name='userprofile',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(search.restore_search_triggers,
+                             migrations.RunPython.noop),
+    ]
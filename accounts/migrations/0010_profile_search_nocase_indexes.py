@@ -0,0 +1,42 @@
+from django.db import migrations
+
+
+# The admin searches profiles by case-insensitive prefix (LIKE 'x%'), which
+# SQLite can only answer from an index that uses the NOCASE collation.
+#
+# Django doesn't know about these indexes, so when a migration rebuilds
+# accounts_userprofile on SQLite (as adding or removing a column does) it
+# must finish with `create_nocase_indexes` (and see 0007 for the search
+# triggers).
+INDEXES = {
+    'profile_display_name_nocase_idx': 'display_name',
+    'profile_family_name_nocase_idx': 'family_name',
+}
+
+
+def create_nocase_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for name, column in INDEXES.items():
+        schema_editor.execute(
+            'CREATE INDEX IF NOT EXISTS {} ON accounts_userprofile '
+            '({} COLLATE NOCASE)'.format(name, column)
+        )
+
+
+def drop_nocase_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for name in INDEXES:
+        schema_editor.execute('DROP INDEX IF EXISTS {}'.format(name))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0009_userprofile_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_nocase_indexes, drop_nocase_indexes),
+    ]
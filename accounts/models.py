@@ -1,15 +1,25 @@
 import os
 
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
 from django.urls import reverse
 from django.contrib.auth.models import User
 
 from ckeditor.fields import RichTextField
 
+from .avatars import delete_avatar
+from .storage import ContentAddressedStorage, recently_saved
+
+
+avatar_storage = ContentAddressedStorage()
+
 
 def user_avatar_path(instance, filename):
-    """See django.db.models.FileField in the django docs
+    """No longer used (avatars are named after their contents, see
+    accounts.storage) but referenced by migrations.
+
+    See django.db.models.FileField in the django docs
 
     `instance` is the object with the ImageField (i.e, the user);
     `filename` is the file's original filename
@@ -34,8 +44,11 @@ class UserProfile(models.Model):
                                    blank=True,
                                    default='')
 
+    # The storage names avatars after a hash of their contents, so identical
+    # images are only stored once and may be shared by several profiles
     avatar = models.ImageField(
-        upload_to=user_avatar_path,
+        upload_to='avatars/',
+        storage=avatar_storage,
         blank=True,
         null=True
     )
@@ -72,17 +85,125 @@ class UserProfile(models.Model):
         default=''
     )
 
-    def __str__(self):
+    # Bumped on every save, so that anything cached from the profile (e.g.
+    # the rendered fragments in profile.html) can be keyed on it
+    version = models.PositiveIntegerField(default=0, editable=False)
+    # (the profile pages' Last-Modified)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    # What __str__ returns, stored so that listings can show profiles without
+    # loading their users. Kept up to date by save() and, when a user's
+    # email changes, by accounts.signals
+    display_name = models.CharField(max_length=800,
+                                    editable=False,
+                                    db_index=True,
+                                    default='')
+
+    # the avatar as it is in the database
+    _stored_avatar = None
+
+    class Meta:
+        # The directory (see accounts.directory) lists profiles ordered by
+        # (family_name, id), optionally filtered on one of these fields, so
+        # each index serves a filter plus the ordering
+        indexes = [
+            models.Index(fields=['family_name', 'id'],
+                         name='profile_family_name_idx'),
+            models.Index(fields=['country', 'family_name', 'id'],
+                         name='profile_country_idx'),
+            models.Index(fields=['state', 'family_name', 'id'],
+                         name='profile_state_idx'),
+            models.Index(fields=['city', 'family_name', 'id'],
+                         name='profile_city_idx'),
+            models.Index(fields=['hobby', 'family_name', 'id'],
+                         name='profile_hobby_idx'),
+            models.Index(fields=['favourite_animal', 'family_name', 'id'],
+                         name='profile_favourite_animal_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if 'avatar' in field_names:
+            instance._stored_avatar = values[field_names.index('avatar')]
+        return instance
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        if adding:
+            self.version += 1
+        else:
+            # bumped in the database, so that two saves of stale copies of
+            # the profile never end up with the same version
+            previous_version = self.version
+            self.version = F('version') + 1
+        if self.user_id is not None:  # (else the insert will fail anyway)
+            self.display_name = self.format_display_name(
+                self.given_name, self.family_name, self.user.email
+            )
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = (set(update_fields)
+                                       | {'version', 'display_name',
+                                          'updated_at'})
+        try:
+            super().save(*args, **kwargs)
+        except Exception:
+            if not adding:
+                self.version = previous_version
+            raise
+        if not adding:
+            self.refresh_from_db(fields=['version'])
+        previous = self._stored_avatar
+        self._stored_avatar = self.avatar.name
+        if previous and previous != self.avatar.name:
+            self.release_avatar(previous)
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        if self._stored_avatar:
+            self.release_avatar(self._stored_avatar)
+        return result
+
+    def release_avatar(self, name):
+        """Delete the avatar file `name` once no profile refers to it.
+
+        Waits for the current transaction to commit, so that a rolled back
+        change never loses the file the profile still points to. A file that
+        was saved again recently is kept, since the profile now using it may
+        not have been committed yet; `collect_avatars` deletes it later if
+        it turns out to be unused.
+        """
+        storage = self._meta.get_field('avatar').storage
+
+        def delete_if_unreferenced():
+            if UserProfile.objects.filter(avatar=name).exists():
+                return
+            if recently_saved(storage, name):
+                return
+            delete_avatar(name, storage)
+
+        transaction.on_commit(delete_if_unreferenced)
+
+    @staticmethod
+    def format_display_name(given_name, family_name, email):
         prefix = ""
         suffix = ""
-        if self.given_name:
-            prefix += self.given_name + " "
-        if self.family_name:
-            prefix += str(self.family_name).upper() + " "
+        if given_name:
+            prefix += given_name + " "
+        if family_name:
+            prefix += str(family_name).upper() + " "
         if prefix:
             prefix += "("
             suffix = ")"
-        return prefix + self.user.email + suffix
+        return prefix + email + suffix
+
+    def __str__(self):
+        if self.display_name:
+            return self.display_name
+        # not saved yet
+        return self.format_display_name(self.given_name, self.family_name,
+                                        self.user.email)
 
     def get_absolute_url(self):
         return reverse('accounts:profile',
@@ -0,0 +1,114 @@
+"""Sign in throttling
+
+Every sign in attempt costs a full password hash, so unlimited attempts are
+both a way to guess passwords and a cheap way to use up our CPU. Attempts
+are therefore limited per client IP address and per email address, and an
+attempt over the limit is turned away before any hashing happens.
+
+Each limit is a token bucket: a bucket holds up to `capacity` tokens and
+refills at `capacity` tokens per `period` seconds; each attempt takes a
+token, and there is no attempt without one. This allows short bursts (a
+mistyped password or two) while capping the sustained rate.
+
+Buckets are kept in the `ratelimit` cache. With the default local-memory
+cache each process keeps its own buckets; point it at a file-based (or
+database) cache to share them between the processes of a host. The read,
+refill and write of a bucket aren't done under a lock: two simultaneous
+attempts may both take the same token, which lets a client slightly exceed
+its limit but never costs a legitimate user an attempt.
+"""
+import functools
+import hashlib
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import InvalidCacheBackendError
+
+
+CACHE_ALIAS = 'ratelimit'
+
+# bucket name -> (capacity, period in seconds)
+DEFAULT_SIGN_IN_LIMITS = {
+    'ip': (20, 60),
+    'email': (5, 60),
+}
+
+
+def get_cache():
+    try:
+        return caches[CACHE_ALIAS]
+    except InvalidCacheBackendError:
+        return caches['default']
+
+
+class TokenBucket(object):
+
+    def __init__(self, name, capacity, period):
+        self.name = name
+        self.capacity = capacity
+        self.rate = capacity / period  # tokens per second
+
+    def cache_key(self, key):
+        # hashed, so that email addresses aren't written to the cache (which
+        # may be files on disk), and any key makes a valid cache key
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        return 'ratelimit:{}:{}'.format(self.name, digest)
+
+    def consume(self, key, cache=None, now=None):
+        """Take a token from the bucket for `key`.
+
+        Returns False (and takes nothing) if the bucket is empty.
+        """
+        if cache is None:
+            cache = get_cache()
+        if now is None:
+            now = time.time()
+        cache_key = self.cache_key(key)
+
+        tokens, updated = cache.get(cache_key, (self.capacity, now))
+        tokens = min(self.capacity, tokens + (now - updated) * self.rate)
+        if tokens < 1:
+            return False
+
+        # once the bucket has had time to refill it is as good as new, so
+        # it can be dropped from the cache
+        refill_time = math.ceil((self.capacity - tokens + 1) / self.rate)
+        cache.set(cache_key, (tokens - 1, now), timeout=refill_time)
+        return True
+
+
+def sign_in_buckets():
+    limits = getattr(settings, 'SIGN_IN_RATE_LIMITS', DEFAULT_SIGN_IN_LIMITS)
+    return {name: TokenBucket('sign_in_' + name, capacity, period)
+            for name, (capacity, period) in limits.items()}
+
+
+def normalize_email(email):
+    return (email or '').strip().lower()
+
+
+def throttle_sign_in(on_limited):
+    """Decorate a sign in view so that POSTs over the rate limits are
+    answered by `on_limited(request)` instead.
+
+    The email address is read from the form's `username` field.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method == 'POST':
+                keys = {
+                    'ip': request.META.get('REMOTE_ADDR', ''),
+                    'email': normalize_email(request.POST.get('username')),
+                }
+                cache = get_cache()
+                buckets = sign_in_buckets()
+                for name, key in keys.items():
+                    bucket = buckets.get(name)
+                    if bucket and not bucket.consume(key, cache):
+                        return on_limited(request)
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,191 @@
+"""Bio sanitizing
+
+Bios come from CKEditor as HTML, so they are cleaned before being saved and
+are then displayed unescaped (see accounts/bio.html). The cleaning is
+html-sanitizer's default: anything outside its short list of tags and
+attributes is dropped.
+
+html-sanitizer's `Sanitizer.sanitize` builds two lxml `Cleaner`s on every
+call. `BioSanitizer` builds them once, when it is created, and otherwise
+cleans exactly as `Sanitizer.sanitize` does in the pinned html-sanitizer
+version (see requirements.txt). A single instance is shared by every
+request: neither it nor the cleaners change state while sanitizing.
+"""
+from collections import deque
+import re
+import unicodedata
+
+import lxml.html
+import lxml.html.clean
+from html_sanitizer import Sanitizer
+from html_sanitizer.sanitizer import (normalize_overall_whitespace,
+                                      normalize_whitespace_in_text_or_tail,
+                                      only_whitespace_re)
+
+
+class BioSanitizer(Sanitizer):
+
+    def __init__(self, settings=None):
+        super().__init__(settings)
+        self.pre_cleaner = lxml.html.clean.Cleaner(
+            remove_unknown_tags=False,
+            # Remove style *tags*
+            style=True,
+            # Keep style attributes for now: they are needed to turn spans
+            # into em/strong
+            safe_attrs_only=False,
+            inline_style=False,
+            # form tags are replaced below
+            forms=False,
+        )
+        self.post_cleaner = lxml.html.clean.Cleaner(
+            allow_tags=self.tags,
+            remove_unknown_tags=False,
+            safe_attrs_only=False,  # the attributes allowlist is enough
+            add_nofollow=self.add_nofollow,
+            forms=False,
+        )
+
+    def sanitize(self, html):
+        html = normalize_overall_whitespace(html)
+        html = '<div>%s</div>' % html
+        try:
+            doc = lxml.html.fromstring(html)
+            lxml.html.tostring(doc, encoding='utf-8')
+        except Exception:
+            from lxml.html import soupparser
+
+            doc = soupparser.fromstring(html)
+
+        self.pre_cleaner(doc)
+
+        # walk the tree recursively, so that elements emptied along the way
+        # can be removed completely
+        backlog = deque(doc.iterdescendants())
+        while backlog:
+            element = backlog.pop()
+
+            for processor in self.element_preprocessors:
+                element = processor(element)
+
+            element = normalize_whitespace_in_text_or_tail(element)
+
+            # remove empty tags if they are not explicitly allowed
+            if ((not element.text or only_whitespace_re.match(element.text))
+                    and element.tag not in self.empty
+                    and not len(element)):
+                element.drop_tag()
+                continue
+
+            # remove tags which only contain whitespace and/or <br>s
+            if (element.tag not in self.empty
+                    and only_whitespace_re.match(element.text or '')
+                    and {e.tag for e in element} <= self.whitespace
+                    and all(only_whitespace_re.match(e.tail or '')
+                            for e in element)):
+                element.drop_tree()
+                continue
+
+            if element.tag in {'li', 'p'}:
+                # remove p-in-li and p-in-p tags
+                for p in element.findall('p'):
+                    if getattr(p, 'text', None):
+                        p.text = ' ' + p.text + ' '
+                    p.drop_tag()
+
+                # remove list markers, maybe copy-pasted from a word
+                # processor
+                if element.text:
+                    element.text = re.sub(
+                        r'^(\&nbsp;|\&#160;|\s)*(-|\*|&#183;)'
+                        r'(\&nbsp;|\&#160;|\s)+',
+                        '',
+                        element.text,
+                    )
+
+            elif element.tag in self.whitespace:
+                # Drop the next element if it is a <br> too and there is no
+                # content in between
+                nx = element.getnext()
+                if (nx is not None
+                        and nx.tag == element.tag
+                        and (not element.tail
+                             or only_whitespace_re.match(element.tail))):
+                    nx.drop_tag()
+                    continue
+
+            if not element.text:
+                # No text before the first child, and that child is a <br>:
+                # drop it (and look again, there may be more)
+                first = list(element)[0] if list(element) else None
+                if first is not None and first.tag in self.whitespace:
+                    first.drop_tag()
+                    backlog.append(element)
+                    continue
+
+            if element.tag in (self.tags - self.separate):
+                # Merge adjacent elements of the same type
+                nx = element.getnext()
+                if (only_whitespace_re.match(element.tail or '')
+                        and nx is not None
+                        and nx.tag == element.tag
+                        and self.is_mergeable(element, nx)):
+                    if nx.text:
+                        if len(element):
+                            list(element)[-1].tail = '%s %s' % (
+                                list(element)[-1].tail or '', nx.text,
+                            )
+                        else:
+                            element.text = '%s %s' % (element.text or '',
+                                                      nx.text)
+
+                    for child in nx:
+                        element.append(child)
+
+                    # (the tail is merged into the previous element)
+                    nx.drop_tree()
+
+                    # process the merged element again
+                    backlog.append(element)
+                    continue
+
+            for processor in self.element_postprocessors:
+                element = processor(element)
+
+            # remove all attributes which are not explicitly allowed
+            allowed = self.attributes.get(element.tag, [])
+            for key in element.keys():
+                if key not in allowed:
+                    del element.attrib[key]
+
+            # make hrefs benign
+            href = element.get('href')
+            if href is not None:
+                element.set('href', self.sanitize_href(href))
+
+            element = normalize_whitespace_in_text_or_tail(element)
+
+        if self.autolink is True:
+            lxml.html.clean.autolink(doc)
+        elif isinstance(self.autolink, dict):
+            lxml.html.clean.autolink(doc, **self.autolink)
+
+        # clean again, this time allowing only the allowed tags
+        self.post_cleaner(doc)
+
+        html = lxml.html.tostring(doc, encoding='unicode')
+
+        # add a space before the closing slash in empty tags
+        html = re.sub(r'<([^/>]+)/>', r'<\1 />', html)
+
+        # remove the wrapping tag the parser needed
+        html = re.sub(r'^<div>|</div>$', '', html)
+
+        return unicodedata.normalize('NFKC', html)
+
+
+bio_sanitizer = BioSanitizer()
+
+
+def sanitize_bio(html):
+    return bio_sanitizer.sanitize(html)
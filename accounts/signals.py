@@ -0,0 +1,39 @@
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import UserProfile
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL,
+          dispatch_uid='accounts.update_display_name')
+def update_display_name(sender, instance, created, raw, update_fields,
+                        **kwargs):
+    """Keep UserProfile.display_name (which includes the email) up to date
+    when a user is saved
+    """
+    if created or raw:
+        return  # no profile yet
+    if update_fields is not None and 'email' not in update_fields:
+        return
+
+    profiles = UserProfile.objects.filter(user=instance)
+    names = profiles.values_list('given_name', 'family_name',
+                                 'display_name').first()
+    if names is None:
+        return
+    given_name, family_name, display_name = names
+    new_name = UserProfile.format_display_name(given_name, family_name,
+                                               instance.email)
+    if new_name != display_name:
+        profiles.update(display_name=new_name, updated_at=timezone.now())
+
+
+@receiver(connection_created, dispatch_uid='accounts.forget_search_index')
+def forget_search_index(sender, connection, **kwargs):
+    """A new connection may be to a database with or without the search
+    index, so look it up again (see accounts.directory.search_index_available)
+    """
+    connection.profile_search_index = None
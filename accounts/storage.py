@@ -0,0 +1,126 @@
+"""Content-addressed file storage
+
+Files saved through `ContentAddressedStorage` are named after the SHA-256
+hash of their contents, keeping the directory and extension that the field's
+`upload_to` asked for:
+
+    avatars/photo.JPG  ->  avatars/9f/86/9f86d081...0a08.jpg
+
+This means:
+
+- identical uploads (from the same or different users) share a single file,
+- a name always refers to the same bytes, so it can be served with
+  far-future cache headers,
+- re-uploading never overwrites a file that a browser may have cached.
+
+Because files can be shared, a file must only be deleted once nothing refers
+to it any more (see `UserProfile.save`). Saving content that is already
+stored touches the existing file, so a file that was just handed out again
+can be told apart from one that has been unused for a while (see
+`recently_saved`).
+"""
+import hashlib
+import os
+import re
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.move import file_move_safe
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+
+HASHED_NAME_RE = re.compile(r'(^|/)[0-9a-f]{64}(\.|/|$)')
+
+
+def is_content_addressed(name):
+    """True if `name` (or a directory it is in) is a content hash"""
+    return bool(HASHED_NAME_RE.search(name))
+
+
+def recently_saved(storage, name):
+    """True if the file `name` was saved (or re-saved with the same contents)
+    within the last `AVATAR_RELEASE_GRACE_PERIOD` seconds.
+
+    A profile that is about to refer to such a file may not have been
+    committed yet, so it must not be deleted even if nothing refers to it.
+    """
+    grace_period = getattr(settings, 'AVATAR_RELEASE_GRACE_PERIOD', 600)
+    try:
+        modified = os.path.getmtime(storage.path(name))
+    except FileNotFoundError:
+        return False
+    return modified > time.time() - grace_period
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+
+        return super().save(self.hashed_name(name, digest.hexdigest()),
+                            content, max_length)
+
+    @property
+    def unhashed(self):
+        """A storage for the same location that saves files under the names
+        it is given (e.g. for files derived from a content-addressed file)
+        """
+        return FileSystemStorage(
+            location=self.location,
+            base_url=self.base_url,
+            file_permissions_mode=self.file_permissions_mode,
+            directory_permissions_mode=self.directory_permissions_mode,
+        )
+
+    @staticmethod
+    def hashed_name(name, hexdigest):
+        directory, filename = os.path.split(name)
+        _, ext = os.path.splitext(filename)
+        return os.path.join(directory, hexdigest[:2], hexdigest[2:4],
+                            hexdigest + ext.lower())
+
+    def get_available_name(self, name, max_length=None):
+        # An existing file with this name has the same contents: reuse it
+        # rather than picking a new name
+        return name
+
+    def _save(self, name, content):
+        full_path = self.path(name)
+        try:
+            # Already stored: mark it as in use again so that a concurrent
+            # release of the same file leaves it alone
+            os.utime(full_path)
+            return name
+        except FileNotFoundError:
+            pass
+
+        directory = os.path.dirname(full_path)
+        os.makedirs(directory, exist_ok=True)
+
+        # Write to a temporary file and then move it into place, so that
+        # nobody ever sees a partially written file under its final name.
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.upload-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in content.chunks():
+                    f.write(chunk)
+            if self.file_permissions_mode is not None:
+                os.chmod(tmp_path, self.file_permissions_mode)
+            # If another request stored the same content in the meantime
+            # this replaces it with identical bytes, which is harmless.
+            file_move_safe(tmp_path, full_path, allow_overwrite=True)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return name
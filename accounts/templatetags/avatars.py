@@ -0,0 +1,16 @@
+from django import template
+
+from accounts.avatars import rendition_url
+
+
+register = template.Library()
+
+
+@register.simple_tag
+def avatar_url(avatar, size):
+    """Usage: `{% avatar_url profile.avatar 200 %}`
+
+    Outputs the url of the pre-generated rendition best suited to displaying
+    `avatar` in a box `size` pixels wide.
+    """
+    return rendition_url(avatar, int(size))
@@ -0,0 +1,166 @@
+from datetime import date
+
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from accounts.admin import EstimatedCountPaginator
+from accounts.models import UserProfile
+
+
+User = get_user_model()
+
+
+class UserProfileAdminTestCase(TestCase):
+
+    # Setup and teardown
+    # ------------------
+    def setUp(self):
+        for i in range(5):
+            UserProfile.objects.create(
+                user=User.objects.create_user(
+                    email='user{}@test.com'.format(i)
+                ),
+                date_of_birth=date(1977, 5, 25),
+                bio='<p>This is a test bio</p>',
+                family_name='name{}'.format(4 - i),
+            )
+        self.admin = User.objects.create_superuser(
+            email='admin@test.com', password='UPPERlower123456,./!@#'
+        )
+        self.client.force_login(self.admin)
+        self.url = reverse('admin:accounts_userprofile_changelist')
+
+    # Helper Methods
+    # --------------
+    def family_names(self, response):
+        return [profile.family_name
+                for profile in response.context['cl'].result_list]
+
+    # Test Methods
+    # ------------
+    def test_changelist_pages_with_a_cursor(self):
+        site_admin = admin.site._registry[UserProfile]
+        site_admin.list_per_page = 2
+        try:
+            response = self.client.get(self.url)
+            self.assertEqual(self.family_names(response), ['name0', 'name1'])
+
+            response = self.client.get(
+                self.url + '?' + response.context['next_page_query']
+            )
+            self.assertEqual(self.family_names(response), ['name2', 'name3'])
+            self.assertContains(response, 'First page')
+        finally:
+            site_admin.list_per_page = 100
+
+    def test_next_page_after_an_offset_page(self):
+        site_admin = admin.site._registry[UserProfile]
+        site_admin.list_per_page = 2
+        try:
+            response = self.client.get(self.url, {'p': 1})
+            self.assertEqual(self.family_names(response), ['name2', 'name3'])
+            self.assertNotIn('p=', response.context['next_page_query'])
+            # no OFFSET page links alongside the cursor's
+            self.assertNotContains(response, '?p=')
+
+            response = self.client.get(
+                self.url + '?' + response.context['next_page_query'] + '&p=1'
+            )
+            self.assertEqual(self.family_names(response), ['name4'])
+        finally:
+            site_admin.list_per_page = 100
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        self.client.get(self.url)  # warm up the session and content types
+
+        with self.assertNumQueries(4):
+            response = self.client.get(self.url)
+        self.assertContains(response, 'NAME0 (user4@test.com)')
+
+    def test_cursor_pages_of_large_tables_are_estimated(self):
+        site_admin = admin.site._registry[UserProfile]
+        site_admin.list_per_page = 2
+        EstimatedCountPaginator.exact_limit = 3
+        try:
+            response = self.client.get(self.url)
+            next_url = self.url + '?' + response.context['next_page_query']
+
+            # session, user, capped count, highest key, rows
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(next_url)
+            self.assertEqual(len(queries), 5)
+            self.assertEqual(self.family_names(response), ['name2', 'name3'])
+            self.assertTrue(any('MAX(' in query['sql']
+                                for query in queries.captured_queries))
+        finally:
+            site_admin.list_per_page = 100
+            EstimatedCountPaginator.exact_limit = 10000
+
+    def test_search_uses_an_index(self):
+        request = RequestFactory().get(self.url, {'q': 'nam'})
+        request.user = self.admin
+        site_admin = admin.site._registry[UserProfile]
+        queryset, _ = site_admin.get_search_results(
+            request, UserProfile.objects.all(), 'nam'
+        )
+        sql, params = queryset.values('pk').query.sql_with_params()
+
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+            plan = ' '.join(str(row[-1]) for row in cursor.fetchall())
+        self.assertIn('nocase_idx', plan)
+        self.assertNotIn('SCAN', plan)
+        self.assertEqual(queryset.count(), 5)
+
+    def test_saving_a_profile_sanitizes_the_bio(self):
+        profile = UserProfile.objects.first()
+        profile.bio = '<p>Hello</p><script>alert(1)</script>'
+        request = RequestFactory().post('/')
+        request.user = self.admin
+
+        admin.site._registry[UserProfile].save_model(request, profile,
+                                                     None, True)
+
+        profile.refresh_from_db()
+        self.assertEqual(profile.bio, '<p>Hello</p>')
+
+    def test_invalid_cursor_shows_first_page(self):
+        response = self.client.get(self.url, {'after': 'not a cursor'})
+
+        self.assertEqual(self.family_names(response)[0], 'name0')
+
+
+class EstimatedCountPaginatorTestCase(TestCase):
+
+    def setUp(self):
+        for i in range(5):
+            User.objects.create_user(email='user{}@test.com'.format(i))
+        EstimatedCountPaginator.exact_limit = 3
+
+    def tearDown(self):
+        EstimatedCountPaginator.exact_limit = 10000
+
+    def test_small_counts_are_exact(self):
+        users = (User.objects.filter(email__startswith='user1')
+                 .order_by('pk'))
+
+        self.assertEqual(EstimatedCountPaginator(users, 2).count, 1)
+
+    def test_large_unfiltered_counts_use_the_highest_key(self):
+        User.objects.filter(email='user2@test.com').delete()
+        highest = User.objects.order_by('-pk')[0].pk
+
+        with self.assertNumQueries(2):
+            count = EstimatedCountPaginator(User.objects.order_by('pk'),
+                                            2).count
+        self.assertEqual(count, highest)
+
+    def test_large_filtered_counts_are_exact(self):
+        users = (User.objects.filter(email__endswith='@test.com')
+                 .order_by('pk'))
+
+        self.assertEqual(EstimatedCountPaginator(users, 2).count, 5)
@@ -0,0 +1,187 @@
+from datetime import date
+from io import BytesIO
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db.models import F
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+
+from PIL import Image
+
+from accounts.avatars import (VARIANT_FORMATS, best_variant,
+                              generate_renditions, rendition_name,
+                              rendition_url, variant_formats)
+from accounts.models import UserProfile
+
+
+User = get_user_model()
+
+
+class AvatarRenditionsTestCase(TestCase):
+
+    # Setup and teardown
+    # ------------------
+    def setUp(self):
+        # Keep generated files out of the real MEDIA_ROOT
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(
+            MEDIA_ROOT=self.media_root,
+            AVATAR_RENDITION_SIZES=(48, 200),
+        )
+        self.settings_override.enable()
+        # rendition listings are cached by profile id and version, and both
+        # are reused between tests
+        cache.clear()
+
+        user = User.objects.create_user(email='alicesmith@test.com',
+                                        password='UPPERlower123456,./!@#')
+        self.profile = UserProfile.objects.create(
+            user=user,
+            date_of_birth=date(1977, 5, 25),
+            bio='This is a test string of more than 10 characters'
+        )
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root)
+
+    # Helper Methods
+    # --------------
+    def set_avatar(self, mode='RGB', size=(800, 600), image_format='PNG'):
+        image_data = BytesIO()
+        Image.new(mode, size).save(image_data, format=image_format)
+        self.profile.avatar = SimpleUploadedFile('test_file.png',
+                                                 image_data.getvalue())
+        self.profile.save()
+        return self.profile.avatar
+
+    # Test Methods
+    # ------------
+    def test_renditions_are_generated_for_each_size(self):
+        avatar = self.set_avatar()
+
+        written = generate_renditions(avatar)
+
+        self.assertEqual(
+            sorted(name for name in written if name.endswith('.jpg')),
+            sorted([rendition_name(avatar.name, 48, '.jpg'),
+                    rendition_name(avatar.name, 200, '.jpg')])
+        )
+        # anything else is a WebP/AVIF variant
+        variant_exts = tuple(ext for ext, _, _ in VARIANT_FORMATS.values())
+        for name in written:
+            self.assertTrue(name.endswith(('.jpg',) + variant_exts))
+        with avatar.storage.open(written[0]) as f:
+            self.assertEqual(Image.open(f).size, (200, 150))
+
+    def test_transparent_avatars_are_kept_as_png(self):
+        avatar = self.set_avatar(mode='RGBA')
+
+        written = generate_renditions(avatar)
+
+        for name in written:
+            self.assertTrue(name.endswith('.png'))
+
+    def test_url_picks_smallest_rendition_at_least_requested_size(self):
+        avatar = self.set_avatar()
+        generate_renditions(avatar)
+
+        self.assertTrue(rendition_url(avatar, 40).endswith('/48.jpg'))
+        self.assertTrue(rendition_url(avatar, 100).endswith('/200.jpg'))
+        # nothing big enough: fall back to the largest we have
+        self.assertTrue(rendition_url(avatar, 400).endswith('/200.jpg'))
+
+    def test_url_falls_back_to_original_without_renditions(self):
+        avatar = self.set_avatar()
+
+        self.assertEqual(rendition_url(avatar, 200), avatar.url)
+
+    def test_renditions_are_listed_once_per_profile_version(self):
+        avatar = self.set_avatar()
+        generate_renditions(avatar)
+        rendition_url(avatar, 48)
+
+        with mock.patch.object(avatar.storage, 'listdir') as listdir:
+            self.assertTrue(rendition_url(avatar, 48).endswith('/48.jpg'))
+            self.assertTrue(rendition_url(avatar, 100).endswith('/200.jpg'))
+        listdir.assert_not_called()
+
+    def test_url_finds_renditions_generated_later(self):
+        avatar = self.set_avatar()
+        self.assertEqual(rendition_url(avatar, 48), avatar.url)
+
+        # as image_edit.tasks.process_avatar does
+        generate_renditions(avatar)
+        UserProfile.objects.filter(pk=self.profile.pk).update(
+            version=F('version') + 1
+        )
+
+        avatar = UserProfile.objects.get(pk=self.profile.pk).avatar
+        self.assertTrue(rendition_url(avatar, 48).endswith('/48.jpg'))
+
+    def test_template_tag_renders_rendition_url(self):
+        avatar = self.set_avatar()
+        generate_renditions(avatar)
+
+        rendered = Template(
+            '{% load avatars %}{% avatar_url avatar 48 %}'
+        ).render(Context({'avatar': avatar}))
+
+        self.assertEqual(rendered, rendition_url(avatar, 48))
+
+    @unittest.skipUnless('WEBP' in variant_formats(),
+                         "Pillow was built without WebP support")
+    def test_webp_variants_are_written_when_smaller(self):
+        avatar = self.set_avatar()
+
+        generate_renditions(avatar)
+
+        self.assertTrue(avatar.storage.exists(
+            rendition_name(avatar.name, 48, '.webp')
+        ))
+        # the pages still link to the JPEG
+        self.assertTrue(rendition_url(avatar, 48).endswith('/48.jpg'))
+
+
+class BestVariantTestCase(TestCase):
+
+    # Setup and teardown
+    # ------------------
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        for filename, size in [('48.jpg', 100), ('48.avif', 60),
+                               ('48.webp', 50), ('96.jpg', 100),
+                               ('96.avif', 60)]:
+            with open(os.path.join(self.directory, filename), 'wb') as f:
+                f.write(b'x' * size)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    # Helper Methods
+    # --------------
+    def best(self, filename, accept):
+        path = best_variant(os.path.join(self.directory, filename), accept)
+        return os.path.basename(path)
+
+    # Test Methods
+    # ------------
+    def test_smallest_accepted_variant_is_chosen(self):
+        accept = 'image/avif,image/webp,image/apng,image/*,*/*;q=0.8'
+
+        self.assertEqual(self.best('48.jpg', accept), '48.webp')
+        self.assertEqual(self.best('96.jpg', accept), '96.avif')
+        self.assertEqual(self.best('48.jpg', 'image/avif'), '48.avif')
+
+    def test_only_listed_types_count(self):
+        self.assertEqual(self.best('48.jpg', '*/*'), '48.jpg')
+        self.assertEqual(self.best('48.jpg', 'image/*'), '48.jpg')
+        self.assertEqual(self.best('48.jpg', 'image/webp;q=0'), '48.jpg')
+        self.assertEqual(self.best('48.jpg', ''), '48.jpg')
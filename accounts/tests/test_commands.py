@@ -0,0 +1,120 @@
+from datetime import date, timedelta
+from io import StringIO
+import os
+import shutil
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from accounts.models import UserProfile
+
+
+User = get_user_model()
+
+
+class CollectAvatarsCommandTestCase(TestCase):
+
+    # Setup and teardown
+    # ------------------
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+
+        user = User.objects.create(email='alicesmith@test.com')
+        UserProfile.objects.create(
+            user=user,
+            date_of_birth=date(1977, 5, 25),
+            bio='This is a test string of more than 10 characters',
+            avatar='avatars/ab/cd/inuse.png',
+        )
+
+        self.kept = [
+            self.make_file('avatars/ab/cd/inuse.png'),
+            self.make_file('renditions/avatars/ab/cd/inuse.png/200.jpg'),
+        ]
+        self.orphans = [
+            self.make_file('avatars/ef/01/orphan.png'),
+            self.make_file('avatars/2'),
+            self.make_file('renditions/avatars/ef/01/orphan.png/200.jpg'),
+        ]
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root)
+
+    # Helper Methods
+    # --------------
+    def make_file(self, name):
+        path = os.path.join(self.media_root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(b'data')
+        return path
+
+    def collect(self, **options):
+        call_command('collect_avatars', min_age=0, batch_size=2,
+                     stdout=StringIO(), **options)
+
+    # Test Methods
+    # ------------
+    def test_unreferenced_files_are_deleted(self):
+        self.collect()
+
+        for path in self.kept:
+            self.assertTrue(os.path.exists(path))
+        for path in self.orphans:
+            self.assertFalse(os.path.exists(path))
+        # along with the directories they leave empty
+        self.assertFalse(
+            os.path.exists(os.path.join(self.media_root, 'avatars/ef'))
+        )
+
+    def test_dry_run_deletes_nothing(self):
+        self.collect(dry_run=True)
+
+        for path in self.kept + self.orphans:
+            self.assertTrue(os.path.exists(path))
+
+    def test_recent_files_are_not_deleted(self):
+        call_command('collect_avatars', stdout=StringIO())
+
+        for path in self.kept + self.orphans:
+            self.assertTrue(os.path.exists(path))
+
+
+class ClearExpiredSessionsCommandTestCase(TestCase):
+
+    def test_only_expired_sessions_are_deleted(self):
+        now = timezone.now()
+        for i in range(5):
+            Session.objects.create(session_key='expired{}'.format(i),
+                                   session_data='',
+                                   expire_date=now - timedelta(days=1))
+        Session.objects.create(session_key='current', session_data='',
+                               expire_date=now + timedelta(days=1))
+
+        call_command('clear_expired_sessions', batch_size=2, pause=0,
+                     stdout=StringIO())
+
+        self.assertEqual(
+            list(Session.objects.values_list('session_key', flat=True)),
+            ['current']
+        )
+
+
+class BenchSessionsCommandTestCase(TestCase):
+
+    def test_every_engine_is_reported(self):
+        out = StringIO()
+
+        call_command('bench_sessions', requests=5, write_every=2, stdout=out)
+
+        for name in ('db', 'cached_db', 'signed_cookies'):
+            self.assertIn(name, out.getvalue())
+        # the benchmark cleans up after itself
+        self.assertFalse(Session.objects.exists())
@@ -0,0 +1,156 @@
+from datetime import date
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+
+from accounts import directory
+from accounts.directory import (InvalidCursor, decode_cursor,
+                                directory_page)
+from accounts.models import UserProfile
+
+
+User = get_user_model()
+
+
+class DirectoryTestCase(TestCase):
+
+    # Setup and teardown
+    # ------------------
+    def setUp(self):
+        self.profiles = [
+            self.create_profile('ann', 'smith', city='Paris', hobby='chess'),
+            self.create_profile('bob', 'jones', city='Rome',
+                                bio='<p>I collect fountain pens</p>'),
+            self.create_profile('cat', 'smith', city='Paris'),
+            self.create_profile('dan', 'adams', hobby='chess'),
+            self.create_profile('eve', 'brown', city='Oslo'),
+        ]
+
+    # Helper Methods
+    # --------------
+    def create_profile(self, given_name, family_name, **kwargs):
+        user = User.objects.create_user(
+            email='{}{}@test.com'.format(given_name, family_name)
+        )
+        kwargs.setdefault('bio', '<p>This is a test bio</p>')
+        return UserProfile.objects.create(
+            user=user,
+            date_of_birth=date(1977, 5, 25),
+            given_name=given_name,
+            family_name=family_name,
+            **kwargs
+        )
+
+    def all_pages(self, page_size, **kwargs):
+        names = []
+        after = None
+        while True:
+            page, after = directory_page(after=after, page_size=page_size,
+                                         **kwargs)
+            names.append([profile.given_name for profile in page])
+            if after is None:
+                return names
+
+    def search(self, text):
+        page, _ = directory_page(text=text)
+        return [profile.given_name for profile in page]
+
+    # Test Methods
+    # ------------
+    def test_pages_follow_family_name_then_id(self):
+        self.assertEqual(self.all_pages(2),
+                         [['dan', 'eve'], ['bob', 'ann'], ['cat']])
+
+    def test_page_is_a_single_query(self):
+        _, after = directory_page(page_size=2)
+
+        with self.assertNumQueries(1):
+            directory_page(after=after, page_size=2)
+
+    def test_filters_are_exact_matches(self):
+        self.assertEqual(self.all_pages(1, filters={'city': 'Paris'}),
+                         [['ann'], ['cat']])
+        self.assertEqual(self.all_pages(10, filters={'hobby': 'chess'}),
+                         [['dan', 'ann']])
+
+    def test_unknown_filters_are_ignored(self):
+        page, _ = directory_page(filters={'email': 'annsmith@test.com'})
+
+        self.assertEqual(len(page), 5)
+
+    def test_inactive_users_are_hidden(self):
+        User.objects.filter(email='bobjones@test.com').update(
+            is_active=False
+        )
+
+        self.assertEqual(self.all_pages(10),
+                         [['dan', 'eve', 'ann', 'cat']])
+
+    def test_search_matches_word_prefixes(self):
+        self.assertEqual(self.search('smi'), ['ann', 'cat'])
+        self.assertEqual(self.search('fountain'), ['bob'])
+        self.assertEqual(self.search('smith chess'), ['ann'])
+        self.assertEqual(self.search('nobody'), [])
+
+    def test_search_treats_input_as_text(self):
+        self.assertEqual(self.search('smith OR "jones" *'), [])
+        self.assertEqual(len(self.search('"*')), 5)
+
+    def test_search_follows_changes(self):
+        profile = self.profiles[0]
+        profile.hobby = 'origami'
+        profile.save()
+        UserProfile.objects.filter(pk=self.profiles[1].pk).update(
+            family_name='origami'
+        )
+        self.profiles[2].delete()
+
+        self.assertEqual(self.search('origami'), ['bob', 'ann'])
+        self.assertEqual(self.search('smith'), ['ann'])
+
+    def test_search_index_is_looked_up_once(self):
+        self.search('smith')
+
+        with self.assertNumQueries(1):
+            self.search('smith')
+
+    def test_search_index_is_looked_up_where_profiles_are_read(self):
+        replica = mock.Mock(profile_search_index=None)
+        replica.introspection.table_names.return_value = []
+        databases = {'default': connection, 'replica': replica}
+
+        with mock.patch.object(directory, 'connections', databases):
+            self.assertFalse(directory.search_index_available('replica'))
+            self.assertTrue(directory.search_index_available('default'))
+            with mock.patch.object(directory.router, 'db_for_read',
+                                   return_value='replica'):
+                self.assertFalse(directory.search_index_available())
+
+    def test_search_without_index(self):
+        available = directory.search_index_available
+        directory.search_index_available = lambda using=None: False
+        try:
+            self.assertEqual(self.search('smi'), ['ann', 'cat'])
+            self.assertEqual(self.search('smith chess'), ['ann'])
+        finally:
+            directory.search_index_available = available
+
+    def test_invalid_cursor(self):
+        for token in ('not a cursor', 'WzFd', 'WyJzbWl0aCIsICIxIl0'):
+            with self.assertRaises(InvalidCursor):
+                decode_cursor(token)
+
+    def test_directory_view(self):
+        url = reverse('accounts:directory')
+
+        response = self.client.get(url, {'city': 'Paris'})
+
+        self.assertContains(response, 'SMITH', count=2)
+        self.assertNotContains(response, 'annsmith@test.com')
+        self.assertNotContains(response, 'Next page')
+
+        response = self.client.get(url, {'after': 'not a cursor'})
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,101 @@
+import csv
+from datetime import date
+from io import StringIO
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from accounts.export import FIELDS, export_rows
+from accounts.models import UserProfile
+
+
+User = get_user_model()
+
+
+class ExportTestCase(TestCase):
+
+    # Setup and teardown
+    # ------------------
+    def setUp(self):
+        alice = User.objects.create_user(email='alicesmith@test.com')
+        UserProfile.objects.create(
+            user=alice,
+            date_of_birth=date(1977, 5, 25),
+            bio='<p>This is a test string of more than 10 characters</p>',
+            given_name='alice',
+            avatar='avatars/ab/cd/abcd.png',
+        )
+        User.objects.create_user(email='bobjones@test.com')
+
+    # Test Methods
+    # ------------
+    def test_rows_are_read_in_a_single_query(self):
+        with self.assertNumQueries(1):
+            rows = list(export_rows(chunk_size=1))
+
+        self.assertEqual([row['email'] for row in rows],
+                         ['alicesmith@test.com', 'bobjones@test.com'])
+        self.assertEqual(rows[0]['date_of_birth'], '1977-05-25')
+        self.assertEqual(rows[0]['avatar_url'],
+                         '/public/media/avatars/ab/cd/abcd.png')
+        self.assertIsNone(rows[1]['given_name'])
+
+    def test_bio_is_sanitized(self):
+        UserProfile.objects.update(
+            bio='<p>Hello</p><script>alert(1)</script>'
+        )
+
+        rows = list(export_rows())
+
+        self.assertEqual(rows[0]['bio'], '<p>Hello</p>')
+        self.assertIsNone(rows[1]['bio'])
+
+    def test_command_writes_csv(self):
+        out = StringIO()
+
+        call_command('export_users', base_url='https://example.com/',
+                     stdout=out, stderr=StringIO())
+
+        rows = list(csv.DictReader(StringIO(out.getvalue())))
+        self.assertEqual(tuple(rows[0]), FIELDS)
+        self.assertEqual(rows[0]['avatar_url'],
+                         'https://example.com/public/media/avatars/ab/cd/'
+                         'abcd.png')
+        self.assertEqual(rows[1]['bio'], '')
+
+    def test_command_writes_jsonl(self):
+        out = StringIO()
+
+        call_command('export_users', format='jsonl', stdout=out,
+                     stderr=StringIO())
+
+        rows = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[0]['given_name'], 'alice')
+
+    def test_view_is_staff_only(self):
+        self.client.force_login(User.objects.get(email='bobjones@test.com'))
+
+        response = self.client.get(reverse('accounts:export_users'))
+
+        self.assertEqual(response.status_code, 302)
+
+    def test_view_streams_export_to_staff(self):
+        staff = User.objects.create_user(email='staff@test.com')
+        staff.is_staff = True
+        staff.save()
+        self.client.force_login(staff)
+
+        response = self.client.get(reverse('accounts:export_users'),
+                                   {'format': 'jsonl'})
+
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(
+            json.loads(lines[0])['avatar_url'],
+            'http://testserver/public/media/avatars/ab/cd/abcd.png'
+        )
@@ -119,3 +119,66 @@ class UserProfileModelTest(TransactionTestCase):
             u = User.objects.get(email=user['email'])
             profile = u.userprofile
             self.assertEqual(user['expected_str'], str(profile))
+
+
+class UserProfileVersionTest(TestCase):
+
+    def setUp(self):
+        self.profile = UserProfile.objects.create(
+            user=User.objects.create(email="test@test.com"),
+            date_of_birth=date(1977, 5, 25),
+            bio="this is a string with more than 10 characters"
+        )
+
+    def test_version_is_bumped_on_every_save(self):
+        version = self.profile.version
+
+        self.profile.save()
+        self.profile.save(update_fields=['hobby'])
+
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.version, version + 2)
+
+    def test_saving_a_stale_copy_still_bumps_the_version(self):
+        stale = UserProfile.objects.get(pk=self.profile.pk)
+
+        self.profile.save()
+        stale.save()
+
+        self.assertEqual(stale.version, self.profile.version + 1)
+        stale.refresh_from_db()
+        self.assertEqual(stale.version, self.profile.version + 1)
+
+
+class UserProfileDisplayNameTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create(email="alicesmith@test.com")
+        self.profile = UserProfile.objects.create(
+            user=self.user,
+            date_of_birth=date(1977, 5, 25),
+            bio="this is a string with more than 10 characters",
+            given_name='alice',
+        )
+
+    def test_display_name_is_stored_on_save(self):
+        self.profile.family_name = 'smith'
+        self.profile.save(update_fields=['family_name'])
+
+        profile = UserProfile.objects.get(pk=self.profile.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(str(profile),
+                             'alice SMITH (alicesmith@test.com)')
+
+    def test_display_name_follows_email_changes(self):
+        self.user.email = 'alice@test.com'
+        self.user.save()
+
+        self.assertEqual(
+            UserProfile.objects.get(pk=self.profile.pk).display_name,
+            'alice (alice@test.com)'
+        )
+
+    def test_other_user_changes_are_ignored(self):
+        with self.assertNumQueries(1):
+            self.user.save(update_fields=['is_active'])
@@ -0,0 +1,99 @@
+from unittest import mock
+
+from django.contrib.auth import get_user, get_user_model
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from accounts.ratelimit import TokenBucket
+
+
+User = get_user_model()
+
+
+class TokenBucketTestCase(TestCase):
+
+    # Setup and teardown
+    # ------------------
+    def setUp(self):
+        self.cache = caches['ratelimit']
+        self.cache.clear()
+        self.bucket = TokenBucket('test', capacity=2, period=10)
+
+    # Test Methods
+    # ------------
+    def test_bucket_allows_burst_then_refuses(self):
+        results = [self.bucket.consume('key', self.cache, now=100)
+                   for _ in range(3)]
+
+        self.assertEqual(results, [True, True, False])
+
+    def test_bucket_refills_over_time(self):
+        self.bucket.consume('key', self.cache, now=100)
+        self.bucket.consume('key', self.cache, now=100)
+
+        # refills at 2 tokens per 10 seconds
+        self.assertFalse(self.bucket.consume('key', self.cache, now=104))
+        self.assertTrue(self.bucket.consume('key', self.cache, now=105))
+
+    def test_keys_have_separate_buckets(self):
+        self.bucket.consume('key', self.cache, now=100)
+        self.bucket.consume('key', self.cache, now=100)
+
+        self.assertTrue(self.bucket.consume('other', self.cache, now=100))
+
+    def test_cache_key_does_not_contain_the_key(self):
+        cache_key = self.bucket.cache_key('alicesmith@test.com')
+
+        self.assertNotIn('alicesmith', cache_key)
+        self.assertNotEqual(cache_key,
+                            self.bucket.cache_key('bobjones@test.com'))
+
+
+@override_settings(SIGN_IN_RATE_LIMITS={'ip': (5, 60), 'email': (2, 60)})
+class SignInThrottleTestCase(TestCase):
+
+    # Setup and teardown
+    # ------------------
+    def setUp(self):
+        caches['ratelimit'].clear()
+        self.credentials = {
+            'username': 'alicesmith@test.com',
+            'password': 'Testing123xyz!,.',
+        }
+        User.objects.create_user(email=self.credentials['username'],
+                                 password=self.credentials['password'])
+
+    # Helper Methods
+    # --------------
+    def sign_in(self, **data):
+        return self.client.post(reverse('accounts:sign_in'),
+                                data={**self.credentials, **data})
+
+    # Test Methods
+    # ------------
+    def test_attempts_over_email_limit_are_refused_without_hashing(self):
+        self.sign_in(password='wrong')
+        self.sign_in(password='wrong', username=' AliceSmith@test.com')
+
+        with mock.patch('users.hashing.check_password') as check:
+            response = self.sign_in()
+
+        self.assertEqual(response.status_code, 429)
+        check.assert_not_called()
+        self.assertFalse(get_user(self.client).is_authenticated)
+
+    def test_attempts_over_ip_limit_are_refused(self):
+        for i in range(5):
+            self.sign_in(username='user{}@test.com'.format(i))
+
+        response = self.sign_in()
+
+        self.assertEqual(response.status_code, 429)
+
+    def test_attempts_under_limit_sign_in(self):
+        self.sign_in(password='wrong')
+
+        self.sign_in()
+
+        self.assertTrue(get_user(self.client).is_authenticated)
@@ -0,0 +1,22 @@
+from django.test import SimpleTestCase
+
+from html_sanitizer import Sanitizer
+
+from accounts.sanitizer import sanitize_bio
+
+
+class SanitizeBioTest(SimpleTestCase):
+
+    def test_scripts_and_images_are_removed(self):
+        cleaned = sanitize_bio(
+            '<p>hello<script>alert(1)</script><img src="x" onerror="y"></p>'
+        )
+
+        self.assertEqual(cleaned, '<p>hello</p>')
+
+    def test_cleans_like_the_default_sanitizer(self):
+        html = ('<h2>About</h2><p><span style="font-weight: bold">a</span> '
+                '<u>b</u> <a href="javascript:x" target="_blank">c</a></p>'
+                '<table><tr><td>d</td></tr></table><p>- e</p><p>f</p>')
+
+        self.assertEqual(sanitize_bio(html), Sanitizer().sanitize(html))
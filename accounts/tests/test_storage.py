@@ -0,0 +1,127 @@
+from datetime import date
+import hashlib
+import os
+import shutil
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from accounts.avatars import rendition_name
+from accounts.models import UserProfile
+from accounts.storage import ContentAddressedStorage, is_content_addressed
+
+
+User = get_user_model()
+
+
+class ContentAddressedStorageTestCase(TestCase):
+
+    def setUp(self):
+        self.location = tempfile.mkdtemp()
+        self.storage = ContentAddressedStorage(location=self.location)
+        self.content = b'some file contents'
+        self.digest = hashlib.sha256(self.content).hexdigest()
+
+    def tearDown(self):
+        shutil.rmtree(self.location)
+
+    def test_file_is_named_after_its_contents(self):
+        name = self.storage.save('avatars/Photo.JPG',
+                                 ContentFile(self.content))
+
+        self.assertEqual(
+            name,
+            'avatars/{}/{}/{}.jpg'.format(self.digest[:2], self.digest[2:4],
+                                          self.digest)
+        )
+        with self.storage.open(name) as f:
+            self.assertEqual(f.read(), self.content)
+
+    def test_identical_files_are_stored_once(self):
+        first = self.storage.save('avatars/a.jpg', ContentFile(self.content))
+        second = self.storage.save('avatars/b.jpg', ContentFile(self.content))
+
+        self.assertEqual(first, second)
+        directory = os.path.dirname(self.storage.path(first))
+        self.assertEqual(os.listdir(directory), [os.path.basename(first)])
+
+    def test_saving_stored_contents_again_touches_the_file(self):
+        name = self.storage.save('avatars/a.jpg', ContentFile(self.content))
+        os.utime(self.storage.path(name), (0, 0))
+
+        self.storage.save('avatars/b.jpg', ContentFile(self.content))
+
+        self.assertGreater(os.path.getmtime(self.storage.path(name)), 0)
+
+    def test_content_addressed_names_are_recognised(self):
+        name = self.storage.save('avatars/a.jpg', ContentFile(self.content))
+
+        self.assertTrue(is_content_addressed(name))
+        self.assertTrue(is_content_addressed(
+            rendition_name(name, 200, '.jpg')
+        ))
+        self.assertFalse(is_content_addressed('avatars/1.jpg'))
+
+
+# TransactionTestCase so that the on_commit deletions actually run
+class AvatarReferenceCountingTestCase(TransactionTestCase):
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(
+            MEDIA_ROOT=self.media_root, AVATAR_RELEASE_GRACE_PERIOD=0,
+        )
+        self.settings_override.enable()
+
+        self.profiles = []
+        for email in ['alicesmith@test.com', 'bobjones@test.com']:
+            user = User.objects.create(email=email)
+            self.profiles.append(UserProfile.objects.create(
+                user=user,
+                date_of_birth=date(1977, 5, 25),
+                bio='This is a test string of more than 10 characters',
+            ))
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root)
+
+    def set_avatar(self, profile, content):
+        profile = UserProfile.objects.get(pk=profile.pk)
+        profile.avatar = ContentFile(content, name='avatar.png')
+        profile.save()
+        return profile.avatar.name
+
+    def test_shared_avatar_is_kept_while_referenced(self):
+        shared = self.set_avatar(self.profiles[0], b'shared')
+        self.assertEqual(self.set_avatar(self.profiles[1], b'shared'), shared)
+
+        self.set_avatar(self.profiles[0], b'something else')
+
+        storage = self.profiles[0].avatar.storage
+        self.assertTrue(storage.exists(shared))
+
+        self.set_avatar(self.profiles[1], b'another thing')
+
+        self.assertFalse(storage.exists(shared))
+
+    def test_deleting_profile_releases_avatar(self):
+        name = self.set_avatar(self.profiles[0], b'mine')
+        storage = self.profiles[0].avatar.storage
+
+        UserProfile.objects.get(pk=self.profiles[0].pk).delete()
+
+        self.assertFalse(storage.exists(name))
+
+    def test_recently_saved_avatar_is_kept_when_released(self):
+        # Another request saved the same contents but hasn't committed the
+        # profile that refers to it yet
+        name = self.set_avatar(self.profiles[0], b'mine')
+        storage = self.profiles[0].avatar.storage
+
+        with self.settings(AVATAR_RELEASE_GRACE_PERIOD=600):
+            self.set_avatar(self.profiles[0], b'something else')
+
+        self.assertTrue(storage.exists(name))
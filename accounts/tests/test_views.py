@@ -1,4 +1,5 @@
 from django.contrib.auth import get_user_model, get_user
+from django.core.cache import cache, caches
 from django.test import Client, TestCase
 from django.urls import resolve, reverse
 
@@ -21,6 +22,10 @@ class AccountViewsTestCase(TestCase):
         self.target_view = None
 
         self.client = Client()
+        # rendered profile fragments are cached by user id, and ids are
+        # reused between tests
+        cache.clear()
+        caches['ratelimit'].clear()
 
     # Test Methods
     # ------------
@@ -137,6 +142,14 @@ class SignInViewTest(AccountViewsTestCase):
         user_after_login = get_user(self.client)
         self.assertTrue(user_after_login.is_authenticated)
 
+    def test_sessions_signed_in_by_model_backend_stay_signed_in(self):
+        self.client.force_login(
+            self.test_user,
+            backend='django.contrib.auth.backends.ModelBackend'
+        )
+
+        self.assertTrue(get_user(self.client).is_authenticated)
+
     def test_specified_user_is_not_logged_in_after_incorrect_username(self):
         bad_username = "bobjones@test.com"
 
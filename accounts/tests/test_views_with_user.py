@@ -3,6 +3,8 @@ from datetime import date
 import unittest
 
 from django.contrib.auth import get_user_model, get_user
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
 from django.test import Client
 from django.urls import reverse
 
@@ -352,3 +354,146 @@ class ChangePasswordViewTest(AccountViewsWithUserTestCase):
         )
 
         self.assertRedirects(response, redirect_target)
+
+
+class ProfileQueryCountTest(AccountViewsWithUserTestCase):
+    """The signed in user and their profile are loaded together by the
+    authentication backend, so rendering a profile page takes one query for
+    the session and one for the user and profile.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.create_userprofile(self.user)
+
+    # Test Methods
+    # ------------
+    def test_profile_queries(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('accounts:profile'))
+        self.assertEqual(response.status_code, 200)
+
+    def test_bio_queries(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('accounts:bio'))
+        self.assertEqual(response.status_code, 200)
+
+    def test_edit_profile_queries(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('accounts:edit_profile'))
+        self.assertEqual(response.status_code, 200)
+
+    def test_anonymous_user_gets_404(self):
+        self.client.logout()
+
+        response = self.client.get(reverse('accounts:bio'))
+
+        self.assertEqual(response.status_code, 404)
+
+
+class ProfileFragmentCacheTest(AccountViewsWithUserTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.userprofile = self.create_userprofile(self.user)
+
+    # Test Methods
+    # ------------
+    def test_bio_is_served_from_cache_until_profile_is_saved(self):
+        self.client.get(reverse('accounts:bio'))
+        # bypasses save(), so the version isn't bumped
+        UserProfile.objects.filter(pk=self.userprofile.pk).update(
+            bio="a bio that only the database knows about"
+        )
+
+        response = self.client.get(reverse('accounts:bio'))
+        self.assertNotContains(response, "only the database knows")
+
+        self.userprofile.bio = "a bio that was saved properly"
+        self.userprofile.save()
+
+        response = self.client.get(reverse('accounts:bio'))
+        self.assertContains(response, "a bio that was saved properly")
+
+    def test_profile_is_rerendered_after_save(self):
+        self.client.get(reverse('accounts:profile'))
+
+        self.userprofile.hobby = 'fountain pen restoration'
+        self.userprofile.save()
+
+        response = self.client.get(reverse('accounts:profile'))
+        self.assertContains(response, 'fountain pen restoration')
+
+    def test_profile_fragment_holds_complete_elements(self):
+        self.client.get(reverse('accounts:profile'))
+
+        fragment = cache.get(make_template_fragment_key(
+            'profile', [self.user.pk, self.userprofile.version,
+                        self.user.email]
+        ))
+        for tag in ('div', 'table', 'h1'):
+            self.assertEqual(fragment.count('<' + tag),
+                             fragment.count('</' + tag + '>'), tag)
+
+
+class ProfileConditionalGetTest(AccountViewsWithUserTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.userprofile = self.create_userprofile(self.user)
+
+    # Test Methods
+    # ------------
+    def test_unchanged_pages_are_not_rendered_again(self):
+        for name in ('accounts:profile', 'accounts:bio'):
+            with self.subTest(name=name):
+                response = self.client.get(reverse(name))
+                self.assertIn('private', response['Cache-Control'])
+
+                with self.assertNumQueries(2):
+                    response = self.client.get(
+                        reverse(name),
+                        HTTP_IF_NONE_MATCH=response['ETag']
+                    )
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response.content, b'')
+
+    def test_last_modified_follows_updated_at(self):
+        response = self.client.get(reverse('accounts:profile'))
+
+        response = self.client.get(
+            reverse('accounts:profile'),
+            HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_changes_invalidate_the_etag(self):
+        etag = self.client.get(reverse('accounts:bio'))['ETag']
+
+        self.userprofile.bio = "a bio that was saved properly"
+        self.userprofile.save(update_fields=['bio'])
+
+        response = self.client.get(reverse('accounts:bio'),
+                                   HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, "a bio that was saved properly")
+
+        etag = response['ETag']
+        self.user.email = 'alice@test.com'
+        self.user.save()
+
+        response = self.client.get(reverse('accounts:profile'),
+                                   HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_pending_messages_are_shown(self):
+        etag = self.client.get(reverse('accounts:profile'))['ETag']
+
+        self.client.post(reverse('accounts:change_password'), {
+            'current_password': self.test_credentials['password'],
+            'new_password': 'AnotherTesting123xyz!,.',
+            'confirm_password': 'AnotherTesting123xyz!,.',
+        })
+
+        response = self.client.get(reverse('accounts:profile'),
+                                   HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, "Password successfully changed")
@@ -20,6 +20,16 @@ urlpatterns = [
             views.bio,
             name='bio'),
 
+    # Public profile directory
+    re_path(r'directory$',
+            views.directory,
+            name='directory'),
+
+    # Admin-only bulk export
+    re_path(r'export$',
+            views.export_users,
+            name='export_users'),
+
     # Custom password-change view
     re_path(r'profile/change_password$',
             views.change_password,
@@ -1,18 +1,38 @@
+import hashlib
+
+from django.conf import settings
 from django.contrib import messages
-from django.contrib.auth import (authenticate, login, logout, get_user_model,
-                                 update_session_auth_hash)
+from django.contrib.auth import login, logout, update_session_auth_hash
 from django.contrib.auth.forms import AuthenticationForm
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import Http404, StreamingHttpResponse
 from django.urls import reverse
-from django.shortcuts import render, get_object_or_404, redirect
-
-from html_sanitizer import Sanitizer
+from django.shortcuts import render, redirect
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
 
 from users.forms import (P7UserCreationForm, P7UserChangeForm,
                          PasswordChangeForm)
 from accounts.models import UserProfile
+from accounts.directory import (FILTER_FIELDS, InvalidCursor,
+                                directory_page)
+from accounts.export import FORMATS, export_lines, export_rows
 from accounts.forms import UserProfileForm
+from accounts.ratelimit import throttle_sign_in
+from accounts.sanitizer import sanitize_bio
+
 
+def _sign_in_limited(request):
+    messages.error(
+        request,
+        "Too many sign in attempts. Please wait a minute and try again."
+    )
+    return render(request, 'accounts/sign_in.html',
+                  {'form': AuthenticationForm()}, status=429)
 
+
+# Turn away attempts over the limit before the password is hashed
+@throttle_sign_in(_sign_in_limited)
 def sign_in(request):
     form = AuthenticationForm()
     if request.method == 'POST':
@@ -42,12 +62,10 @@ def sign_up(request):
 
         form = P7UserCreationForm(data=request.POST)
         if form.is_valid():
-            form.save()
-            user = authenticate(
-                email=form.cleaned_data['email'],
-                password=form.cleaned_data['password1']
-            )
-            login(request, user)
+            # The form has just set the password, so there's no need to pay
+            # for hashing it again by authenticating
+            user = form.save()
+            login(request, user, backend=settings.AUTHENTICATION_BACKENDS[0])
             messages.success(
                 request,
                 "You're now a user! You've been signed in, too."
@@ -63,8 +81,55 @@ def sign_out(request):
     return redirect(reverse('home'))
 
 
+def _current_user(request):
+    """The signed in user, with their profile already loaded (see
+    users.backends.P7ModelBackend), so the views below don't need to query
+    for either of them again.
+    """
+    if not request.user.is_authenticated:
+        raise Http404
+    return request.user
+
+
+def _unchanged_profile(request):
+    """The signed in user's profile, if the profile pages can be answered
+    with 304 Not Modified when the browser's copy is up to date
+    """
+    user = request.user
+    if not user.is_authenticated or not hasattr(user, 'userprofile'):
+        return None
+    # the page would show (and so use up) the pending messages
+    if len(messages.get_messages(request)):
+        return None
+    return user.userprofile
+
+
+def _profile_etag(request):
+    profile = _unchanged_profile(request)
+    if profile is None:
+        return None
+    # the version changes on every save, and the pages show the email too
+    key = '{}:{}:{}'.format(profile.user_id, profile.version,
+                            request.user.email)
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+def _profile_last_modified(request):
+    profile = _unchanged_profile(request)
+    return profile.updated_at if profile is not None else None
+
+
+# The pages are only for the signed in user, and must be revalidated so that
+# changes show up straight away
+_profile_conditional = condition(etag_func=_profile_etag,
+                                last_modified_func=_profile_last_modified)
+_profile_cache_control = cache_control(private=True, no_cache=True)
+
+
+@_profile_cache_control
+@_profile_conditional
 def profile(request):
-    user = get_object_or_404(get_user_model(), pk=request.user.pk)
+    user = _current_user(request)
     if not hasattr(user, 'userprofile'):
         return redirect(reverse('accounts:edit_profile'))
     profile = user.userprofile
@@ -75,7 +140,7 @@ def profile(request):
 
 
 def edit_profile(request):
-    user = get_object_or_404(get_user_model(), pk=request.user.pk)
+    user = _current_user(request)
     if hasattr(user, 'userprofile'):
         up_instance = user.userprofile
     else:
@@ -96,8 +161,7 @@ def edit_profile(request):
             user_form.save()
             profile = profile_form.save(commit=False)
             profile.user = user
-            sanitizer = Sanitizer()
-            profile.bio = sanitizer.sanitize(profile.bio)
+            profile.bio = sanitize_bio(profile.bio)
             profile.save()
             return redirect(reverse('accounts:profile'))
 
@@ -114,8 +178,12 @@ def edit_profile(request):
     return render(request, template, context)
 
 
+@_profile_cache_control
+@_profile_conditional
 def bio(request):
-    user = get_object_or_404(get_user_model(), pk=request.user.pk)
+    user = _current_user(request)
+    if not hasattr(user, 'userprofile'):
+        return redirect(reverse('accounts:edit_profile'))
     profile = user.userprofile
     template = 'accounts/bio.html'
     context = {'user': user,
@@ -140,3 +208,48 @@ def change_password(request):
     template = 'accounts/change_password.html'
     context = {'form': form}
     return render(request, template, context)
+
+
+@staff_member_required
+def export_users(request):
+    """Stream every user and profile as CSV (or JSON lines with
+    ?format=jsonl), without loading them all into memory
+    """
+    file_format = request.GET.get('format', 'csv')
+    if file_format not in FORMATS:
+        raise Http404
+    rows = export_rows(absolute_url=request.build_absolute_uri)
+    response = StreamingHttpResponse(
+        export_lines(file_format, rows),
+        content_type=('text/csv' if file_format == 'csv'
+                      else 'application/x-ndjson'),
+    )
+    response['Content-Disposition'] = (
+        'attachment; filename="users.{}"'.format(file_format)
+    )
+    return response
+
+
+def directory(request):
+    """Public listing of profiles, a page at a time"""
+    filters = {field: request.GET.get(field, '') for field in FILTER_FIELDS}
+    text = request.GET.get('q', '')
+    try:
+        profiles, next_cursor = directory_page(filters, text,
+                                               request.GET.get('after'))
+    except InvalidCursor:
+        raise Http404
+
+    next_query = None
+    if next_cursor:
+        next_query = request.GET.copy()
+        next_query['after'] = next_cursor
+        next_query = next_query.urlencode()
+
+    template = 'accounts/directory.html'
+    context = {'profiles': profiles,
+               'filters': filters,
+               'q': text,
+               'next_query': next_query,
+               'is_first_page': 'after' not in request.GET}
+    return render(request, template, context)
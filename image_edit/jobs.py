@@ -0,0 +1,196 @@
+"""A small background job queue
+
+Work that depends on the size of an uploaded image (decoding, resizing,
+re-encoding) shouldn't hold up a request. Views instead call `enqueue()`,
+which records a `Job` and hands it to the configured backend, and return
+straight away with the job's id so the client can poll for the outcome.
+
+Backends are selected with the `JOB_BACKEND` setting:
+
+- `ImmediateBackend`: runs the job inline. Useful for tests and debugging.
+- `ThreadPoolBackend`: runs jobs on a pool of threads in the web process
+  (`JOB_WORKERS` threads) once the enqueuing transaction has committed.
+- `ProcessPoolBackend`: as above, but with a pool of processes, for work that
+  holds the GIL.
+- `DatabaseBackend`: leaves the job in the database, to be picked up by
+  `manage.py run_jobs`. Jobs survive restarts of the web process, and
+  `run_jobs` retries jobs left running by a worker that died (see
+  `requeue_stale_jobs`).
+
+Tasks are plain functions decorated with `@task`; their arguments and
+return values must be JSON serialisable. A task may be run again after a
+worker dies part way through it, so it should be safe to repeat.
+"""
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import datetime
+import functools
+import json
+import logging
+import multiprocessing
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from project_7.workers import setup_worker_process
+
+from .models import Job
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BACKEND = 'image_edit.jobs.ThreadPoolBackend'
+DEFAULT_WORKERS = 2
+# (seconds) see requeue_stale_jobs
+DEFAULT_TIMEOUT = 15 * 60
+
+
+def task(func):
+    """Mark `func` as a task that may be run by the job queue"""
+    func.is_job_task = True
+    return func
+
+
+def task_name(func):
+    return '{}.{}'.format(func.__module__, func.__name__)
+
+
+def enqueue(func, *args, owner=None):
+    """Queue `func(*args)` to be run by the configured backend.
+
+    Returns the `Job` tracking it.
+    """
+    if not getattr(func, 'is_job_task', False):
+        raise ValueError('{!r} is not a task'.format(func))
+    job = Job.objects.create(
+        task=task_name(func),
+        arguments=json.dumps(args),
+        owner=owner,
+    )
+    get_backend().submit(job.pk)
+    return job
+
+
+def run_job(job_id):
+    """Run the job with id `job_id`, if nobody else has claimed it yet.
+
+    Returns True if the job was run.
+    """
+    # Claim the job. The conditional update makes sure that only one worker
+    # runs it even if several backends see it.
+    # (update() doesn't set updated_at by itself, and requeue_stale_jobs
+    # needs to know when the job started)
+    claimed = Job.objects.filter(pk=job_id, status=Job.PENDING).update(
+        status=Job.RUNNING, updated_at=timezone.now()
+    )
+    if not claimed:
+        return False
+
+    job = Job.objects.get(pk=job_id)
+    try:
+        func = import_string(job.task)
+        if not getattr(func, 'is_job_task', False):
+            raise ValueError('{} is not a task'.format(job.task))
+        result = func(*json.loads(job.arguments))
+    except Exception as e:
+        logger.exception('Job %s failed', job)
+        job.status = Job.FAILED
+        job.result = str(e)
+    else:
+        job.status = Job.DONE
+        job.result = json.dumps(result)
+    job.save(update_fields=['status', 'result', 'updated_at'])
+    return True
+
+
+def requeue_stale_jobs():
+    """Put jobs that have been running for more than `JOB_TIMEOUT` seconds
+    back in the queue, on the assumption that the worker running them died.
+
+    Returns the number of jobs requeued.
+    """
+    timeout = getattr(settings, 'JOB_TIMEOUT', DEFAULT_TIMEOUT)
+    now = timezone.now()
+    requeued = Job.objects.filter(
+        status=Job.RUNNING,
+        updated_at__lt=now - datetime.timedelta(seconds=timeout),
+    ).update(status=Job.PENDING, updated_at=now)
+    if requeued:
+        logger.warning('Requeued %d job(s) running for over %ds',
+                       requeued, timeout)
+    return requeued
+
+
+def _run_job_in_worker(job_id):
+    try:
+        run_job(job_id)
+    finally:
+        # Workers are long-lived threads; don't let them hold connections
+        # open beyond CONN_MAX_AGE
+        close_old_connections()
+
+
+# Backends
+# --------
+class ImmediateBackend(object):
+    """Runs jobs synchronously, as soon as they are enqueued"""
+
+    def submit(self, job_id):
+        run_job(job_id)
+
+
+class DatabaseBackend(object):
+    """Leaves jobs in the database for `manage.py run_jobs` to process"""
+
+    def submit(self, job_id):
+        pass
+
+
+class PoolBackend(object):
+    """Runs jobs in an executor pool once the current transaction commits
+    (otherwise the worker might not be able to see the job yet).
+    """
+    executor_class = None
+
+    def __init__(self):
+        self.workers = getattr(settings, 'JOB_WORKERS', DEFAULT_WORKERS)
+        self.executor = self.make_executor()
+
+    def make_executor(self):
+        return self.executor_class(max_workers=self.workers)
+
+    def submit(self, job_id):
+        transaction.on_commit(
+            lambda: self.executor.submit(_run_job_in_worker, job_id)
+        )
+
+
+class ThreadPoolBackend(PoolBackend):
+    executor_class = ThreadPoolExecutor
+
+    def make_executor(self):
+        return self.executor_class(max_workers=self.workers,
+                                   thread_name_prefix='jobs')
+
+
+class ProcessPoolBackend(PoolBackend):
+    executor_class = ProcessPoolExecutor
+
+    def make_executor(self):
+        # 'spawn' so that workers don't inherit the parent's open database
+        # connections
+        return self.executor_class(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=setup_worker_process,
+        )
+
+
+@functools.lru_cache(maxsize=None)
+def _load_backend(path):
+    return import_string(path)()
+
+
+def get_backend():
+    return _load_backend(getattr(settings, 'JOB_BACKEND', DEFAULT_BACKEND))
@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from image_edit.jobs import requeue_stale_jobs, run_job
+from image_edit.models import Job
+
+
+class Command(BaseCommand):
+    help = ("Process pending background jobs. Needed when JOB_BACKEND is "
+            "image_edit.jobs.DatabaseBackend")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true',
+            help="Process the jobs that are pending now, then exit",
+        )
+        parser.add_argument(
+            '--interval', type=float, default=1.0,
+            help="Seconds to wait between polls when there is no work",
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=20,
+            help="Number of pending jobs to fetch per poll",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            close_old_connections()
+            requeue_stale_jobs()
+            job_ids = list(
+                Job.objects.filter(status=Job.PENDING)
+                .order_by('id')
+                .values_list('id', flat=True)[:options['batch_size']]
+            )
+            processed = sum(run_job(job_id) for job_id in job_ids)
+            if processed:
+                self.stdout.write("Processed {} job(s)".format(processed))
+
+            if options['once'] and not job_ids:
+                break
+            if not job_ids:
+                time.sleep(options['interval'])
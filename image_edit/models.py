@@ -0,0 +1,55 @@
+from django.conf import settings
+from django.db import models
+
+
+class Job(models.Model):
+    """A unit of background work (see image_edit.jobs)
+
+    Every enqueued task gets a row, whichever backend runs it, so that
+    clients can poll for its status.
+    """
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    )
+
+    # dotted path of the task function
+    task = models.CharField(max_length=255)
+    # JSON encoded list of positional arguments
+    arguments = models.TextField(default='[]')
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=PENDING
+    )
+    # JSON encoded return value, or the error message if the task failed
+    result = models.TextField(blank=True, default='')
+
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        blank=True,
+        null=True
+    )
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # workers look for the oldest pending jobs
+            models.Index(fields=['status', 'id']),
+        ]
+
+    def __str__(self):
+        return '{} #{} ({})'.format(self.task, self.pk, self.status)
+
+    @property
+    def finished(self):
+        return self.status in (self.DONE, self.FAILED)
@@ -0,0 +1,66 @@
+"""Background tasks (see image_edit.jobs)"""
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.db.models import F
+from django.utils import timezone
+
+from accounts.avatars import generate_renditions, has_alpha
+from accounts.models import UserProfile
+
+from . import transforms
+from .jobs import task
+
+
+@task
+def process_avatar(profile_id, avatar_name):
+    """Generate the renditions for a newly uploaded avatar.
+
+    `avatar_name` is the avatar the job was queued for: if the user has
+    uploaded another one since, there is nothing to do.
+    """
+    profile = UserProfile.objects.get(pk=profile_id)
+    if profile.avatar.name != avatar_name:
+        return []
+    written = generate_renditions(profile.avatar)
+    # pages cached before the renditions existed link to the original
+    UserProfile.objects.filter(pk=profile_id).update(
+        version=F('version') + 1, updated_at=timezone.now()
+    )
+    return written
+
+
+@task
+def transform_avatar(profile_id, upload_name, operations, avatar_name):
+    """Apply the cropper's `operations` (see image_edit.transforms) to the
+    uploaded image `upload_name`, make the result the profile's avatar and
+    generate its renditions.
+
+    `avatar_name` is the avatar the profile had when the job was queued: if
+    the user has uploaded another one since, there is nothing to do.
+    """
+    profile = UserProfile.objects.get(pk=profile_id)
+    if (profile.avatar.name or '') != avatar_name:
+        return []
+    storage = profile._meta.get_field('avatar').storage
+    with storage.open(upload_name, 'rb') as f:
+        image = transforms.transform_image(f, operations)
+    profile.avatar = _encode_image(image)
+    # (only the avatar: the user may have edited their profile meanwhile)
+    profile.save(update_fields=['avatar'])
+    return process_avatar(profile.pk, profile.avatar.name)
+
+
+def _encode_image(image):
+    """Encode a PIL image as a file suitable for saving as an avatar"""
+    if has_alpha(image):
+        image_format, ext = 'PNG', '.png'
+        options = {'optimize': True}
+        image = image.convert('RGBA')
+    else:
+        image_format, ext = 'JPEG', '.jpg'
+        options = {'quality': 90, 'optimize': True}
+        image = image.convert('RGB')
+    buffer = BytesIO()
+    image.save(buffer, format=image_format, **options)
+    return ContentFile(buffer.getvalue(), name='avatar' + ext)
@@ -0,0 +1,149 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from io import StringIO
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from image_edit.jobs import ThreadPoolBackend, enqueue, run_job, task
+from image_edit.models import Job
+
+
+User = get_user_model()
+
+
+# Tasks used by the tests
+# -----------------------
+@task
+def add(a, b):
+    return a + b
+
+
+@task
+def explode():
+    raise RuntimeError("boom")
+
+
+def not_a_task():
+    pass
+
+
+@override_settings(JOB_BACKEND='image_edit.jobs.ImmediateBackend')
+class ImmediateBackendTestCase(TestCase):
+
+    def test_job_is_run_when_enqueued(self):
+        job = enqueue(add, 2, 3)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.DONE)
+        self.assertEqual(json.loads(job.result), 5)
+
+    def test_failing_job_is_marked_failed(self):
+        job = enqueue(explode)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertEqual(job.result, "boom")
+
+    def test_only_tasks_can_be_enqueued(self):
+        with self.assertRaises(ValueError):
+            enqueue(not_a_task)
+
+
+@override_settings(JOB_BACKEND='image_edit.jobs.DatabaseBackend')
+class DatabaseBackendTestCase(TestCase):
+
+    def test_job_waits_for_worker(self):
+        job = enqueue(add, 2, 3)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.PENDING)
+
+    def test_run_jobs_command_processes_pending_jobs(self):
+        jobs = [enqueue(add, i, i) for i in range(3)]
+
+        call_command('run_jobs', once=True, stdout=StringIO())
+
+        for i, job in enumerate(jobs):
+            job.refresh_from_db()
+            self.assertEqual(job.status, Job.DONE)
+            self.assertEqual(json.loads(job.result), i + i)
+
+    def test_job_is_only_run_once(self):
+        job = enqueue(add, 2, 3)
+
+        self.assertTrue(run_job(job.pk))
+        self.assertFalse(run_job(job.pk))
+
+    def test_run_jobs_command_retries_jobs_left_running(self):
+        stale = enqueue(add, 2, 3)
+        running = enqueue(add, 4, 5)
+        Job.objects.filter(pk=stale.pk).update(
+            status=Job.RUNNING,
+            updated_at=timezone.now() - timedelta(hours=1),
+        )
+        Job.objects.filter(pk=running.pk).update(
+            status=Job.RUNNING, updated_at=timezone.now()
+        )
+
+        call_command('run_jobs', once=True, stdout=StringIO())
+
+        stale.refresh_from_db()
+        self.assertEqual(stale.status, Job.DONE)
+        running.refresh_from_db()
+        self.assertEqual(running.status, Job.RUNNING)
+
+
+class PoolBackendTestCase(TestCase):
+
+    @override_settings(JOB_WORKERS=1)
+    def test_executor_is_made_from_executor_class(self):
+        backend = ThreadPoolBackend()
+        try:
+            self.assertIsInstance(backend.executor, ThreadPoolExecutor)
+            self.assertEqual(backend.executor._max_workers, 1)
+        finally:
+            backend.executor.shutdown()
+
+
+@override_settings(JOB_BACKEND='image_edit.jobs.DatabaseBackend')
+class JobStatusViewTestCase(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='alicesmith@test.com',
+            password='UPPERlower123456,./!@#'
+        )
+        self.job = enqueue(add, 2, 3, owner=self.user)
+        self.url = reverse('image_edit:job_status',
+                           kwargs={'job_id': self.job.pk})
+
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def test_owner_can_see_job_status(self):
+        response = self.client.get(self.url)
+        self.assertEqual(json.loads(response.content.decode())['status'],
+                         Job.PENDING)
+
+        run_job(self.job.pk)
+
+        response = self.client.get(self.url)
+        response_dict = json.loads(response.content.decode())
+        self.assertEqual(response_dict['status'], Job.DONE)
+        self.assertTrue(response_dict['finished'])
+
+    def test_other_users_cannot_see_job_status(self):
+        other_user = User.objects.create_user(
+            email='bobjones@test.com',
+            password='UPPERlower123456,./!@#'
+        )
+        self.client.force_login(other_user)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,115 @@
+import os
+
+from django.test import SimpleTestCase
+
+from PIL import Image
+
+from image_edit.transforms import (InvalidOperation, apply_operations,
+                                   limit_size, parse_operations)
+
+
+class ParseOperationsTestCase(SimpleTestCase):
+
+    def test_valid_operations_are_returned(self):
+        data = ('[{"op": "rotate", "angle": -90},'
+                ' {"op": "flip", "axis": "vertical"},'
+                ' {"op": "crop", "x": 1, "y": 2, "width": 3, "height": 4}]')
+
+        operations = parse_operations(data)
+
+        self.assertEqual([o['op'] for o in operations],
+                         ['rotate', 'flip', 'crop'])
+
+    def test_missing_operations_are_an_empty_list(self):
+        self.assertEqual(parse_operations(None), [])
+
+    def test_invalid_operations_are_rejected(self):
+        invalid_inputs = [
+            'not json',
+            '{"op": "rotate", "angle": 90}',
+            '[{"op": "rotate", "angle": 45}]',
+            '[{"op": "flip", "axis": "diagonal"}]',
+            '[{"op": "crop", "x": "1", "y": 2, "width": 3, "height": 4}]',
+            '[{"op": "explode"}]',
+            '[{"op": "crop", "x": NaN, "y": 2, "width": 3, "height": 4}]',
+            '[{"op": "crop", "x": 1, "y": 2, "width": Infinity, '
+            '"height": 4}]',
+            '[{"op": "crop", "x": true, "y": 2, "width": 3, "height": 4}]',
+            '[{"op": "rotate", "angle": false}]',
+        ]
+        for data in invalid_inputs:
+            with self.assertRaises(InvalidOperation):
+                parse_operations(data)
+
+
+class ApplyOperationsTestCase(SimpleTestCase):
+
+    def setUp(self):
+        # random pixels, so that any misplaced pixel shows up
+        self.image = Image.frombytes('RGB', (7, 5), os.urandom(7 * 5 * 3))
+
+    def assertSameImage(self, first, second):
+        self.assertEqual(first.size, second.size)
+        self.assertEqual(first.tobytes(), second.tobytes())
+
+    def test_rotations_match_transpose(self):
+        expected = {
+            90: Image.ROTATE_270,  # PIL's constants are anticlockwise
+            -90: Image.ROTATE_90,
+            180: Image.ROTATE_180,
+            270: Image.ROTATE_90,
+        }
+        for angle, method in expected.items():
+            result = apply_operations(self.image,
+                                      [{'op': 'rotate', 'angle': angle}])
+            self.assertSameImage(result, self.image.transpose(method))
+
+    def test_flips_match_transpose(self):
+        result = apply_operations(self.image,
+                                  [{'op': 'flip', 'axis': 'horizontal'}])
+        self.assertSameImage(result,
+                             self.image.transpose(Image.FLIP_LEFT_RIGHT))
+
+        result = apply_operations(self.image,
+                                  [{'op': 'flip', 'axis': 'vertical'}])
+        self.assertSameImage(result,
+                             self.image.transpose(Image.FLIP_TOP_BOTTOM))
+
+    def test_operations_are_applied_in_order(self):
+        operations = [
+            {'op': 'rotate', 'angle': 90},
+            {'op': 'flip', 'axis': 'horizontal'},
+            {'op': 'crop', 'x': 1, 'y': 2, 'width': 3, 'height': 4},
+        ]
+        expected = (self.image
+                    .transpose(Image.ROTATE_270)
+                    .transpose(Image.FLIP_LEFT_RIGHT)
+                    .crop((1, 2, 4, 6)))
+
+        result = apply_operations(self.image, operations)
+
+        self.assertSameImage(result, expected)
+
+    def test_crop_box_is_clamped_to_image(self):
+        result = apply_operations(
+            self.image,
+            [{'op': 'crop', 'x': -3, 'y': 2, 'width': 100, 'height': 100}]
+        )
+
+        self.assertSameImage(result, self.image.crop((0, 2, 7, 5)))
+
+    def test_no_operations_returns_image_unchanged(self):
+        self.assertIs(apply_operations(self.image, []), self.image)
+
+
+class LimitSizeTestCase(SimpleTestCase):
+
+    def test_large_images_are_scaled_down(self):
+        image = Image.new('RGB', (1000, 500))
+
+        self.assertEqual(limit_size(image, 200).size, (200, 100))
+
+    def test_small_images_are_unchanged(self):
+        image = Image.new('RGB', (100, 50))
+
+        self.assertIs(limit_size(image, 200), image)
@@ -1,18 +1,22 @@
 from datetime import date
 from io import BytesIO
 import json
+import os
 import unittest
+from unittest import mock
 
 from django.contrib.auth import get_user_model, get_user
 from django.core.files.base import ContentFile
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import Client, TestCase
+from django.test import Client, TestCase, override_settings
 from django.urls import resolve, reverse
 
 from PIL import Image
 
 from accounts.models import UserProfile
-from image_edit.views import cropper, upload_image
+from image_edit.models import Job
+from image_edit.uploadhandlers import BoundedImageUploadHandler
+from image_edit.views import cropper, transform_image, upload_image
 
 
 User = get_user_model()
@@ -80,6 +84,7 @@ class UploadImageViewTestCase(ImageEditViewsTestCase):
         self.name += 'upload_image'
         self.target_view = upload_image
         self.url += 'upload_image'
+        self.task = 'image_edit.tasks.process_avatar'
 
         test_user_credentials = {
             'email': 'alicesmith@test.com',
@@ -200,3 +205,148 @@ class UploadImageViewTestCase(ImageEditViewsTestCase):
         )
 
         self.assertIsNotNone(self.test_user.userprofile.avatar)
+
+    def test_view_rejects_non_image_upload(self):
+        form_data = {
+            'image': SimpleUploadedFile('test_file.jpg', b'not an image')
+        }
+
+        response = self.client.post(reverse(self.name), form_data)
+
+        response_dict = json.loads(response.content.decode())
+        self.assertEqual(response_dict['status'], 0)
+        self.assertEqual(response_dict['message'],
+                         BoundedImageUploadHandler.error_msg['not_image'])
+        self.test_user.userprofile.refresh_from_db()
+        self.assertFalse(self.test_user.userprofile.avatar)
+
+    def test_view_accepts_jpeg_with_large_metadata(self):
+        # ~200KB of ICC profile (in several APP2 segments) and ~60KB of EXIF
+        # all come before the JPEG's dimensions
+        image_data = BytesIO()
+        Image.new('RGB', (100, 100)).save(
+            image_data, format='JPEG',
+            # an empty little-endian TIFF directory, padded
+            exif=(b'Exif\x00\x00II*\x00\x08\x00\x00\x00'
+                  b'\x00\x00\x00\x00\x00\x00' + b'\x00' * 60000),
+            icc_profile=b'\x00' * 200000,
+        )
+        form_data = {
+            'image': SimpleUploadedFile('test_file.jpg',
+                                        image_data.getvalue())
+        }
+
+        response = self.client.post(reverse(self.name), form_data)
+
+        response_dict = json.loads(response.content.decode())
+        self.assertEqual(response_dict['status'], 1)
+
+    def test_view_rejects_oversized_upload(self):
+        with self.settings(AVATAR_UPLOAD_MAX_SIZE=100):
+            response = self.client.post(reverse(self.name), self.form_data)
+
+        response_dict = json.loads(response.content.decode())
+        self.assertEqual(response_dict['status'], 0)
+        self.assertEqual(response_dict['message'],
+                         BoundedImageUploadHandler.error_msg['too_large'])
+        self.test_user.userprofile.refresh_from_db()
+        self.assertFalse(self.test_user.userprofile.avatar)
+
+    def test_view_still_requires_csrf_token(self):
+        csrf_client = Client(enforce_csrf_checks=True)
+        csrf_client.force_login(self.test_user)
+
+        response = csrf_client.post(reverse(self.name), self.form_data)
+
+        self.assertEqual(response.status_code, 403)
+
+    def test_view_queues_avatar_processing(self):
+        response = self.client.post(reverse(self.name), self.form_data)
+
+        response_dict = json.loads(response.content.decode())
+        job = Job.objects.get(pk=response_dict['job'])
+        self.assertEqual(job.task, self.task)
+        self.assertEqual(job.owner, self.test_user)
+        self.assertEqual(
+            response_dict['job_url'],
+            reverse('image_edit:job_status', kwargs={'job_id': job.pk})
+        )
+
+
+class TransformImageViewTestCase(UploadImageViewTestCase):
+    """Everything that applies to plain uploads also applies here"""
+
+    def setUp(self):
+        super().setUp()
+        self.name = 'image_edit:transform_image'
+        self.target_view = transform_image
+        self.url = '/avatar/transform_image'
+        self.task = 'image_edit.tasks.transform_avatar'
+
+    @override_settings(JOB_BACKEND='image_edit.jobs.ImmediateBackend')
+    def test_view_applies_operations(self):
+        self.form_data['operations'] = json.dumps([
+            {'op': 'rotate', 'angle': 90},
+            {'op': 'crop', 'x': 0, 'y': 0, 'width': 64, 'height': 32},
+        ])
+
+        response = self.client.post(reverse(self.name), self.form_data)
+
+        response_dict = json.loads(response.content.decode())
+        self.assertEqual(response_dict['status'], 1)
+        self.test_user.userprofile.refresh_from_db()
+        with self.test_user.userprofile.avatar.open() as f:
+            self.assertEqual(Image.open(f).size, (64, 32))
+
+    def test_view_leaves_the_image_to_the_job(self):
+        self.form_data['operations'] = '[{"op": "rotate", "angle": 90}]'
+
+        with mock.patch('image_edit.transforms.transform_image') as transform:
+            response = self.client.post(reverse(self.name), self.form_data)
+
+        transform.assert_not_called()
+        job = Job.objects.get(pk=json.loads(response.content.decode())['job'])
+        self.assertEqual(job.status, Job.PENDING)
+        self.test_user.userprofile.refresh_from_db()
+        self.assertFalse(self.test_user.userprofile.avatar)
+
+    def test_view_requires_a_signed_in_user(self):
+        self.client.logout()
+
+        response = self.client.post(reverse(self.name), self.form_data)
+
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(Job.objects.exists())
+
+    def test_view_rejects_invalid_operations(self):
+        self.form_data['operations'] = '[{"op": "explode"}]'
+
+        response = self.client.post(reverse(self.name), self.form_data)
+
+        response_dict = json.loads(response.content.decode())
+        self.assertEqual(response_dict['status'], 0)
+        self.assertFalse(Job.objects.exists())
+        self.test_user.userprofile.refresh_from_db()
+        self.assertFalse(self.test_user.userprofile.avatar)
+
+    @override_settings(JOB_BACKEND='image_edit.jobs.ImmediateBackend')
+    def test_job_fails_on_undecodable_image(self):
+        # a valid header, but the pixel data is cut short
+        buffer = BytesIO()
+        Image.frombytes('RGB', (128, 128), os.urandom(128 * 128 * 3)).save(
+            buffer, format='JPEG'
+        )
+        image_data = buffer.getvalue()
+        self.form_data = {
+            'image': SimpleUploadedFile('test_file.jpg',
+                                        image_data[:len(image_data) // 2]),
+            'operations': '[{"op": "rotate", "angle": 90}]',
+        }
+
+        with self.assertLogs('image_edit.jobs', 'ERROR'):
+            response = self.client.post(reverse(self.name), self.form_data)
+
+        job = Job.objects.get(pk=json.loads(response.content.decode())['job'])
+        self.assertEqual(job.status, Job.FAILED)
+        self.test_user.userprofile.refresh_from_db()
+        self.assertFalse(self.test_user.userprofile.avatar)
@@ -0,0 +1,173 @@
+"""Server-side image transforms
+
+Rather than re-encoding the edited image in the browser (slow on phones, and
+PNG canvases are huge), the cropper uploads the original image once along
+with the list of operations the user performed, e.g.:
+
+    [{"op": "rotate", "angle": 90},
+     {"op": "flip", "axis": "horizontal"},
+     {"op": "crop", "x": 10, "y": 20, "width": 300, "height": 300}]
+
+Operations apply in order, each in the coordinates of the image produced by
+the operations before it. Rotations are clockwise, in multiples of 90
+degrees.
+
+All of the operations are combined into a single affine transform, so
+however many there are the pixels are only resampled once. Because the
+operations only ever move whole pixels, nearest-neighbour sampling gives an
+exact result.
+"""
+import json
+import math
+
+from django.conf import settings
+
+from PIL import Image, ImageOps
+
+
+MAX_OPERATIONS = 50
+
+# (px) default limit on the longest side of a transformed avatar
+DEFAULT_MAX_DIMENSION = 800
+
+
+class InvalidOperation(ValueError):
+    pass
+
+
+def is_number(value):
+    """True for finite ints and floats (json.loads accepts NaN and Infinity,
+    and bools are ints)
+    """
+    return (isinstance(value, (int, float)) and not isinstance(value, bool)
+            and math.isfinite(value))
+
+
+def parse_operations(data):
+    """Decode and validate a JSON list of operations"""
+    try:
+        operations = json.loads(data or '[]')
+    except ValueError:
+        raise InvalidOperation("Operations must be valid JSON")
+    if not isinstance(operations, list):
+        raise InvalidOperation("Operations must be a list")
+    if len(operations) > MAX_OPERATIONS:
+        raise InvalidOperation("Too many operations")
+
+    for operation in operations:
+        if not isinstance(operation, dict):
+            raise InvalidOperation("Each operation must be an object")
+        op = operation.get('op')
+        if op == 'crop':
+            for key in ('x', 'y', 'width', 'height'):
+                if not is_number(operation.get(key)):
+                    raise InvalidOperation("Crop needs a numeric " + key)
+        elif op == 'rotate':
+            angle = operation.get('angle')
+            if isinstance(angle, bool) or angle not in (-270, -180, -90, 0,
+                                                        90, 180, 270):
+                raise InvalidOperation("Rotation must be a multiple of 90")
+        elif op == 'flip':
+            if operation.get('axis', 'horizontal') not in ('horizontal',
+                                                           'vertical'):
+                raise InvalidOperation("Flip axis must be horizontal or "
+                                       "vertical")
+        else:
+            raise InvalidOperation("Unknown operation: {!r}".format(op))
+    return operations
+
+
+# Affine matrices
+# ---------------
+# A matrix ((a, b, c), (d, e, f)) maps a point (x, y) in the output image to
+# the point (a*x + b*y + c, d*x + e*y + f) in the input image, which is the
+# form Image.transform expects.
+IDENTITY = ((1, 0, 0), (0, 1, 0))
+
+
+def _compose(m, n):
+    """The matrix that applies `n` then `m`"""
+    return tuple(
+        (m[i][0] * n[0][0] + m[i][1] * n[1][0],
+         m[i][0] * n[0][1] + m[i][1] * n[1][1],
+         m[i][0] * n[0][2] + m[i][1] * n[1][2] + m[i][2])
+        for i in range(2)
+    )
+
+
+def _step(operation, width, height):
+    """Return (matrix, new_width, new_height) for a single operation on an
+    image of the given size.
+    """
+    op = operation['op']
+    if op == 'crop':
+        x = min(max(int(round(operation['x'])), 0), width - 1)
+        y = min(max(int(round(operation['y'])), 0), height - 1)
+        w = min(max(int(round(operation['width'])), 1), width - x)
+        h = min(max(int(round(operation['height'])), 1), height - y)
+        return ((1, 0, x), (0, 1, y)), w, h
+
+    if op == 'rotate':
+        angle = operation['angle'] % 360
+        if angle == 90:
+            return ((0, 1, 0), (-1, 0, height)), height, width
+        if angle == 180:
+            return ((-1, 0, width), (0, -1, height)), width, height
+        if angle == 270:
+            return ((0, -1, width), (1, 0, 0)), height, width
+        return IDENTITY, width, height
+
+    # flip
+    if operation.get('axis', 'horizontal') == 'horizontal':
+        return ((-1, 0, width), (0, 1, 0)), width, height
+    return ((1, 0, 0), (0, -1, height)), width, height
+
+
+def apply_operations(image, operations):
+    """Apply `operations` (already validated) to `image` in a single pass"""
+    matrix = IDENTITY
+    width, height = image.size
+    for operation in operations:
+        step, width, height = _step(operation, width, height)
+        matrix = _compose(matrix, step)
+
+    (a, b, c), (d, e, f) = matrix
+    if (a, b, d, e) == (1, 0, 0, 1):
+        # only cropping (or nothing at all): no need to resample
+        if (width, height) == image.size:
+            return image
+        return image.crop((c, f, c + width, f + height))
+    return image.transform((width, height), Image.AFFINE,
+                           data=(a, b, c, d, e, f),
+                           resample=Image.NEAREST)
+
+
+def limit_size(image, max_dimension):
+    """Scale `image` down so its longest side is at most `max_dimension`"""
+    width, height = image.size
+    factor = max(width, height) / max_dimension
+    if factor <= 1:
+        return image
+
+    # Box-averaging by a whole factor first is much cheaper than resampling
+    # the full image (Image.reduce is available from Pillow 7)
+    if factor >= 2 and hasattr(image, 'reduce'):
+        image = image.reduce(int(factor))
+
+    size = (max(1, round(width / factor)), max(1, round(height / factor)))
+    return image.resize(size, Image.LANCZOS)
+
+
+def transform_image(fp, operations):
+    """Open the image in `fp`, apply `operations` and limit its size.
+
+    Returns the transformed (loaded) image.
+    """
+    image = Image.open(fp)
+    # Browsers (and the cropper) display images the right way up according
+    # to their EXIF orientation, so the operations' coordinates assume that
+    image = ImageOps.exif_transpose(image)
+    image = apply_operations(image, operations)
+    max_dimension = getattr(settings, 'AVATAR_MAX_DIMENSION',
+                            DEFAULT_MAX_DIMENSION)
+    return limit_size(image, max_dimension)
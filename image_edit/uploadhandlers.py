@@ -0,0 +1,176 @@
+"""Upload handling for avatar images
+
+Django's default upload handlers buffer small files in memory and happily
+accept any payload up to the size of the request. For avatar uploads we want
+worker memory to stay flat however many large uploads arrive at once, so
+`BoundedImageUploadHandler`:
+
+- always streams the upload to a temporary file on disk,
+- refuses requests larger than `AVATAR_UPLOAD_MAX_SIZE` before reading the
+  body, and stops reading as soon as an upload goes over that size,
+- stops reading straight away if the upload doesn't start like an image
+  file of a known format,
+- checks the image header with Pillow (which only parses the header, it does
+  not decode the pixel data) once enough bytes have arrived, and stops
+  reading if the image is too large to handle.
+
+See: https://docs.djangoproject.com/en/2.2/topics/http/file-uploads/#upload-handlers
+"""
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.core.files.uploadhandler import (FileUploadHandler, SkipFile,
+                                             StopUpload)
+from django.http import QueryDict
+from django.utils.datastructures import MultiValueDict
+
+from PIL import Image
+
+
+# (bytes) default maximum size of an uploaded avatar
+DEFAULT_MAX_SIZE = 10 * 1024 * 1024
+
+# (bytes) how much of the file to collect before first asking Pillow for the
+# image's dimensions. A JPEG can have several metadata segments (EXIF, ICC
+# profile, XMP...) of up to 64KB each before its dimensions, so while Pillow
+# can't find them the check is repeated each time the collected size doubles,
+# up to MAX_HEADER_SIZE.
+HEADER_SIZE = 64 * 1024
+MAX_HEADER_SIZE = 1024 * 1024
+
+# The first bytes of the formats Pillow can read that avatars may be in
+SIGNATURES = (
+    b'\xff\xd8\xff',  # JPEG
+    b'\x89PNG\r\n\x1a\n',
+    b'GIF87a',
+    b'GIF89a',
+    b'BM',  # BMP
+    b'II*\x00',  # TIFF
+    b'MM\x00*',
+    b'RIFF',  # WebP (checked further in looks_like_image)
+)
+
+# (bytes) enough to tell the formats apart
+SIGNATURE_SIZE = 12
+
+# (bytes) allowance for the multipart boundaries and headers around the file
+MULTIPART_OVERHEAD = 16 * 1024
+
+
+def looks_like_image(data):
+    """True if `data` starts like a file in one of the known formats"""
+    if data.startswith(b'RIFF'):
+        return data[8:12] == b'WEBP'
+    return data.startswith(SIGNATURES)
+
+
+class BoundedImageUploadHandler(FileUploadHandler):
+    """Streams a single image upload to disk, aborting early if the upload is
+    too large or is not an image.
+
+    If the upload is rejected, the reason is available as `self.error` and
+    no file is added to `request.FILES`.
+    """
+    error_msg = {
+        'too_large': "Image file is too large",
+        'not_image': "Uploaded file is not a supported image",
+        'too_many_pixels': "Image dimensions are too large",
+    }
+
+    def __init__(self, request=None, field_name='image'):
+        super().__init__(request)
+        self.field_name_allowed = field_name
+        self.max_size = getattr(settings, 'AVATAR_UPLOAD_MAX_SIZE',
+                                DEFAULT_MAX_SIZE)
+        self.max_pixels = getattr(settings, 'AVATAR_UPLOAD_MAX_PIXELS',
+                                  Image.MAX_IMAGE_PIXELS)
+        self.error = None
+        self.file = None
+        self.rejected = False
+
+    def handle_raw_input(self, input_data, META, content_length, boundary,
+                         encoding=None):
+        if content_length > self.max_size + MULTIPART_OVERHEAD:
+            self.error = self.error_msg['too_large']
+            # Claim the request so that nothing reads the body
+            return QueryDict(encoding=encoding), MultiValueDict()
+        return None
+
+    def new_file(self, field_name, *args, **kwargs):
+        if field_name != self.field_name_allowed or self.file is not None:
+            # we only accept a single image per request
+            raise SkipFile()
+        super().new_file(field_name, *args, **kwargs)
+        self.file = TemporaryUploadedFile(self.file_name, self.content_type,
+                                          0, self.charset,
+                                          self.content_type_extra)
+        self.header = BytesIO()
+        self.signature_checked = False
+        self.header_checked = False
+        self.next_header_check = HEADER_SIZE
+
+    def receive_data_chunk(self, raw_data, start):
+        if start + len(raw_data) > self.max_size:
+            self.reject('too_large')
+
+        if not self.header_checked:
+            self.header.write(raw_data)
+            received = self.header.tell()
+            if not self.signature_checked and received >= SIGNATURE_SIZE:
+                self.check_signature()
+            if received >= self.next_header_check:
+                self.check_header(final=received >= MAX_HEADER_SIZE)
+
+        self.file.write(raw_data)
+        return None
+
+    def file_complete(self, file_size):
+        if self.file is None or self.rejected:
+            return None
+        if not self.header_checked:
+            try:
+                if not self.signature_checked:
+                    self.check_signature()
+                self.check_header(final=True)
+            except StopUpload:
+                return None
+        self.file.seek(0)
+        self.file.size = file_size
+        return self.file
+
+    def check_signature(self):
+        """Raises StopUpload if the upload doesn't start like an image"""
+        self.signature_checked = True
+        if not looks_like_image(self.header.getvalue()[:SIGNATURE_SIZE]):
+            self.reject('not_image')
+
+    def check_header(self, final):
+        """Ask Pillow to identify the image from the bytes received so far.
+
+        Raises StopUpload if the image is too large, or if it can't be
+        identified and this is the `final` check. Otherwise the check is
+        repeated once twice as much has been received.
+        """
+        try:
+            with Image.open(BytesIO(self.header.getvalue())) as image:
+                width, height = image.size
+        except (IOError, SyntaxError, ValueError,
+                Image.DecompressionBombError):
+            if final:
+                self.reject('not_image')
+            # (probably) the dimensions haven't arrived yet
+            self.next_header_check *= 2
+            return
+
+        self.header_checked = True
+        self.header = None
+        if self.max_pixels and width * height > self.max_pixels:
+            self.reject('too_many_pixels')
+
+    def reject(self, reason):
+        self.error = self.error_msg[reason]
+        self.rejected = True
+        # closing the temporary file also deletes it
+        self.file.close()
+        raise StopUpload(connection_reset=True)
@@ -6,4 +6,7 @@ app_name = 'image_edit'
 urlpatterns = [
     re_path(r'^$', views.cropper, name='cropper'),
     re_path(r'upload_image$', views.upload_image, name='upload_image'),
+    re_path(r'transform_image$', views.transform_image,
+            name='transform_image'),
+    re_path(r'jobs/(?P<job_id>\d+)$', views.job_status, name='job_status'),
 ]
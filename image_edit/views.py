@@ -2,10 +2,17 @@
 import json
 
 from django.contrib.auth import get_user_model
-from django.http import JsonResponse
+from django.http import Http404, JsonResponse
 from django.shortcuts import render, redirect, get_object_or_404
 from django.urls import reverse
-from django.views.decorators.csrf import ensure_csrf_cookie
+from django.views.decorators.csrf import (csrf_exempt, csrf_protect,
+                                          ensure_csrf_cookie)
+
+from . import transforms
+from .jobs import enqueue
+from .models import Job
+from .tasks import process_avatar, transform_avatar
+from .uploadhandlers import BoundedImageUploadHandler
 
 
 @ensure_csrf_cookie
@@ -15,35 +22,152 @@ def cropper(request):
     return render(request, template, context)
 
 
+# Upload handlers can only be replaced before anything reads the request
+# body, but CsrfViewMiddleware reads request.POST before calling the view. So
+# (per the Django docs) we exempt the view from the middleware, swap in our
+# handler, then apply the CSRF check ourselves.
+# https://docs.djangoproject.com/en/2.2/topics/http/file-uploads/#modifying-upload-handlers-on-the-fly
+@csrf_exempt
 def upload_image(request):
+    handler = BoundedImageUploadHandler(request)
+    request.upload_handlers = [handler]
+    return _upload_image(request, handler)
+
+
+@csrf_protect
+def _upload_image(request, handler):
     # Uses AJAX
 
     # image is passed in as a file attached to the form
     # thus we access it in request.FILES
     image_file = request.FILES.get('image')
-    msg = ""
-    status = 0
 
     if image_file:
-        user = get_object_or_404(get_user_model(), pk=request.user.pk)
+        status, msg, job = _save_avatar(request, image_file)
 
-        if hasattr(user, 'userprofile'):
-            up_instance = user.userprofile
+    elif handler.error:  # upload rejected by the upload handler
+        status, msg, job = 0, handler.error, None
+
+    else:  # no image uploaded
+        status, msg, job = 0, "No image file", None
 
-            up_instance.avatar = image_file
-            up_instance.save()
+    return _avatar_response(status, msg, job)
 
-            status = 1
-            msg = "Ok"
-        else:  # no userprofile
-            msg = "No user profile"
+
+@csrf_exempt
+def transform_image(request):
+    handler = BoundedImageUploadHandler(request)
+    request.upload_handlers = [handler]
+    return _transform_image(request, handler)
+
+
+@csrf_protect
+def _transform_image(request, handler):
+    # Uses AJAX
+
+    # The original image is attached to the form as `image`, and the edits
+    # made in the cropper as a JSON list in `operations` (see
+    # image_edit.transforms). The operations are checked here, but applied
+    # in the background.
+    user, profile = _get_profile(request)
+    image_file = request.FILES.get('image')
+
+    if profile is None:
+        status, msg, job = 0, "No user profile", None
+
+    elif image_file:
+        try:
+            operations = transforms.parse_operations(
+                request.POST.get('operations')
+            )
+        except transforms.InvalidOperation as e:
+            status, msg, job = 0, str(e), None
+        else:
+            status, msg, job = _queue_transform(user, profile, image_file,
+                                                operations)
+
+    elif handler.error:  # upload rejected by the upload handler
+        status, msg, job = 0, handler.error, None
 
     else:  # no image uploaded
-        msg = "No image file"
+        status, msg, job = 0, "No image file", None
+
+    return _avatar_response(status, msg, job)
+
+
+# Helper Functions
+# ----------------
+def _get_profile(request):
+    """Returns (user, profile) for the signed in user; profile is None if
+    they haven't made one yet
+    """
+    user = get_object_or_404(get_user_model(), pk=request.user.pk)
+    return user, getattr(user, 'userprofile', None)
 
+
+def _save_avatar(request, image_file):
+    """Store `image_file` as the user's avatar and queue the generation of
+    its renditions.
+
+    Returns (status, message, job)
+    """
+    user, up_instance = _get_profile(request)
+
+    if up_instance is None:
+        return 0, "No user profile", None
+
+    up_instance.avatar = image_file
+    up_instance.save()
+    # resizing happens in the background: the client can poll the
+    # job's status url to find out when it's finished
+    job = enqueue(process_avatar,
+                  up_instance.pk,
+                  up_instance.avatar.name,
+                  owner=user)
+    return 1, "Ok", job
+
+
+def _queue_transform(user, profile, image_file, operations):
+    """Store the original `image_file` and queue applying `operations` to
+    it to make the profile's new avatar.
+
+    Returns (status, message, job)
+    """
+    field = profile._meta.get_field('avatar')
+    upload_name = field.storage.save(
+        field.generate_filename(profile, image_file.name), image_file
+    )
+    job = enqueue(transform_avatar,
+                  profile.pk,
+                  upload_name,
+                  operations,
+                  profile.avatar.name or '',
+                  owner=user)
+    return 1, "Ok", job
+
+
+def _avatar_response(status, msg, job):
     response_dict = {
         'status': status,
         'message': msg,
         'url': reverse('accounts:profile')
     }
+    if job is not None:
+        response_dict['job'] = job.pk
+        response_dict['job_url'] = reverse('image_edit:job_status',
+                                           kwargs={'job_id': job.pk})
+    return JsonResponse(response_dict)
+
+
+def job_status(request, job_id):
+    # Uses AJAX
+    if not request.user.is_authenticated:
+        raise Http404
+    job = get_object_or_404(Job, pk=job_id, owner=request.user)
+
+    response_dict = {
+        'job': job.pk,
+        'status': job.status,
+        'finished': job.finished,
+    }
     return JsonResponse(response_dict)
@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+
+
+class Project7Config(AppConfig):
+    name = 'project_7'
+
+    def ready(self):
+        from .db import apply_sqlite_pragmas
+        connection_created.connect(apply_sqlite_pragmas,
+                                   dispatch_uid='project_7.sqlite_pragmas')
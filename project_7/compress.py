@@ -0,0 +1,76 @@
+"""Precompressed copies of static files
+
+For each file worth compressing, `compress_file` writes `<name>.gz` (and
+`<name>.br` when the `brotli` package is installed) next to it, so the web
+server can send the smaller copy to clients that accept it without
+compressing anything per request.
+
+This module only depends on the standard library (and optionally brotli),
+so worker processes can import it without setting Django up.
+"""
+import gzip
+import os
+import tempfile
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+
+# files of these types are already compressed, or too small to bother with
+COMPRESSIBLE_EXTENSIONS = frozenset((
+    '.css', '.js', '.map', '.json', '.svg', '.html', '.txt', '.xml',
+    '.ico', '.ttf', '.otf', '.eot',
+))
+
+# (bytes) smaller files fit in a packet either way
+MIN_SIZE = 256
+
+
+def encodings():
+    """(extension, compress function) for each available encoding"""
+    available = [('.gz', lambda data: gzip.compress(data, 9, mtime=0))]
+    if brotli is not None:
+        available.append(('.br', lambda data: brotli.compress(data)))
+    return available
+
+
+def should_compress(path):
+    return os.path.splitext(path)[1].lower() in COMPRESSIBLE_EXTENSIONS
+
+
+def compress_file(path):
+    """Write the compressed copies of `path` that don't exist yet.
+
+    Only meant for content-addressed files (whose contents never change
+    under the same name), so an existing copy is always up to date.
+    Returns the paths that were written.
+    """
+    missing = [(ext, compress) for ext, compress in encodings()
+               if not os.path.exists(path + ext)]
+    if not missing:
+        return []
+    with open(path, 'rb') as f:
+        data = f.read()
+    if len(data) < MIN_SIZE:
+        return []
+
+    written = []
+    for ext, compress in missing:
+        compressed = compress(data)
+        if len(compressed) >= len(data):
+            continue
+        # write to a temporary file and move it into place, so the server
+        # never picks up a partially written copy
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path),
+                                        prefix='.compress-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(compressed)
+            os.replace(tmp_path, path + ext)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        written.append(path + ext)
+    return written
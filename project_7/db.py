@@ -0,0 +1,40 @@
+"""SQLite tuning
+
+Django opens SQLite with its defaults: a rollback journal, which lets
+writers block readers, and `synchronous=FULL`, which syncs to disk on every
+commit. Each new connection is given the `SQLITE_PRAGMAS` setting instead
+(see `Project7Config.ready`). The defaults are:
+
+- `journal_mode=wal`: readers no longer wait for writers (and vice versa),
+  so page views carry on while a profile or session is being saved. The
+  mode is stored in the database file, alongside `-wal`/`-shm` files.
+- `synchronous=normal`: safe with WAL (a power cut can lose the last
+  commits, but never corrupts the database) and much cheaper than FULL.
+- `mmap_size`: read pages straight from the OS page cache.
+- `cache_size`: a larger per-connection page cache (negative means KiB).
+
+Combined with `CONN_MAX_AGE`, each worker thread keeps its connection (and
+its page cache) between requests rather than reopening the file.
+"""
+from django.conf import settings
+
+
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'mmap_size': 64 * 1024 * 1024,
+    'cache_size': -16 * 1024,
+}
+
+
+def sqlite_pragmas():
+    return getattr(settings, 'SQLITE_PRAGMAS', DEFAULT_PRAGMAS)
+
+
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """Receiver for `connection_created`"""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in sqlite_pragmas().items():
+            cursor.execute('PRAGMA {} = {}'.format(name, value))
@@ -0,0 +1,331 @@
+"""Serving static and media files from the WSGI application
+
+`FileServer` wraps the Django application (see project_7/wsgi.py) and
+answers GET and HEAD requests for files under STATIC_URL and MEDIA_URL
+itself, without going through Django's middleware, URL resolution or views.
+Everything else, including requests for files it can't find, is passed on
+to Django.
+
+- Static files are looked up in an index of STATIC_ROOT built when the
+  server starts, so restart it after running collectstatic. Hashed names
+  (see project_7.storage) are cached forever, plain names are revalidated.
+- Media files can change at any time, so they are looked up on disk for
+  each request. Content-addressed avatars are cached forever, and avatar
+  renditions are sent in the smallest format the client accepts (see
+  accounts.avatars.best_variant).
+- Responses carry an ETag and Last-Modified, and conditional requests are
+  answered with 304 Not Modified.
+- A single byte range (Range, If-Range) is supported.
+- The .br/.gz copies written by collectstatic are sent to clients that
+  accept them.
+- Whole files are handed to the server's `wsgi.file_wrapper`, which servers
+  such as gunicorn send with sendfile().
+"""
+import json
+import mimetypes
+import os
+import re
+import stat
+from wsgiref.util import FileWrapper
+
+from django.conf import settings
+from django.utils.http import http_date, parse_http_date_safe
+
+from accounts.avatars import best_variant, is_rendition
+from accounts.storage import is_content_addressed
+
+
+BLOCK_SIZE = 64 * 1024
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'no-cache'
+
+# Content-Encoding -> extension of the precompressed copy, best first
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+# parse_range() result for a range that lies outside the file
+UNSATISFIABLE = object()
+
+
+class File:
+    """A file that can be served, and its precompressed copies"""
+
+    def __init__(self, path, st, cache_control, content_type=None,
+                 encoding=None):
+        self.path = path
+        self.size = st.st_size
+        self.mtime = int(st.st_mtime)
+        self.etag = '"{:x}-{:x}"'.format(self.mtime, self.size)
+        self.last_modified = http_date(self.mtime)
+        self.cache_control = cache_control
+        if content_type is None:
+            content_type, _ = mimetypes.guess_type(path)
+        self.content_type = content_type or 'application/octet-stream'
+        self.encoding = encoding
+        self.variants = {}
+        # request headers the choice of file depended on
+        self.vary = []
+
+    @classmethod
+    def from_path(cls, path, cache_control):
+        """The File at `path`, or None if there isn't a regular file"""
+        try:
+            st = os.stat(path)
+        except (OSError, ValueError):
+            return None
+        if not stat.S_ISREG(st.st_mode):
+            return None
+        return cls(path, st, cache_control)
+
+    def add_variant(self, encoding, path):
+        variant = File.from_path(path, self.cache_control)
+        if variant is not None:
+            variant.content_type = self.content_type
+            variant.encoding = encoding
+            self.variants[encoding] = variant
+
+
+class FileRange:
+    """An iterable over `length` bytes of the open file `f`"""
+
+    def __init__(self, f, start, length):
+        self.f = f
+        self.f.seek(start)
+        self.remaining = length
+
+    def __iter__(self):
+        while self.remaining > 0:
+            block = self.f.read(min(BLOCK_SIZE, self.remaining))
+            if not block:
+                break
+            self.remaining -= len(block)
+            yield block
+
+    def close(self):
+        self.f.close()
+
+
+def load_manifest(static_root):
+    """The hashed names recorded by collectstatic"""
+    try:
+        with open(os.path.join(static_root, 'staticfiles.json')) as f:
+            return set(json.load(f).get('paths', {}).values())
+    except (OSError, ValueError, AttributeError):
+        return set()
+
+
+def index_files(root, url, immutable_names=()):
+    """Map the url of every file below `root` to its File"""
+    files = {}
+    for directory, _, filenames in os.walk(root):
+        relative_dir = os.path.relpath(directory, root).replace(os.sep, '/')
+        prefix = url if relative_dir == '.' else url + relative_dir + '/'
+        names = set(filenames)
+        for filename in filenames:
+            if filename.startswith('.') or filename.endswith(
+                    tuple(ext for _, ext in ENCODINGS)):
+                continue
+            name = prefix[len(url):] + filename
+            cache_control = (IMMUTABLE if name in immutable_names
+                             else REVALIDATE)
+            path = os.path.join(directory, filename)
+            file = File.from_path(path, cache_control)
+            if file is None:
+                continue
+            for encoding, ext in ENCODINGS:
+                if filename + ext in names:
+                    file.add_variant(encoding, path + ext)
+            files[prefix + filename] = file
+    return files
+
+
+def accepted_encodings(header):
+    """The content codings (lowercased) that an Accept-Encoding header
+    allows, i.e. doesn't give a q of 0
+    """
+    accepted = set()
+    refused = set()
+    for item in header.split(','):
+        coding, _, params = item.partition(';')
+        coding = coding.strip().lower()
+        match = re.search(r'q\s*=\s*([\d.]+)', params)
+        try:
+            q = float(match.group(1)) if match else 1.0
+        except ValueError:
+            q = 1.0
+        (accepted if q > 0 else refused).add(coding)
+    if '*' in accepted:
+        accepted.update(encoding for encoding, _ in ENCODINGS
+                        if encoding not in refused)
+    return accepted
+
+
+def parse_range(header, size):
+    """Return (start, end) for a single byte range header, UNSATISFIABLE,
+    or None if the header should be ignored (it's invalid, or asks for
+    several ranges)
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first:
+        if not last:
+            return None
+        # the last `last` bytes
+        length = int(last)
+        if length == 0 or size == 0:
+            return UNSATISFIABLE
+        return max(0, size - length), size
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        return UNSATISFIABLE
+    end = size if not last else min(int(last) + 1, size)
+    return start, end
+
+
+def etag_matches(header, etag):
+    """True if the If-None-Match `header` lists `etag` (weak comparison)"""
+    if header.strip() == '*':
+        return True
+    tags = [tag.strip() for tag in header.split(',')]
+    return etag in [tag[2:] if tag.startswith('W/') else tag
+                    for tag in tags]
+
+
+def not_modified(environ, file):
+    if_none_match = environ.get('HTTP_IF_NONE_MATCH')
+    if if_none_match is not None:
+        return etag_matches(if_none_match, file.etag)
+    since = parse_http_date_safe(environ.get('HTTP_IF_MODIFIED_SINCE', ''))
+    return since is not None and file.mtime <= since
+
+
+def range_allowed(environ, file):
+    """Whether a Range request's If-Range (if any) still holds"""
+    if_range = environ.get('HTTP_IF_RANGE')
+    if if_range is None:
+        return True
+    if if_range.startswith('"'):
+        return if_range == file.etag
+    return parse_http_date_safe(if_range) == file.mtime
+
+
+class FileServer:
+
+    def __init__(self, application, static_root=None, static_url=None,
+                 media_root=None, media_url=None):
+        self.application = application
+        static_root = static_root or settings.STATIC_ROOT
+        self.static_url = static_url or settings.STATIC_URL
+        self.media_root = media_root or settings.MEDIA_ROOT
+        self.media_url = media_url or settings.MEDIA_URL
+        self.files = {}
+        if static_root and self.static_url.startswith('/'):
+            self.files = index_files(static_root, self.static_url,
+                                     load_manifest(static_root))
+
+    def __call__(self, environ, start_response):
+        if environ.get('REQUEST_METHOD') in ('GET', 'HEAD'):
+            file = self.find(self.path_info(environ),
+                             environ.get('HTTP_ACCEPT', ''))
+            if file is not None:
+                response = self.serve(file, environ, start_response)
+                if response is not None:
+                    return response
+        return self.application(environ, start_response)
+
+    @staticmethod
+    def path_info(environ):
+        # WSGI servers pass the (url decoded) path as latin-1
+        path = environ.get('PATH_INFO', '')
+        try:
+            return path.encode('iso-8859-1').decode('utf-8')
+        except UnicodeError:
+            return ''
+
+    def find(self, path, accept=''):
+        """The File to serve for the url path `path`, or None"""
+        if path.startswith(self.static_url):
+            return self.files.get(path)
+        if self.media_root and path.startswith(self.media_url):
+            name = path[len(self.media_url):]
+            parts = name.split('/')
+            if any(part in ('', '.', '..') or '\\' in part or '\0' in part
+                   for part in parts):
+                return None
+            full_path = os.path.join(self.media_root, *parts)
+            if is_rendition(name):
+                full_path = best_variant(full_path, accept)
+            file = File.from_path(
+                full_path,
+                IMMUTABLE if is_content_addressed(name) else REVALIDATE
+            )
+            if file is not None and is_rendition(name):
+                file.vary.append('Accept')
+            return file
+        return None
+
+    def serve(self, file, environ, start_response):
+        """Respond with `file`, or return None if it has disappeared"""
+        headers = [('Cache-Control', file.cache_control),
+                   ('Accept-Ranges', 'bytes')]
+        vary = file.vary + (['Accept-Encoding'] if file.variants else [])
+        if vary:
+            headers.append(('Vary', ', '.join(vary)))
+
+        range_header = environ.get('HTTP_RANGE')
+        if range_header is None:
+            # ranges are always of the uncompressed file
+            accepted = accepted_encodings(
+                environ.get('HTTP_ACCEPT_ENCODING', '')
+            )
+            for encoding, _ in ENCODINGS:
+                if encoding in accepted and encoding in file.variants:
+                    file = file.variants[encoding]
+                    break
+        headers += [('ETag', file.etag),
+                    ('Last-Modified', file.last_modified)]
+
+        if not_modified(environ, file):
+            start_response('304 Not Modified', headers)
+            return []
+
+        status = '200 OK'
+        start, end = 0, file.size
+        if range_header is not None and range_allowed(environ, file):
+            byte_range = parse_range(range_header, file.size)
+            if byte_range is UNSATISFIABLE:
+                headers += [('Content-Range', 'bytes */{}'.format(file.size)),
+                            ('Content-Length', '0')]
+                start_response('416 Range Not Satisfiable', headers)
+                return []
+            if byte_range is not None:
+                start, end = byte_range
+                status = '206 Partial Content'
+                headers.append(('Content-Range', 'bytes {}-{}/{}'.format(
+                    start, end - 1, file.size
+                )))
+
+        try:
+            f = open(file.path, 'rb')
+        except OSError:
+            return None
+
+        if file.encoding:
+            headers.append(('Content-Encoding', file.encoding))
+        headers += [('Content-Type', file.content_type),
+                    ('Content-Length', str(end - start))]
+        start_response(status, headers)
+
+        if environ['REQUEST_METHOD'] == 'HEAD':
+            f.close()
+            return []
+        if (start, end) == (0, file.size):
+            file_wrapper = environ.get('wsgi.file_wrapper', FileWrapper)
+            return file_wrapper(f, BLOCK_SIZE)
+        return FileRange(f, start, end - start)
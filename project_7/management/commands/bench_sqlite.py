@@ -0,0 +1,132 @@
+import multiprocessing
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+
+from project_7.db import sqlite_pragmas
+
+
+# roughly the shape of a profile row
+SCHEMA = """
+    CREATE TABLE profile (
+        id INTEGER PRIMARY KEY,
+        email TEXT NOT NULL,
+        bio TEXT NOT NULL,
+        version INTEGER NOT NULL
+    )
+"""
+ROWS = 10000
+
+
+def connect(path, pragmas):
+    connection = sqlite3.connect(path, timeout=5)
+    for name, value in pragmas.items():
+        connection.execute('PRAGMA {} = {}'.format(name, value))
+    return connection
+
+
+def worker(path, pragmas, seconds, write_ratio, seed, results):
+    """Read and update random profiles for `seconds`, reusing one
+    connection as a persistent Django connection would
+    """
+    rng = random.Random(seed)
+    connection = connect(path, pragmas)
+    reads = writes = locked = 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        pk = rng.randint(1, ROWS)
+        try:
+            if rng.random() < write_ratio:
+                with connection:
+                    connection.execute(
+                        'UPDATE profile SET version = version + 1 '
+                        'WHERE id = ?', (pk,)
+                    )
+                writes += 1
+            else:
+                connection.execute(
+                    'SELECT email, bio, version FROM profile WHERE id = ?',
+                    (pk,)
+                ).fetchone()
+                reads += 1
+        except sqlite3.OperationalError:  # database is locked
+            locked += 1
+    connection.close()
+    results.put((reads, writes, locked))
+
+
+class Command(BaseCommand):
+    help = ("Compare read/write throughput of a scratch SQLite database with "
+            "SQLite's default settings and with SQLITE_PRAGMAS, using "
+            "several worker processes")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=4,
+            help="Number of concurrent worker processes",
+        )
+        parser.add_argument(
+            '--seconds', type=float, default=3.0,
+            help="How long to run each configuration for",
+        )
+        parser.add_argument(
+            '--write-ratio', type=float, default=0.1,
+            help="Fraction of operations that are writes",
+        )
+
+    def handle(self, *args, **options):
+        configurations = (
+            ("sqlite defaults", {'journal_mode': 'delete',
+                                 'synchronous': 'full'}),
+            ("SQLITE_PRAGMAS", sqlite_pragmas()),
+        )
+        self.stdout.write(
+            "{} workers, {:.0%} writes, {}s each".format(
+                options['workers'], options['write_ratio'],
+                options['seconds']
+            )
+        )
+        for label, pragmas in configurations:
+            reads, writes, locked = self.run(pragmas, options)
+            self.stdout.write(
+                "{:<16} {:>9.0f} reads/s {:>8.0f} writes/s "
+                "{:>6} locked".format(
+                    label, reads / options['seconds'],
+                    writes / options['seconds'], locked
+                )
+            )
+
+    def run(self, pragmas, options):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'bench.sqlite3')
+            connection = connect(path, pragmas)
+            with connection:
+                connection.execute(SCHEMA)
+                connection.executemany(
+                    'INSERT INTO profile (id, email, bio, version) '
+                    'VALUES (?, ?, ?, 0)',
+                    ((i, 'user{}@test.com'.format(i), 'x' * 500)
+                     for i in range(1, ROWS + 1))
+                )
+            connection.close()
+
+            context = multiprocessing.get_context('spawn')
+            results = context.Queue()
+            processes = [
+                context.Process(target=worker, args=(
+                    path, pragmas, options['seconds'],
+                    options['write_ratio'], seed, results
+                ))
+                for seed in range(options['workers'])
+            ]
+            for process in processes:
+                process.start()
+            totals = [sum(counts) for counts in
+                      zip(*(results.get() for _ in processes))]
+            for process in processes:
+                process.join()
+            return totals
@@ -0,0 +1,54 @@
+import sqlite3
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from project_7.db import sqlite_pragmas
+from project_7.routers import REPLICA
+
+
+class Command(BaseCommand):
+    help = ("Copy the default SQLite database to the replica with SQLite's "
+            "online backup API (see project_7.routers)")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=float, default=0,
+            help="Keep syncing, waiting this many seconds between copies",
+        )
+        parser.add_argument(
+            '--pages', type=int, default=1024,
+            help=("Number of pages to copy per step; the databases are only "
+                  "locked while a step runs"),
+        )
+
+    def handle(self, *args, **options):
+        if REPLICA not in connections.databases:
+            raise CommandError("No replica database is configured "
+                               "(set P7_REPLICA_DB)")
+        source_path = connections['default'].settings_dict['NAME']
+        replica_path = connections[REPLICA].settings_dict['NAME']
+
+        while True:
+            started = time.monotonic()
+            self.sync(source_path, replica_path, options['pages'])
+            self.stdout.write("Synced replica in {:.2f}s".format(
+                time.monotonic() - started
+            ))
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
+
+    def sync(self, source_path, replica_path, pages):
+        source = sqlite3.connect(source_path)
+        replica = sqlite3.connect(replica_path, timeout=30)
+        try:
+            # the replica is read with the same settings as the primary
+            for name, value in sqlite_pragmas().items():
+                replica.execute('PRAGMA {} = {}'.format(name, value))
+            # yield between steps so readers of the replica aren't held up
+            source.backup(replica, pages=pages, sleep=0.005)
+        finally:
+            replica.close()
+            source.close()
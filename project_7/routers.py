@@ -0,0 +1,82 @@
+"""Read replica routing
+
+When a `replica` database is configured (see settings), queries made while
+handling a read-only request go to it, and everything else goes to
+`default`:
+
+- GET/HEAD/OPTIONS requests read from the replica, unless
+- the client has made a write request in the last `REPLICA_PIN_SECONDS`
+  (remembered with a cookie), so that a user always sees their own changes
+  even before the replica has caught up,
+- any other request (POST etc.) uses `default` throughout, as do
+  background jobs, management commands and tests, which don't go through
+  the middleware,
+- sessions are always read from `default`: a session that hasn't reached
+  the replica yet would otherwise sign its user out.
+
+Writes always go to `default`; `manage.py sync_replica` copies it to the
+replica.
+"""
+import threading
+
+from django.conf import settings
+from django.db import connections
+
+
+REPLICA = 'replica'
+PIN_COOKIE = 'pin_primary'
+DEFAULT_PIN_SECONDS = 60
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_state = threading.local()
+
+
+def reading_from_replica():
+    return getattr(_state, 'use_replica', False)
+
+
+class ReplicaRouter(object):
+
+    def db_for_read(self, model, **hints):
+        if (reading_from_replica()
+                and model._meta.app_label != 'sessions'
+                and REPLICA in connections.databases):
+            return REPLICA
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # the replica is a copy of default, so objects from either may be
+        # related to each other
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # the replica gets its tables by being copied from default
+        return db != REPLICA
+
+
+class ReplicaPinningMiddleware(object):
+    """Lets read-only requests use the replica (see above)"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        writing = request.method not in SAFE_METHODS
+        _state.use_replica = not writing and PIN_COOKIE not in request.COOKIES
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.use_replica = False
+
+        if writing and REPLICA in connections.databases:
+            response.set_cookie(
+                PIN_COOKIE, '1',
+                max_age=getattr(settings, 'REPLICA_PIN_SECONDS',
+                                DEFAULT_PIN_SECONDS),
+                httponly=True,
+            )
+        return response
@@ -40,12 +40,14 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'ckeditor',
     'users',
-    'accounts',
+    'accounts.apps.AccountsConfig',
     'image_edit.apps.ImageEditConfig',
+    'project_7.apps.Project7Config',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'project_7.routers.ReplicaPinningMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -82,9 +84,98 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        # keep each thread's connection open between requests (seconds)
+        'CONN_MAX_AGE': 600,
     }
 }
 
+# Read replica
+# Set P7_REPLICA_DB to the path of a copy of the database (kept up to date
+# with `manage.py sync_replica`) to send the queries of read-only requests
+# to it (see project_7.routers). After a write request, a client reads from
+# `default` for REPLICA_PIN_SECONDS, which should be longer than the time
+# between syncs.
+if os.environ.get('P7_REPLICA_DB'):
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ['P7_REPLICA_DB'],
+        'CONN_MAX_AGE': 600,
+        'TEST': {
+            'MIRROR': 'default',
+        },
+    }
+DATABASE_ROUTERS = ['project_7.routers.ReplicaRouter']
+REPLICA_PIN_SECONDS = 60
+
+# Applied to every new SQLite connection (see project_7.db)
+SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'mmap_size': 64 * 1024 * 1024,
+    'cache_size': -16 * 1024,
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/2.2/topics/cache/
+# Rendered profile fragments are cached (see accounts/profile.html). By
+# default the cache lives in each process's memory; set P7_CACHE_DIR to share
+# a file-based cache between the processes of a single host.
+# Sign in rate limits are kept in their own cache (see accounts.ratelimit),
+# so clearing or evicting page fragments never resets them.
+
+if os.environ.get('P7_CACHE_DIR'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.path.join(os.environ['P7_CACHE_DIR'], 'default'),
+        },
+        'ratelimit': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.path.join(os.environ['P7_CACHE_DIR'],
+                                     'ratelimit'),
+        },
+        'sessions': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.path.join(os.environ['P7_CACHE_DIR'], 'sessions'),
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+        'ratelimit': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'ratelimit',
+        },
+        'sessions': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'sessions',
+        },
+    }
+
+# Sessions
+# https://docs.djangoproject.com/en/2.2/topics/http/sessions/
+# Choose where sessions are kept with P7_SESSION_ENGINE (see the README):
+# - db (default): a django_session row, read on every signed in request
+# - cached_db: as db, but reads are served from the 'sessions' cache
+# - signed_cookies: in the (signed, not encrypted) session cookie itself
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+SESSION_ENGINE = SESSION_ENGINES[os.environ.get('P7_SESSION_ENGINE', 'db')]
+SESSION_CACHE_ALIAS = 'sessions'
+
+# Sign in attempts allowed per client IP address and per email address, as
+# token buckets: (burst size, seconds to refill the whole burst)
+SIGN_IN_RATE_LIMITS = {
+    'ip': (20, 60),
+    'email': (5, 60),
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/1.9/ref/settings/#auth-password-validators
@@ -98,19 +189,8 @@ AUTH_PASSWORD_VALIDATORS = [
         }
     },
     {
-        'NAME': 'users.forms.NumericValidator',
-    },
-    {
-        'NAME': 'users.forms.LowerCaseValidator',
-    },
-    {
-        'NAME': 'users.forms.UpperCaseValidator',
-    },
-    {
-        'NAME': 'users.forms.SpecialCharacterValidator',
-    },
-    {
-        'NAME': 'users.forms.OtherIdentityAttributesValidator',
+        # checks all of the character and identity rules in one pass
+        'NAME': 'users.forms.PasswordPolicyValidator',
     }
 ]
 
@@ -140,6 +220,12 @@ STATICFILES_DIRS = [
 # this is where collectstatic will put files:
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 
+# collectstatic also writes content-hashed copies of the files, and gzip
+# (and, with the brotli package, brotli) compressed copies of those, using
+# this many processes (None: one per CPU, 0: compress in-process)
+STATICFILES_STORAGE = 'project_7.storage.CompressedManifestStaticFilesStorage'
+STATIC_COMPRESSION_WORKERS = None
+
 # Media files (user images, etc)
 # https://docs.djangoproject.com/en/2.1/ref/settings/#std:setting-MEDIA_ROOT
 #
@@ -152,9 +238,43 @@ MEDIA_ROOT = os.path.join(
 )
 MEDIA_URL = '/public/media/'
 
+# Avatar renditions
+# Each uploaded avatar is downsized to fit each of these square bounding boxes
+# (in px) so that pages never have to ship the full-resolution original.
+AVATAR_RENDITION_SIZES = (48, 96, 200, 400)
+
+# An avatar file that no profile refers to any more is kept if it was saved
+# within this many seconds: identical uploads share a file, and the profile
+# that was just given it may not have been committed yet.
+AVATAR_RELEASE_GRACE_PERIOD = 600
+
 
 AUTH_USER_MODEL = 'users.P7User'
 
+# The first loads the user's profile along with the user on every request.
+# ModelBackend stays listed so that sessions signed in through it before
+# remain valid (a session only works while its backend is listed).
+AUTHENTICATION_BACKENDS = [
+    'users.backends.P7ModelBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+
+# Password hashing policy
+# Hashes are made with the first hasher. Stored hashes made with another
+# hasher, or another PASSWORD_HASH_ITERATIONS, are upgraded when their user
+# next signs in (see users.hashers). Only hashers whose libraries are in
+# requirements.txt are listed (Argon2 and BCrypt need argon2-cffi and bcrypt).
+PASSWORD_HASHERS = [
+    'users.hashers.PolicyPBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+]
+PASSWORD_HASH_ITERATIONS = 150000
+
+# At most this many passwords are hashed at once (see users.hashing); None
+# means one per CPU. `manage.py bench_hashers` reports how many hashes
+# per second each of the PASSWORD_HASHERS manages, for sizing iterations.
+PASSWORD_HASHING_WORKERS = None
+
 # Default is to go to `accounts/profile`
 LOGIN_REDIRECT_URL = reverse_lazy('home')
 
@@ -180,5 +300,27 @@ LOGIN_REDIRECT_URL = reverse_lazy('home')
 
 
 # MAXIMUM UPLOAD SIZE
-# (Default is 2.5MB expressed as bytes: 2621440)
-DATA_UPLOAD_MAX_MEMORY_SIZE = 52428800
+# DATA_UPLOAD_MAX_MEMORY_SIZE limits the non-file part of a request body (the
+# default is 2.5MB expressed as bytes: 2621440). Uploaded files are not
+# counted against it.
+DATA_UPLOAD_MAX_MEMORY_SIZE = 2621440
+
+# Avatar uploads are streamed to a temporary file (see
+# image_edit.uploadhandlers) and abandoned as soon as they exceed this size
+# (bytes) or turn out not to be an image.
+AVATAR_UPLOAD_MAX_SIZE = 10485760
+
+# (px) avatars edited with the cropper are scaled down to fit this size
+AVATAR_MAX_DIMENSION = 800
+
+
+# BACKGROUND JOBS
+# Image processing runs outside the request/response cycle. See
+# image_edit.jobs for the available backends; with
+# 'image_edit.jobs.DatabaseBackend' run `python manage.py run_jobs` alongside
+# the web server.
+JOB_BACKEND = 'image_edit.jobs.ThreadPoolBackend'
+JOB_WORKERS = 2
+# (seconds) run_jobs puts jobs that have been running for longer than this
+# back in the queue, assuming the worker running them died
+JOB_TIMEOUT = 15 * 60
@@ -0,0 +1,75 @@
+"""Static files storage
+
+`collectstatic` copies every static file to STATIC_ROOT under its plain
+name and under a name including a hash of its contents
+(css/global.css -> css/global.1a2b3c4d5e6f.css), and records the mapping in
+staticfiles.json. `{% static %}` links to the hashed names, which can be
+cached forever: a changed file gets a new name.
+
+The hashed files are then compressed (see project_7.compress) in a process
+pool. Unchanged files keep their hashed name between runs, so only new or
+changed files are compressed again.
+"""
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import os
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+from .compress import compress_file, should_compress
+
+
+def compression_workers():
+    workers = getattr(settings, 'STATIC_COMPRESSION_WORKERS', None)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    return workers
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            # Not collected (or collectstatic has never been run, e.g. in
+            # development and tests): link to the plain name, which the
+            # staticfiles app serves from the app and project directories
+            return name
+
+    def url_converter(self, name, hashed_files, template=None):
+        converter = super().url_converter(name, hashed_files, template)
+
+        def convert_or_keep(matchobj):
+            # Some of the vendored stylesheets refer to files that don't
+            # exist (e.g. the sass sources). Leave those references as they
+            # are rather than failing the whole collectstatic run.
+            try:
+                return converter(matchobj)
+            except ValueError:
+                return matchobj.group(0)
+        return convert_or_keep
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if not dry_run:
+            self.compress(set(self.hashed_files.values()))
+
+    def compress(self, names):
+        """Write compressed copies of the files `names`.
+
+        Returns the number of files written.
+        """
+        paths = [self.path(name) for name in sorted(names)
+                 if should_compress(name)]
+        workers = compression_workers()
+        if not workers:
+            return sum(len(compress_file(path)) for path in paths)
+
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn'),
+        ) as executor:
+            return sum(len(written) for written in
+                       executor.map(compress_file, paths, chunksize=16))
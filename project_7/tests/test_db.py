@@ -0,0 +1,32 @@
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from project_7.db import apply_sqlite_pragmas
+
+
+class SqlitePragmasTestCase(TestCase):
+
+    # Helper Methods
+    # --------------
+    def pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA {}'.format(name))
+            return cursor.fetchone()[0]
+
+    # Test Methods
+    # ------------
+    def test_connections_are_tuned(self):
+        # NORMAL
+        self.assertEqual(self.pragma('synchronous'), 1)
+        self.assertEqual(self.pragma('cache_size'), -16 * 1024)
+
+    @override_settings(SQLITE_PRAGMAS={'cache_size': -1024})
+    def test_pragmas_come_from_settings(self):
+        previous = self.pragma('cache_size')
+
+        apply_sqlite_pragmas(sender=None, connection=connection)
+
+        self.assertEqual(self.pragma('cache_size'), -1024)
+        # put the connection back the way the other tests expect it
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA cache_size = {}'.format(previous))
@@ -0,0 +1,194 @@
+import gzip
+import os
+import shutil
+import tempfile
+from wsgiref.util import setup_testing_defaults
+
+from django.test import SimpleTestCase
+from django.utils.http import http_date
+
+from project_7.fileserver import FileServer, parse_range, UNSATISFIABLE
+
+
+CSS = b'body { color: red; }\n' * 100
+HASHED_NAME = 'a' * 64 + '.png'
+
+
+def django_app(environ, start_response):
+    start_response('404 Not Found', [('Content-Type', 'text/plain')])
+    return [b'from django']
+
+
+class FileServerTestCase(SimpleTestCase):
+
+    # Setup and teardown
+    # ------------------
+    def setUp(self):
+        self.static_root = tempfile.mkdtemp()
+        self.media_root = tempfile.mkdtemp()
+        self.write(self.static_root, 'css/site.css', CSS)
+        self.write(self.static_root, 'css/site.css.gz', gzip.compress(CSS))
+        self.write(self.static_root, 'css/site.0123456789ab.css', CSS)
+        self.write(self.static_root, 'staticfiles.json',
+                   b'{"paths": {"css/site.css": "css/site.0123456789ab.css"}}')
+        self.write(self.media_root, 'avatars/' + HASHED_NAME, b'png' * 10)
+        self.write(self.media_root, 'renditions/48.jpg', b'jpg' * 10)
+        self.write(self.media_root, 'renditions/48.webp', b'webp')
+
+        self.server = FileServer(django_app,
+                                 static_root=self.static_root,
+                                 static_url='/static/',
+                                 media_root=self.media_root,
+                                 media_url='/public/media/')
+
+    def tearDown(self):
+        shutil.rmtree(self.static_root)
+        shutil.rmtree(self.media_root)
+
+    # Helper Methods
+    # --------------
+    def write(self, root, name, data):
+        path = os.path.join(root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(data)
+
+    def request(self, path, method='GET', **headers):
+        environ = {'PATH_INFO': path, 'REQUEST_METHOD': method}
+        environ.update(('HTTP_' + key, value)
+                       for key, value in headers.items())
+        setup_testing_defaults(environ)
+        response = {}
+
+        def start_response(status, response_headers):
+            response['status'] = int(status.split()[0])
+            response['headers'] = dict(response_headers)
+
+        body = self.server(environ, start_response)
+        try:
+            response['body'] = b''.join(body)
+        finally:
+            if hasattr(body, 'close'):
+                body.close()
+        return response
+
+    # Test Methods
+    # ------------
+    def test_static_files_are_served_from_the_index(self):
+        response = self.request('/static/css/site.css')
+
+        self.assertEqual(response['status'], 200)
+        self.assertEqual(response['body'], CSS)
+        self.assertEqual(response['headers']['Content-Type'], 'text/css')
+        self.assertEqual(response['headers']['Content-Length'],
+                         str(len(CSS)))
+        self.assertEqual(response['headers']['Cache-Control'], 'no-cache')
+
+        # the index was built when the server started
+        self.write(self.static_root, 'css/new.css', CSS)
+        self.assertEqual(self.request('/static/css/new.css')['body'],
+                         b'from django')
+
+    def test_hashed_static_files_are_immutable(self):
+        response = self.request('/static/css/site.0123456789ab.css')
+
+        self.assertIn('immutable', response['headers']['Cache-Control'])
+
+    def test_precompressed_copy_is_sent_when_accepted(self):
+        response = self.request('/static/css/site.css',
+                                ACCEPT_ENCODING='br;q=1, gzip')
+
+        self.assertEqual(response['headers']['Content-Encoding'], 'gzip')
+        self.assertEqual(response['headers']['Vary'], 'Accept-Encoding')
+        self.assertEqual(gzip.decompress(response['body']), CSS)
+
+        response = self.request('/static/css/site.css',
+                                ACCEPT_ENCODING='gzip;q=0, identity')
+        self.assertNotIn('Content-Encoding', response['headers'])
+
+    def test_conditional_requests(self):
+        etag = self.request('/static/css/site.css')['headers']['ETag']
+        last_modified = os.path.getmtime(
+            os.path.join(self.static_root, 'css/site.css')
+        )
+
+        response = self.request('/static/css/site.css', IF_NONE_MATCH=etag)
+        self.assertEqual(response['status'], 304)
+        self.assertEqual(response['body'], b'')
+
+        response = self.request('/static/css/site.css',
+                                IF_NONE_MATCH='"other"',
+                                IF_MODIFIED_SINCE=http_date(last_modified))
+        self.assertEqual(response['status'], 200)
+
+        response = self.request('/static/css/site.css',
+                                IF_MODIFIED_SINCE=http_date(last_modified))
+        self.assertEqual(response['status'], 304)
+
+    def test_byte_ranges(self):
+        response = self.request('/static/css/site.css', RANGE='bytes=5-9',
+                                ACCEPT_ENCODING='gzip')
+
+        self.assertEqual(response['status'], 206)
+        self.assertEqual(response['body'], CSS[5:10])
+        self.assertEqual(response['headers']['Content-Range'],
+                         'bytes 5-9/{}'.format(len(CSS)))
+        self.assertNotIn('Content-Encoding', response['headers'])
+
+        response = self.request('/static/css/site.css',
+                                RANGE='bytes={}-'.format(len(CSS)))
+        self.assertEqual(response['status'], 416)
+
+        # the file has changed since the client's copy
+        response = self.request('/static/css/site.css', RANGE='bytes=5-9',
+                                IF_RANGE='"stale"')
+        self.assertEqual(response['status'], 200)
+        self.assertEqual(response['body'], CSS)
+
+    def test_parse_range(self):
+        self.assertEqual(parse_range('bytes=0-', 10), (0, 10))
+        self.assertEqual(parse_range('bytes=-3', 10), (7, 10))
+        self.assertEqual(parse_range('bytes=-30', 10), (0, 10))
+        self.assertEqual(parse_range('bytes=2-100', 10), (2, 10))
+        self.assertIs(parse_range('bytes=10-', 10), UNSATISFIABLE)
+        self.assertIs(parse_range('bytes=-0', 10), UNSATISFIABLE)
+        self.assertIsNone(parse_range('bytes=5-2', 10))
+        self.assertIsNone(parse_range('bytes=0-1,3-4', 10))
+        self.assertIsNone(parse_range('lines=1-2', 10))
+
+    def test_media_files_are_looked_up_per_request(self):
+        response = self.request('/public/media/avatars/' + HASHED_NAME)
+        self.assertEqual(response['body'], b'png' * 10)
+        self.assertIn('immutable', response['headers']['Cache-Control'])
+
+        response = self.request('/public/media/renditions/48.jpg',
+                                method='HEAD')
+        self.assertEqual(response['status'], 200)
+        self.assertEqual(response['body'], b'')
+        self.assertEqual(response['headers']['Content-Length'], '30')
+        self.assertEqual(response['headers']['Cache-Control'], 'no-cache')
+
+    def test_renditions_are_sent_in_the_smallest_accepted_format(self):
+        response = self.request('/public/media/renditions/48.jpg',
+                                ACCEPT='image/avif,image/webp,*/*')
+
+        self.assertEqual(response['body'], b'webp')
+        self.assertEqual(response['headers']['Content-Type'], 'image/webp')
+        self.assertEqual(response['headers']['Vary'], 'Accept')
+
+        response = self.request('/public/media/renditions/48.jpg',
+                                ACCEPT='*/*')
+        self.assertEqual(response['headers']['Content-Type'], 'image/jpeg')
+        self.assertEqual(response['headers']['Vary'], 'Accept')
+
+    def test_other_requests_go_to_django(self):
+        for path, method in [
+            ('/public/media/../secret.txt', 'GET'),
+            ('/public/media/avatars', 'GET'),
+            ('/public/media/missing.png', 'GET'),
+            ('/static/css/site.css', 'POST'),
+            ('/accounts/profile', 'GET'),
+        ]:
+            with self.subTest(path=path, method=method):
+                self.assertEqual(self.request(path, method)['body'],
+                                 b'from django')
@@ -0,0 +1,72 @@
+from unittest import mock
+
+from django.contrib.sessions.models import Session
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase
+
+from accounts.models import UserProfile
+from project_7 import routers
+
+
+class ReplicaRouterTestCase(SimpleTestCase):
+
+    # Setup and teardown
+    # ------------------
+    def setUp(self):
+        self.router = routers.ReplicaRouter()
+        self.factory = RequestFactory()
+        databases = {'default': {}, routers.REPLICA: {}}
+        patcher = mock.patch.object(routers.connections, 'databases',
+                                    databases)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    # Helper Methods
+    # --------------
+    def read_db_during(self, request, model=UserProfile):
+        """The database reads of `model` go to while `request` is handled,
+        and the response
+        """
+        seen = []
+
+        def view(request):
+            seen.append(self.router.db_for_read(model))
+            return HttpResponse()
+
+        response = routers.ReplicaPinningMiddleware(view)(request)
+        return seen[0], response
+
+    # Test Methods
+    # ------------
+    def test_reads_outside_requests_use_default(self):
+        self.assertEqual(self.router.db_for_read(UserProfile), 'default')
+
+    def test_get_requests_read_from_replica(self):
+        db, response = self.read_db_during(self.factory.get('/'))
+
+        self.assertEqual(db, routers.REPLICA)
+        self.assertNotIn(routers.PIN_COOKIE, response.cookies)
+
+    def test_post_requests_read_from_default_and_pin(self):
+        db, response = self.read_db_during(self.factory.post('/'))
+
+        self.assertEqual(db, 'default')
+        self.assertIn(routers.PIN_COOKIE, response.cookies)
+
+    def test_pinned_get_requests_read_from_default(self):
+        request = self.factory.get('/')
+        request.COOKIES[routers.PIN_COOKIE] = '1'
+
+        db, _ = self.read_db_during(request)
+
+        self.assertEqual(db, 'default')
+
+    def test_sessions_are_always_read_from_default(self):
+        db, _ = self.read_db_during(self.factory.get('/'), model=Session)
+
+        self.assertEqual(db, 'default')
+
+    def test_writes_and_migrations_use_default(self):
+        self.assertEqual(self.router.db_for_write(UserProfile), 'default')
+        self.assertFalse(self.router.allow_migrate(routers.REPLICA,
+                                                   'accounts'))
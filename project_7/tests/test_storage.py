@@ -0,0 +1,113 @@
+import gzip
+from io import StringIO
+import json
+import os
+import shutil
+import tempfile
+
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+
+
+CSS = "body { background: url('../img/dot.png'); }\n" * 20
+BROKEN_CSS = '@import "core/missing";\n' + CSS
+
+
+class CompressedManifestStorageTestCase(SimpleTestCase):
+
+    # Setup and teardown
+    # ------------------
+    def setUp(self):
+        self.source = tempfile.mkdtemp()
+        self.root = tempfile.mkdtemp()
+        self.write('css/site.css', CSS)
+        self.write('css/broken.css', BROKEN_CSS)
+        self.write('js/tiny.js', 'var a;')
+        self.write('img/dot.png', '\x89PNG' + 'x' * 500)
+
+        settings = override_settings(
+            STATICFILES_DIRS=[self.source],
+            STATICFILES_FINDERS=[
+                'django.contrib.staticfiles.finders.FileSystemFinder',
+            ],
+            STATIC_ROOT=self.root,
+            STATIC_COMPRESSION_WORKERS=0,
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def tearDown(self):
+        shutil.rmtree(self.source)
+        shutil.rmtree(self.root)
+
+    # Helper Methods
+    # --------------
+    def write(self, name, text):
+        path = os.path.join(self.source, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='latin-1') as f:
+            f.write(text)
+
+    def collectstatic(self):
+        call_command('collectstatic', interactive=False, verbosity=0,
+                     stdout=StringIO())
+        with open(os.path.join(self.root, 'staticfiles.json')) as f:
+            return json.load(f)['paths']
+
+    def path(self, name):
+        return os.path.join(self.root, name)
+
+    # Test Methods
+    # ------------
+    def test_hashed_files_are_compressed(self):
+        paths = self.collectstatic()
+
+        site_css = paths['css/site.css']
+        self.assertNotEqual(site_css, 'css/site.css')
+        with gzip.open(self.path(site_css + '.gz'), 'rt') as f:
+            compressed = f.read()
+        with open(self.path(site_css)) as f:
+            self.assertEqual(compressed, f.read())
+        # the reference to the image was rewritten to its hashed name
+        self.assertIn(paths['img/dot.png'], compressed)
+
+        # too small, and already compressed
+        self.assertFalse(os.path.exists(self.path(paths['js/tiny.js']
+                                                  + '.gz')))
+        self.assertFalse(os.path.exists(self.path(paths['img/dot.png']
+                                                  + '.gz')))
+        # only the hashed names are compressed
+        self.assertFalse(os.path.exists(self.path('css/site.css.gz')))
+
+    def test_existing_compressed_files_are_kept(self):
+        paths = self.collectstatic()
+        compressed = self.path(paths['css/site.css'] + '.gz')
+        os.utime(compressed, (0, 0))
+
+        self.collectstatic()
+
+        self.assertEqual(os.stat(compressed).st_mtime, 0)
+
+    def test_missing_references_are_left_alone(self):
+        paths = self.collectstatic()
+
+        with open(self.path(paths['css/broken.css'])) as f:
+            self.assertTrue(f.read().startswith('@import "core/missing";'))
+
+    @override_settings(STATIC_COMPRESSION_WORKERS=1)
+    def test_files_can_be_compressed_by_worker_processes(self):
+        paths = self.collectstatic()
+
+        self.assertTrue(os.path.exists(self.path(paths['css/site.css']
+                                                 + '.gz')))
+
+    def test_urls_are_hashed_once_collected(self):
+        self.assertEqual(staticfiles_storage.url('css/site.css'),
+                         '/static/css/site.css')
+
+        paths = self.collectstatic()
+        staticfiles_storage.hashed_files = staticfiles_storage.load_manifest()
+
+        self.assertEqual(staticfiles_storage.url('css/site.css'),
+                         '/static/' + paths['css/site.css'])
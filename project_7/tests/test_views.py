@@ -1,7 +1,11 @@
-from django.test import Client, TestCase
+import os
+import shutil
+import tempfile
+
+from django.test import Client, RequestFactory, TestCase
 from django.urls import resolve, reverse
 
-from project_7.views import home
+from project_7.views import home, media
 
 
 class Project7ViewsTestCase(TestCase):
@@ -55,3 +59,49 @@ class HomeViewTestCase(Project7ViewsTestCase):
         self.name += 'home'
         self.target_view = home
         self.template += 'home.html'
+
+
+class MediaViewTestCase(TestCase):
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.factory = RequestFactory()
+
+    def tearDown(self):
+        shutil.rmtree(self.media_root)
+
+    def write(self, name, data=b'data'):
+        path = os.path.join(self.media_root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(data)
+
+    def get(self, name, **headers):
+        self.write(name)
+        request = self.factory.get('/public/media/' + name, **headers)
+        return media(request, name, document_root=self.media_root)
+
+    def test_content_addressed_files_are_cached_forever(self):
+        response = self.get('avatars/ab/cd/' + 'abcd' * 16 + '.jpg')
+
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertIn('max-age=31536000', response['Cache-Control'])
+
+    def test_other_files_are_not_cached_forever(self):
+        response = self.get('avatars/1.jpg')
+
+        self.assertFalse(response.has_header('Cache-Control'))
+
+    def test_renditions_are_sent_in_the_smallest_accepted_format(self):
+        self.write('renditions/avatars/1.png/48.webp', b'tiny')
+
+        response = self.get('renditions/avatars/1.png/48.jpg',
+                            HTTP_ACCEPT='image/webp,*/*')
+        self.assertEqual(response['Content-Type'], 'image/webp')
+        self.assertEqual(b''.join(response.streaming_content), b'tiny')
+        self.assertEqual(response['Vary'], 'Accept')
+
+        response = self.get('renditions/avatars/1.png/48.jpg',
+                            HTTP_ACCEPT='*/*')
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
+        self.assertEqual(response['Vary'], 'Accept')
@@ -50,4 +50,5 @@ urlpatterns = [
 ]
 urlpatterns += staticfiles_urlpatterns()
 urlpatterns += static(settings.MEDIA_URL,
+                      view=views.media,
                       document_root=settings.MEDIA_ROOT)
@@ -1,5 +1,43 @@
+import os
+
+from django.conf import settings
 from django.shortcuts import render
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.views.static import serve
+
+from accounts.avatars import best_variant, is_rendition
+from accounts.storage import is_content_addressed
+
+
+# (seconds) how long browsers may cache files whose names never change
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
 
 
 def home(request):
     return render(request, 'home.html')
+
+
+def media(request, path, document_root=None, show_indexes=False):
+    """Serve user-uploaded files (DEBUG only, like
+    `django.views.static.serve` which this wraps).
+
+    Content-addressed files never change, so browsers are told to cache them
+    for a year without revalidating. Avatar renditions are sent in the
+    smallest format the browser accepts.
+    """
+    document_root = document_root or settings.MEDIA_ROOT
+    served_path = path
+    if is_rendition(path):
+        root = os.path.join(os.path.abspath(document_root), '')
+        best = best_variant(os.path.join(root, path),
+                            request.META.get('HTTP_ACCEPT', ''))
+        served_path = os.path.relpath(best, root).replace(os.sep, '/')
+    response = serve(request, served_path,
+                     document_root=document_root,
+                     show_indexes=show_indexes)
+    if is_rendition(path):
+        patch_vary_headers(response, ['Accept'])
+    if response.status_code == 200 and is_content_addressed(path):
+        patch_cache_control(response, public=True,
+                            max_age=IMMUTABLE_MAX_AGE, immutable=True)
+    return response
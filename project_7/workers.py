@@ -0,0 +1,15 @@
+"""Worker process bootstrap
+
+Process pools are created with the 'spawn' start method, so each worker
+starts from a fresh interpreter and has to set Django up before it can run
+anything. The initializer is unpickled (i.e. its module imported) before it
+runs, so it lives here, in a module that imports nothing that needs the app
+registry.
+"""
+import os
+
+
+def setup_worker_process():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'project_7.settings')
+    import django
+    django.setup()
@@ -14,3 +14,10 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "project_7.settings")
 
 application = get_wsgi_application()
+
+# Serve static and media files without going through Django (see
+# project_7/fileserver.py). Imported after the application so that Django is
+# set up first.
+from project_7.fileserver import FileServer  # noqa: E402
+
+application = FileServer(application)
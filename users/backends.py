@@ -0,0 +1,51 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.exceptions import PermissionDenied
+
+from . import hashing
+
+
+UserModel = get_user_model()
+
+
+class P7ModelBackend(ModelBackend):
+    """The default backend, except that the user's profile is loaded along
+    with the user.
+
+    `AuthenticationMiddleware` loads `request.user` through `get_user` on
+    every request, and almost every page goes on to use `user.userprofile`,
+    so joining it here saves a query per request.
+
+    Passwords are hashed on the bounded hashing pool (see users.hashing).
+
+    A wrong password for a known user (or a user who may not sign in)
+    raises PermissionDenied, so that `authenticate` stops here rather than
+    checking the same password again in the ModelBackend listed after this
+    one. Missing credentials and unknown users are left to other backends.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = UserModel._default_manager.get_by_natural_key(username)
+        except UserModel.DoesNotExist:
+            # Hash anyway, so that an unknown user takes as long to reject as
+            # a wrong password (as ModelBackend does)
+            hashing.make_password(password)
+            return None
+        if not (hashing.check_password(user, password)
+                and self.user_can_authenticate(user)):
+            raise PermissionDenied
+        return user
+
+    def get_user(self, user_id):
+        try:
+            user = (UserModel._default_manager
+                    .select_related('userprofile')
+                    .get(pk=user_id))
+        except UserModel.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
@@ -4,12 +4,17 @@ from django.contrib.auth.forms import (UserCreationForm,
                                        UserChangeForm,
                                        ReadOnlyPasswordHashField)
 
+from accounts.models import UserProfile
+
+from . import hashing
+
 # The following imports are for PasswordChangeForm
 from django.contrib.auth import password_validation
 # (https://github.com/django/django/blob/master/django/contrib/auth/password_validation.py)
 
 # The following imports are for custom validators
 import re
+import string
 from django.core.exceptions import ValidationError
 
 
@@ -38,9 +43,10 @@ class P7UserCreationForm(UserCreationForm):
         return password1
 
     def save(self, commit=True):
-        # Save the provided password in hashed format
-        user = super().save(commit=False)
-        user.set_password(self.cleaned_data['password1'])
+        # Save the provided password in hashed format. This skips
+        # UserCreationForm.save, which would hash the password a second time.
+        user = super(UserCreationForm, self).save(commit=False)
+        user.password = hashing.make_password(self.cleaned_data['password1'])
         if commit:
             user.save()
         return user
@@ -169,6 +175,91 @@ class SpecialCharacterValidator(ContentsValidator):
     pattern = r'[~`!@#$%\^&*()\-_+=[\]{}|\\:;\'\",<.>?/]'
 
 
+class PasswordPolicyValidator(object):
+    """All of the above in one validator: the password must contain a
+    number, a lowercase letter, an uppercase letter and a special character,
+    and none of the user's identity words.
+
+    The character classes are built once, as sets, so checking them takes a
+    single pass over the password (to collect its characters) followed by a
+    set intersection per class. Every rule that fails is reported together
+    rather than one at a time.
+    """
+    special_characters = frozenset('~`!@#$%^&*()-_+=[]{}|\\:;\'",<.>?/')
+
+    # (code, message, characters); the classes match the patterns of the
+    # separate validators above
+    rules = (
+        (NumericValidator.error_msg['code'],
+         NumericValidator.error_msg['message'],
+         frozenset(string.digits)),
+        (LowerCaseValidator.error_msg['code'],
+         LowerCaseValidator.error_msg['message'],
+         frozenset(string.ascii_lowercase)),
+        (UpperCaseValidator.error_msg['code'],
+         UpperCaseValidator.error_msg['message'],
+         frozenset(string.ascii_uppercase)),
+        (SpecialCharacterValidator.error_msg['code'],
+         SpecialCharacterValidator.error_msg['message'],
+         special_characters),
+    )
+    identity_error = OtherIdentityAttributesValidator.error_msg
+
+    def validate(self, password, user=None):
+        characters = set(password)
+        if not password.isascii():
+            # like \d, accept digits from other scripts
+            if any(c.isdecimal() for c in characters):
+                characters.add('0')
+
+        errors = [ValidationError(message, code)
+                  for code, message, members in self.rules
+                  if members.isdisjoint(characters)]
+
+        lowered = password.lower()
+        if any(word in lowered for word in self.identity_words(user)):
+            errors.append(ValidationError(self.identity_error['message'],
+                                          self.identity_error['code']))
+
+        if errors:
+            raise ValidationError(errors)
+
+    @staticmethod
+    def identity_words(user):
+        """The user's email and (if they have a profile) names, lowercased.
+
+        Uses the profile if it has already been loaded with the user (see
+        users.backends), and otherwise fetches just the two names.
+        """
+        if user is None:
+            return []
+        words = [user.email.lower()]
+        if user.pk is None:
+            # not saved yet (e.g. signing up), so there can't be a profile
+            return words
+
+        profile_relation = UserProfile._meta.get_field('user').remote_field
+        if profile_relation.is_cached(user):
+            # (cached as missing if the user has no profile)
+            profile = getattr(user, 'userprofile', None)
+            names = ((profile.given_name, profile.family_name)
+                     if profile else ())
+        else:
+            names = (UserProfile.objects
+                     .filter(user=user)
+                     .values_list('given_name', 'family_name')
+                     .first()) or ()
+
+        # don't add empty string to forbidden words!
+        words.extend(name.lower() for name in names if name)
+        return words
+
+    def get_help_text(self):
+        return ("Your password must contain at least 1 number, 1 lowercase "
+                "letter, 1 uppercase letter and 1 special character, and may "
+                "not include your username, first name or last name")
+
+
 # Password Change Form
 class PasswordChangeForm(forms.Form):
     """A form that lets a user change their password
@@ -207,7 +298,7 @@ class PasswordChangeForm(forms.Form):
         """Validate that the old password field is correct."""
         current_password = self.cleaned_data.get("current_password")
 
-        if not self.user.check_password(current_password):
+        if not hashing.check_password(self.user, current_password):
             raise forms.ValidationError(
                 self.error_messages['password_incorrect'],
                 code="password_incorrect",
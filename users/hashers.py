@@ -0,0 +1,22 @@
+"""Password hashing policy
+
+`PolicyPBKDF2PasswordHasher` is Django's PBKDF2 hasher with the iteration
+count taken from the `PASSWORD_HASH_ITERATIONS` setting. Since it keeps the
+`pbkdf2_sha256` algorithm name, existing hashes are verified by it whatever
+their iteration count, and any that don't match the setting are rehashed
+the next time their user signs in or changes their password (see
+users.hashing). Changing the setting therefore rolls out gradually, without
+a migration.
+
+`manage.py password_hashes` shows how far such a roll out has got.
+"""
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+
+class PolicyPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+
+    @property
+    def iterations(self):
+        return getattr(settings, 'PASSWORD_HASH_ITERATIONS',
+                       PBKDF2PasswordHasher.iterations)
@@ -0,0 +1,108 @@
+"""Bounded password hashing
+
+Password hashers are deliberately slow (PBKDF2 runs hundreds of thousands of
+iterations), and a burst of sign ins can tie up every worker thread hashing
+at once. The functions here let at most `PASSWORD_HASHING_WORKERS` hashes be
+computed at the same time:
+
+- a burst of logins queues up rather than starving every other request of
+  CPU,
+- the hashing itself still runs on the calling thread, which is blocked
+  waiting for the result anyway, so there is no hand-off to another thread,
+- `acheck_password` can be awaited from async code: it hashes on a pool
+  thread, so the event loop isn't blocked.
+
+Only the hashing itself is bounded: anything that touches the database
+(e.g. saving an upgraded hash) happens outside the limit.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import functools
+import os
+import threading
+
+from django.conf import settings
+from django.contrib.auth import get_user_model, hashers
+
+
+def worker_count():
+    return (getattr(settings, 'PASSWORD_HASHING_WORKERS', None)
+            or os.cpu_count() or 1)
+
+
+@functools.lru_cache(maxsize=None)
+def _load_executor(workers):
+    return ThreadPoolExecutor(max_workers=workers,
+                              thread_name_prefix='password-hashing')
+
+
+def get_executor():
+    return _load_executor(worker_count())
+
+
+@functools.lru_cache(maxsize=None)
+def _load_semaphore(workers):
+    return threading.BoundedSemaphore(workers)
+
+
+def _bounded(func, *args):
+    """Call `func(*args)` once fewer than `worker_count()` hashes are
+    being computed
+    """
+    with _load_semaphore(worker_count()):
+        return func(*args)
+
+
+def _verify(password, encoded):
+    """Return (valid, must_update) for `password` against hash `encoded`"""
+    if password is None or not hashers.is_password_usable(encoded):
+        return False, False
+    try:
+        hasher = hashers.identify_hasher(encoded)
+    except ValueError:
+        return False, False
+    preferred = hashers.get_hasher('default')
+    hasher_changed = hasher.algorithm != preferred.algorithm
+    must_update = hasher_changed or preferred.must_update(encoded)
+    if not hasher.verify(password, encoded):
+        # as in django.contrib.auth.hashers.check_password, make a wrong
+        # password take as long as a right one would under the policy
+        if not hasher_changed and must_update:
+            hasher.harden_runtime(password, encoded)
+        return False, False
+    return True, must_update
+
+
+def make_password(password):
+    """Hash `password` with the preferred hasher"""
+    return _bounded(hashers.make_password, password)
+
+
+def check_password(user, password):
+    """Check `password` against `user`'s stored hash.
+
+    If the hash was made with an outdated hasher (or iteration count) and
+    the password is correct, the user's hash is upgraded and saved.
+    """
+    encoded = user.password
+    valid, must_update = _bounded(_verify, password, encoded)
+    if valid and must_update:
+        upgraded = make_password(password)
+        # Only replace the hash that was checked: if the user has changed
+        # their password (or a concurrent sign in has already upgraded it)
+        # in the meantime, leave the newer hash alone.
+        if get_user_model()._default_manager.filter(
+                pk=user.pk, password=encoded).update(password=upgraded):
+            user.password = upgraded
+    return valid
+
+
+async def acheck_password(encoded, password):
+    """Await whether `password` matches the hash `encoded`.
+
+    Returns (valid, must_update); upgrading the hash is left to the caller,
+    since saving it is a (blocking) database query.
+    """
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(get_executor(), _bounded, _verify,
+                                      password, encoded)
@@ -0,0 +1,63 @@
+from concurrent.futures import wait
+import time
+
+from django.contrib.auth.hashers import get_hashers
+from django.core.management.base import BaseCommand
+
+from users.hashing import get_executor, worker_count
+
+
+class Command(BaseCommand):
+    help = ("Report how many password hashes per second each configured "
+            "hasher manages, on one thread and on the hashing pool")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--seconds', type=float, default=2.0,
+            help="How long to hash for with each hasher and mode",
+        )
+
+    def handle(self, *args, **options):
+        executor = get_executor()
+        workers = worker_count()
+        self.stdout.write("Hashing pool: {} threads".format(workers))
+
+        hashers = get_hashers()
+        for hasher in hashers:
+            try:
+                hasher.encode('warm up', hasher.salt())
+            except ValueError as e:  # e.g. argon2-cffi isn't installed
+                self.stdout.write("{:<24} skipped ({})".format(
+                    hasher.algorithm, e
+                ))
+                continue
+
+            single = self.rate(lambda: [hasher.encode('password',
+                                                      hasher.salt())],
+                               options['seconds'])
+            pooled = self.rate(
+                lambda: wait([executor.submit(hasher.encode, 'password',
+                                              hasher.salt())
+                              for _ in range(workers)]).done,
+                options['seconds']
+            )
+            self.stdout.write(
+                "{:<24} {:9.1f} hashes/s on one thread, "
+                "{:9.1f} hashes/s on the pool{}".format(
+                    hasher.algorithm, single, pooled,
+                    "  (default)" if hasher is hashers[0] else ""
+                )
+            )
+
+    @staticmethod
+    def rate(batch, seconds):
+        """Run `batch` (which returns the hashes it did) for about `seconds`
+        and return the hashes per second
+        """
+        count = 0
+        started = time.perf_counter()
+        while True:
+            count += len(batch())
+            elapsed = time.perf_counter() - started
+            if elapsed >= seconds:
+                return count / elapsed
@@ -0,0 +1,72 @@
+import random
+import string
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand
+
+from users.forms import (NumericValidator, LowerCaseValidator,
+                         UpperCaseValidator, SpecialCharacterValidator,
+                         OtherIdentityAttributesValidator,
+                         PasswordPolicyValidator)
+
+
+ALPHABET = string.ascii_letters + string.digits + ',./!@#$%^&*()-_'
+
+
+class Command(BaseCommand):
+    help = ("Time the separate character/identity password validators "
+            "against the combined PasswordPolicyValidator over a corpus")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--corpus',
+            help=("File with one password per line (by default random "
+                  "passwords are generated)"),
+        )
+        parser.add_argument(
+            '--size', type=int, default=100000,
+            help="Number of passwords to generate when no corpus is given",
+        )
+
+    def handle(self, *args, **options):
+        if options['corpus']:
+            with open(options['corpus'], encoding='utf-8',
+                      errors='replace') as f:
+                passwords = [line.rstrip('\n') for line in f]
+        else:
+            rng = random.Random(0)
+            passwords = [
+                ''.join(rng.choice(ALPHABET)
+                        for _ in range(rng.randint(6, 24)))
+                for _ in range(options['size'])
+            ]
+
+        # unsaved, so neither approach queries for a profile
+        user = get_user_model()(email='alicesmith@test.com')
+
+        separate = [NumericValidator(), LowerCaseValidator(),
+                    UpperCaseValidator(), SpecialCharacterValidator(),
+                    OtherIdentityAttributesValidator()]
+        combined = [PasswordPolicyValidator()]
+
+        for label, validators in (("separate validators", separate),
+                                  ("combined validator", combined)):
+            rejected = 0
+            started = time.perf_counter()
+            for password in passwords:
+                # like validate_password, run every validator
+                failed = False
+                for validator in validators:
+                    try:
+                        validator.validate(password, user)
+                    except ValidationError:
+                        failed = True
+                rejected += failed
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                "{:<20} {:8.3f}s {:8.2f} us/password ({} rejected)".format(
+                    label, elapsed, elapsed / len(passwords) * 1e6, rejected
+                )
+            )
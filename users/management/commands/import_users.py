@@ -0,0 +1,192 @@
+from concurrent.futures import ProcessPoolExecutor
+import csv
+import itertools
+import json
+import multiprocessing
+import os
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils.dateparse import parse_date
+
+from accounts.models import UserProfile
+from accounts.sanitizer import sanitize_bio
+from project_7.workers import setup_worker_process
+
+
+PROFILE_FIELDS = ('given_name', 'family_name', 'city', 'state', 'country',
+                  'favourite_animal', 'hobby', 'favourite_fountain_pen')
+
+
+def prepare(password, bio):
+    """The CPU-heavy part of importing a row: hash the password and clean
+    the bio. Runs in the worker processes.
+    """
+    return make_password(password or None), sanitize_bio(bio) if bio else ''
+
+
+class Command(BaseCommand):
+    help = ("Import users (and their profiles) from a CSV or JSON lines "
+            "file. Columns/keys: email, password, and optionally "
+            "date_of_birth and bio (both needed for a profile), "
+            + ", ".join(PROFILE_FIELDS))
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="The file to import")
+        parser.add_argument(
+            '--format', choices=('csv', 'jsonl'),
+            help="File format (by default, guessed from the extension)",
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help="Number of users to insert per transaction",
+        )
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count() or 1,
+            help=("Number of processes hashing passwords; 0 to hash in this "
+                  "process"),
+        )
+
+    def handle(self, *args, **options):
+        file_format = options['format'] or (
+            'jsonl' if options['path'].endswith(('.jsonl', '.json'))
+            else 'csv'
+        )
+        self.stats = {'imported': 0, 'profiles': 0, 'skipped': 0}
+
+        if options['workers']:
+            executor = ProcessPoolExecutor(
+                max_workers=options['workers'],
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=setup_worker_process,
+            )
+            self.map = lambda func, *iterables: executor.map(
+                func, *iterables, chunksize=64
+            )
+        else:
+            executor = None
+            self.map = map
+
+        started = time.monotonic()
+        try:
+            with open(options['path'], newline='', encoding='utf-8') as f:
+                rows = self.read(f, file_format)
+                while True:
+                    batch = list(itertools.islice(rows,
+                                                  options['batch_size']))
+                    if not batch:
+                        break
+                    self.import_batch(batch)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            "Imported {imported} users ({profiles} with profiles), skipped "
+            "{skipped}".format(**self.stats)
+        )
+        self.stdout.write("{:.2f}s, {:.0f} rows/s".format(
+            elapsed, self.stats['imported'] / elapsed if elapsed else 0
+        ))
+
+    def read(self, f, file_format):
+        """Yield (line number, row dict) for each row of `f`"""
+        if file_format == 'csv':
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, row
+            return
+
+        for line_num, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                raise CommandError("Line {}: {}".format(line_num, e))
+            yield line_num, row
+
+    def skip(self, line_num, reason):
+        self.stats['skipped'] += 1
+        self.stderr.write("Line {}: {}, skipped".format(line_num, reason))
+
+    def import_batch(self, batch):
+        User = get_user_model()
+
+        rows = []
+        seen = set()
+        for line_num, row in batch:
+            email = User.objects.normalize_email((row.get('email') or '')
+                                                 .strip())
+            if not email:
+                self.skip(line_num, "no email")
+                continue
+            if email in seen:
+                self.skip(line_num, "duplicate email {}".format(email))
+                continue
+            seen.add(email)
+
+            date_of_birth = row.get('date_of_birth') or None
+            if date_of_birth is not None:
+                try:
+                    date_of_birth = parse_date(date_of_birth)
+                except ValueError:
+                    date_of_birth = None
+                if date_of_birth is None:
+                    self.skip(line_num, "invalid date_of_birth")
+                    continue
+            rows.append((line_num, email, date_of_birth, row))
+
+        existing = set(User.objects.filter(email__in=seen)
+                       .values_list('email', flat=True))
+        for line_num, email, _, _ in rows:
+            if email in existing:
+                self.skip(line_num, "{} already exists".format(email))
+        rows = [row for row in rows if row[1] not in existing]
+        if not rows:
+            return
+
+        prepared = list(self.map(
+            prepare,
+            [row.get('password') for _, _, _, row in rows],
+            [row.get('bio') for _, _, _, row in rows],
+        ))
+
+        with transaction.atomic():
+            User.objects.bulk_create(
+                [User(email=email, password=password_hash)
+                 for (_, email, _, _), (password_hash, _)
+                 in zip(rows, prepared)]
+            )
+            # bulk_create doesn't set primary keys on SQLite
+            user_ids = dict(User.objects.filter(email__in=[
+                email for _, email, _, _ in rows
+            ]).values_list('email', 'pk'))
+
+            profiles = [
+                UserProfile(
+                    user_id=user_ids[email],
+                    date_of_birth=date_of_birth,
+                    bio=bio,
+                    **{field: (row.get(field) or '').strip()
+                       for field in PROFILE_FIELDS}
+                )
+                for (_, email, date_of_birth, row), (_, bio)
+                in zip(rows, prepared)
+                if date_of_birth is not None and bio
+            ]
+            # bulk_create skips UserProfile.save(), which fills this in
+            emails = {pk: email for email, pk in user_ids.items()}
+            for profile in profiles:
+                profile.display_name = UserProfile.format_display_name(
+                    profile.given_name, profile.family_name,
+                    emails[profile.user_id]
+                )
+            UserProfile.objects.bulk_create(profiles)
+
+        self.stats['imported'] += len(rows)
+        self.stats['profiles'] += len(profiles)
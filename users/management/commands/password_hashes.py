@@ -0,0 +1,78 @@
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX, get_hasher
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = ("Report how many users' password hashes use each hasher and "
+            "work factor, and how many are due an upgrade")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=2000,
+            help="Number of hashes to fetch from the database at once",
+        )
+
+    def handle(self, *args, **options):
+        preferred = get_hasher('default')
+        counts = Counter()
+        outdated = 0
+        total = 0
+
+        for encoded in self.hashes(options['batch_size']):
+            total += 1
+            algorithm, work = self.summarise(encoded)
+            counts[algorithm, work] += 1
+            if algorithm == UNUSABLE_PASSWORD_PREFIX:
+                continue
+            if (algorithm != preferred.algorithm
+                    or preferred.must_update(encoded)):
+                outdated += 1
+
+        self.stdout.write("{:<24} {:>12} {:>10} {:>7}".format(
+            "hasher", "work factor", "users", "%"
+        ))
+        for (algorithm, work), count in sorted(counts.items()):
+            self.stdout.write("{:<24} {:>12} {:>10} {:>6.1f}%".format(
+                algorithm, work, count, 100 * count / total
+            ))
+        self.stdout.write(
+            "{} of {} users will be rehashed with {} on their next sign "
+            "in".format(outdated, total, preferred.algorithm)
+        )
+
+    def hashes(self, batch_size):
+        """Yield every user's password hash, fetching them in batches of
+        `batch_size` ordered by primary key (so no batch needs an OFFSET)
+        """
+        users = get_user_model()._default_manager.order_by('pk')
+        last_pk = None
+        while True:
+            batch = users
+            if last_pk is not None:
+                batch = batch.filter(pk__gt=last_pk)
+            batch = list(batch.values_list('pk', 'password')[:batch_size])
+            if not batch:
+                return
+            for _, encoded in batch:
+                yield encoded
+            last_pk = batch[-1][0]
+
+    @staticmethod
+    def summarise(encoded):
+        """Return (algorithm, work factor) for the hash `encoded`"""
+        if not encoded or encoded.startswith(UNUSABLE_PASSWORD_PREFIX):
+            return UNUSABLE_PASSWORD_PREFIX, '-'
+        parts = encoded.split('$')
+        algorithm = parts[0]
+        if algorithm.startswith('pbkdf2_') and len(parts) == 4:
+            return algorithm, parts[1]
+        if algorithm.startswith('bcrypt') and len(parts) >= 4:
+            # bcrypt_sha256$$2b$12$...: the cost is the log2 of the rounds
+            return algorithm, 'cost ' + parts[3]
+        if algorithm == 'argon2' and len(parts) >= 5:
+            # argon2$argon2i$v=19$m=512,t=2,p=2$...
+            return algorithm, parts[3]
+        return algorithm, '-'
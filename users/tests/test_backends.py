@@ -0,0 +1,59 @@
+from unittest import mock
+
+from django.contrib.auth import authenticate, get_user_model
+from django.core.exceptions import PermissionDenied
+from django.test import TestCase, override_settings
+
+from users.backends import P7ModelBackend
+
+
+User = get_user_model()
+
+FAST_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class P7ModelBackendTestCase(TestCase):
+
+    def setUp(self):
+        self.backend = P7ModelBackend()
+        self.user = User.objects.create_user(
+            email='alicesmith@test.com',
+            password='Testing123xyz!,.',
+        )
+
+    # Test Methods
+    # ------------
+    def test_correct_password_signs_in(self):
+        self.assertEqual(
+            self.backend.authenticate(None, username='alicesmith@test.com',
+                                      password='Testing123xyz!,.'),
+            self.user
+        )
+
+    def test_wrong_password_is_refused_outright(self):
+        with self.assertRaises(PermissionDenied):
+            self.backend.authenticate(None, username='alicesmith@test.com',
+                                      password='wrong')
+
+    def test_unknown_user_is_left_to_other_backends(self):
+        self.assertIsNone(self.backend.authenticate(
+            None, username='bobjones@test.com', password='wrong'
+        ))
+
+    def test_missing_credentials_are_left_to_other_backends(self):
+        with mock.patch('users.hashing.make_password') as make:
+            self.assertIsNone(self.backend.authenticate(None, token='abc'))
+            self.assertIsNone(self.backend.authenticate(
+                None, username='alicesmith@test.com'
+            ))
+        make.assert_not_called()
+
+    def test_wrong_password_is_checked_once(self):
+        with mock.patch('django.contrib.auth.backends.ModelBackend'
+                        '.authenticate') as model_backend:
+            user = authenticate(None, username='alicesmith@test.com',
+                                password='wrong')
+
+        self.assertIsNone(user)
+        model_backend.assert_not_called()
@@ -0,0 +1,107 @@
+from io import StringIO
+import json
+import os
+import shutil
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from accounts.models import UserProfile
+
+
+User = get_user_model()
+
+
+@override_settings(
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher']
+)
+class ImportUsersCommandTestCase(TestCase):
+
+    # Setup and teardown
+    # ------------------
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        User.objects.create_user(email='existing@test.com')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    # Helper Methods
+    # --------------
+    def write(self, name, content):
+        path = os.path.join(self.directory, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        return path
+
+    def import_users(self, path, **options):
+        options.setdefault('workers', 0)
+        stderr = StringIO()
+        call_command('import_users', path, batch_size=2, stdout=StringIO(),
+                     stderr=stderr, **options)
+        return stderr.getvalue()
+
+    # Test Methods
+    # ------------
+    def test_csv_import_creates_users_and_profiles(self):
+        path = self.write('users.csv', (
+            'email,password,date_of_birth,bio,given_name\n'
+            'alice@test.com,Testing123xyz!,1977-05-25,'
+            '<p>a bio<script>x</script></p>,alice\n'
+            'bob@test.com,Testing123xyz!,,,\n'
+            'carol@test.com,,1980-01-01,<p>another bio</p>,carol\n'
+        ))
+
+        self.import_users(path)
+
+        alice = User.objects.get(email='alice@test.com')
+        self.assertTrue(alice.check_password('Testing123xyz!'))
+        self.assertEqual(alice.userprofile.given_name, 'alice')
+        self.assertEqual(alice.userprofile.bio, '<p>a bio</p>')
+        self.assertEqual(alice.userprofile.display_name,
+                         'alice (alice@test.com)')
+        # no date of birth or bio, so no profile
+        self.assertFalse(
+            UserProfile.objects.filter(user__email='bob@test.com').exists()
+        )
+        self.assertFalse(
+            User.objects.get(email='carol@test.com').has_usable_password()
+        )
+
+    def test_jsonl_import_skips_existing_and_invalid_rows(self):
+        rows = [
+            {'email': 'existing@test.com', 'password': 'x'},
+            {'email': 'dave@test.com', 'date_of_birth': 'not a date',
+             'bio': 'a bio'},
+            {'email': 'erin@test.com', 'password': 'x'},
+            {'email': 'ERIN@test.com', 'password': 'x'},
+            {'password': 'x'},
+        ]
+        path = self.write('users.jsonl',
+                          '\n'.join(json.dumps(row) for row in rows))
+
+        errors = self.import_users(path)
+
+        self.assertEqual(
+            sorted(User.objects.values_list('email', flat=True)),
+            ['ERIN@test.com', 'erin@test.com', 'existing@test.com']
+        )
+        self.assertIn('existing@test.com already exists', errors)
+        self.assertIn('invalid date_of_birth', errors)
+        self.assertIn('no email', errors)
+
+    def test_passwords_can_be_hashed_by_worker_processes(self):
+        path = self.write('users.csv', (
+            'email,password\n'
+            'alice@test.com,Testing123xyz!\n'
+        ))
+
+        self.import_users(path, workers=1)
+
+        # the worker process has the project's own settings, not the test's
+        alice = User.objects.get(email='alice@test.com')
+        self.assertTrue(PBKDF2PasswordHasher().verify('Testing123xyz!',
+                                                      alice.password))
@@ -11,7 +11,7 @@ from users.forms import (P7UserCreationForm, P7UserChangeForm,
                          PasswordChangeForm, OtherIdentityAttributesValidator,
                          ContentsValidator, NumericValidator,
                          UpperCaseValidator, LowerCaseValidator,
-                         SpecialCharacterValidator)
+                         SpecialCharacterValidator, PasswordPolicyValidator)
 
 
 User = get_user_model()
@@ -255,3 +255,63 @@ class SpecialCharacterTestCase(SimpleValidatorTestCase):
         self.abstract = False
         self.invalid_input = 'UPPERlower123456'
         self.validator = SpecialCharacterValidator()
+
+
+class PasswordPolicyValidatorTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="alicesmith@test.com",
+            password="Testing123xyz!,.",
+        )
+        UserProfile.objects.create(
+            user=self.user,
+            date_of_birth=date(1977, 5, 25),
+            bio="this is a string with more than 10 characters",
+            given_name='alice',
+            family_name='smith',
+        )
+
+        self.validator = PasswordPolicyValidator()
+
+    def error_codes(self, password, user=None):
+        with self.assertRaises(ValidationError) as cm:
+            self.validator.validate(password, user)
+        return [error.code for error in cm.exception.error_list]
+
+    def test_valid_string_passes_validation(self):
+        self.assertIsNone(
+            self.validator.validate('UPPERlower123456,./$%^', self.user)
+        )
+
+    def test_all_failures_are_reported_together(self):
+        self.assertEqual(
+            self.error_codes('alice', self.user),
+            ['no_number', 'no_uppercase', 'no_special',
+             'other_identity_component'],
+        )
+
+    def test_identity_words_come_from_loaded_profile(self):
+        user = User.objects.select_related('userprofile').get(pk=self.user.pk)
+
+        with self.assertNumQueries(0):
+            codes = self.error_codes('SMITH' + 'Ul123456,./', user)
+
+        self.assertEqual(codes, ['other_identity_component'])
+
+    def test_identity_words_are_fetched_if_profile_not_loaded(self):
+        user = User.objects.get(pk=self.user.pk)
+
+        with self.assertNumQueries(1):
+            codes = self.error_codes('Alice' + 'Ul123456,./', user)
+
+        self.assertEqual(codes, ['other_identity_component'])
+
+    def test_user_loaded_without_profile_needs_no_query(self):
+        user = User.objects.create_user(
+            email="bobjones@test.com",
+            password="Testing123xyz!,.",
+        )
+        user = User.objects.select_related('userprofile').get(pk=user.pk)
+
+        with self.assertNumQueries(0):
+            self.validator.validate('UPPERlower123456,./$%^', user)
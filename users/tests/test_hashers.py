@@ -0,0 +1,87 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import get_hashers, make_password
+from django.core.cache import caches
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+
+User = get_user_model()
+
+
+@override_settings(PASSWORD_HASH_ITERATIONS=1000)
+class PolicyHasherTestCase(TestCase):
+
+    def setUp(self):
+        caches['ratelimit'].clear()
+        self.password = 'Testing123xyz!,.'
+        self.user = User.objects.create_user(email='alicesmith@test.com')
+        self.set_hash_iterations(500)
+
+    # Helper Methods
+    # --------------
+    def set_hash_iterations(self, iterations):
+        with self.settings(PASSWORD_HASH_ITERATIONS=iterations):
+            self.user.password = make_password(self.password)
+        self.user.save()
+
+    def hash_iterations(self):
+        self.user.refresh_from_db()
+        return self.user.password.split('$')[1]
+
+    # Test Methods
+    # ------------
+    def test_configured_hashers_are_installed(self):
+        for hasher in get_hashers():
+            if hasher.library:
+                hasher._load_library()  # ValueError if it's missing
+
+    def test_new_hashes_use_configured_iterations(self):
+        self.assertTrue(
+            make_password(self.password).startswith('pbkdf2_sha256$1000$')
+        )
+
+    def test_sign_in_upgrades_hash(self):
+        self.client.post(reverse('accounts:sign_in'), data={
+            'username': 'alicesmith@test.com',
+            'password': self.password,
+        })
+
+        self.assertEqual(self.hash_iterations(), '1000')
+
+    def test_failed_sign_in_leaves_hash_alone(self):
+        self.client.post(reverse('accounts:sign_in'), data={
+            'username': 'alicesmith@test.com',
+            'password': 'not the password',
+        })
+
+        self.assertEqual(self.hash_iterations(), '500')
+
+    def test_change_password_form_upgrades_hash(self):
+        self.client.force_login(self.user)
+
+        # an invalid new password, so only the current one is checked
+        self.client.post(reverse('accounts:change_password'), data={
+            'current_password': self.password,
+            'new_password': 'short',
+            'confirm_password': 'short',
+        })
+
+        self.assertEqual(self.hash_iterations(), '1000')
+
+    def test_report_counts_outdated_hashes(self):
+        User.objects.create_user(email='bobjones@test.com',
+                                 password=self.password)
+        User.objects.create_user(email='carol@test.com')
+        out = StringIO()
+
+        call_command('password_hashes', batch_size=1, stdout=out)
+
+        report = out.getvalue()
+        self.assertIn('pbkdf2_sha256                     500          1',
+                      report)
+        self.assertIn('pbkdf2_sha256                    1000          1',
+                      report)
+        self.assertIn('1 of 3 users will be rehashed', report)
@@ -0,0 +1,79 @@
+import asyncio
+import threading
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from users import hashing
+
+
+User = get_user_model()
+
+FAST_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher',
+                'django.contrib.auth.hashers.SHA1PasswordHasher']
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class HashingTestCase(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='alicesmith@test.com',
+            password='Testing123xyz!,.',
+        )
+
+    # Test Methods
+    # ------------
+    def test_check_password(self):
+        self.assertTrue(hashing.check_password(self.user, 'Testing123xyz!,.'))
+        self.assertFalse(hashing.check_password(self.user, 'wrong'))
+
+    def test_outdated_hash_is_upgraded(self):
+        self.user.password = make_password('Testing123xyz!,.',
+                                           hasher='sha1')
+        self.user.save()
+
+        self.assertTrue(hashing.check_password(self.user, 'Testing123xyz!,.'))
+
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('md5$'))
+
+    def test_hashes_on_the_calling_thread(self):
+        threads = []
+
+        def record_thread(password):
+            threads.append(threading.current_thread())
+            return make_password(password)
+
+        with mock.patch('django.contrib.auth.hashers.make_password',
+                        side_effect=record_thread):
+            hashing.make_password('Testing123xyz!,.')
+
+        self.assertEqual(threads, [threading.current_thread()])
+
+    def test_acheck_password(self):
+        loop = asyncio.new_event_loop()
+        try:
+            result = loop.run_until_complete(hashing.acheck_password(
+                self.user.password, 'Testing123xyz!,.'
+            ))
+        finally:
+            loop.close()
+
+        self.assertEqual(result, (True, False))
+
+    def test_sign_up_hashes_password_once(self):
+        with mock.patch('users.hashing.make_password',
+                        wraps=hashing.make_password) as make:
+            response = self.client.post(reverse('accounts:sign_up'), data={
+                'email': 'bobjones@test.com',
+                'password1': 'Testing123xyz!,.',
+                'password2': 'Testing123xyz!,.',
+            })
+
+        self.assertRedirects(response, reverse('accounts:profile'),
+                             fetch_redirect_response=False)
+        self.assertEqual(make.call_count, 1)